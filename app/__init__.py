@@ -25,6 +25,26 @@ def create_app(config_name='default'):
     app.gemini_service = GeminiService()
     app.gemini_service.init_app(app)
     
+    # Initialize full-text search (FTS5 or inverted-index fallback)
+    from app.services.search_service import SearchService
+    SearchService(app)
+    
+    # Load bundled fonts once, before requests start rendering
+    from app.services.font_registry import registry as font_registry
+    font_registry.preload()
+    
+    # Reuse rendered memes, speech and videos for identical inputs
+    from app.services.render_cache import RenderCache
+    RenderCache(app)
+    
+    # Stream uploads to disk while hashing them into a content-addressed store
+    from app.services.upload_store import upload_store
+    upload_store.init_app(app)
+    
+    # Batch low-value counter/timestamp updates per worker
+    from app.services.write_behind import WriteBehindBuffer
+    WriteBehindBuffer(app)
+    
     # Add a simple home route for testing
     @app.route('/')
     def home():
@@ -52,12 +72,14 @@ def create_app(config_name='default'):
         from app.routes.ai_processing import ai_bp
         from app.routes.user_customization import user_bp
         from app.routes.media_routes import media_bp
+        from app.routes.uploads import uploads_bp
         
         app.register_blueprint(auth_bp, url_prefix='/auth')
         app.register_blueprint(rant_bp, url_prefix='/api/rants')
         app.register_blueprint(ai_bp, url_prefix='/api/ai')
         app.register_blueprint(user_bp, url_prefix='/api/user')
         app.register_blueprint(media_bp, url_prefix='/api/media')
+        app.register_blueprint(uploads_bp, url_prefix='/api/uploads')
         
         print("All blueprints registered successfully!")
         
@@ -72,5 +94,24 @@ def create_app(config_name='default'):
             print("Database tables created successfully!")
         except Exception as e:
             print(f"Error creating database tables: {e}")
+        
+        # Index rows that were written before the indexes existed
+        try:
+            if app.search_service.backfill_if_empty():
+                print("Search index backfilled from existing rants")
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️  Search index backfill failed: {e}")
+        try:
+            from app.services.keyword_index import KeywordIndex
+            if KeywordIndex().backfill_if_empty():
+                print("Keyword index backfilled from existing rants")
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️  Keyword index backfill failed: {e}")
+    
+    # `flask index ...` maintenance commands
+    from app.cli import register_commands
+    register_commands(app)
     
     return app
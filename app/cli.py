@@ -0,0 +1,23 @@
+import click
+from flask.cli import AppGroup
+
+index_cli = AppGroup('index', help='Maintain the search and keyword indexes.')
+
+@index_cli.command('search')
+@click.option('--user-id', type=int, help='Only re-index this user')
+def rebuild_search(user_id):
+    """Re-index every rant and generated content for full-text search"""
+    from flask import current_app
+    current_app.search_service.rebuild_index(user_id)
+    click.echo(f"Search index rebuilt ({current_app.search_service.backend})")
+
+@index_cli.command('keywords')
+@click.option('--user-id', type=int, help='Only re-index this user')
+def rebuild_keywords(user_id):
+    """Rebuild keyword links and per-user counts from the keywords stored on rants"""
+    from app.services.keyword_index import KeywordIndex
+    KeywordIndex().backfill(user_id)
+    click.echo("Keyword index rebuilt")
+
+def register_commands(app):
+    app.cli.add_command(index_cli)
@@ -2,8 +2,15 @@
 from .user import User
 from .rant import Rant, RantType, EmotionType
 from .content import GeneratedContent, SuggestedAction, ContentType, ActionType
+from .search import SearchDocument, SearchPosting
+from .keyword import Keyword, RantKeyword, UserKeywordCount
+from .analysis import RantAnalysis
+from .upload import UploadSession
 
 __all__ = [
     'User', 'Rant', 'RantType', 'EmotionType',
-    'GeneratedContent', 'SuggestedAction', 'ContentType', 'ActionType'
+    'GeneratedContent', 'SuggestedAction', 'ContentType', 'ActionType',
+    'SearchDocument', 'SearchPosting',
+    'Keyword', 'RantKeyword', 'UserKeywordCount', 'RantAnalysis',
+    'UploadSession'
 ]
@@ -0,0 +1,48 @@
+import json
+from datetime import datetime
+from app import db
+
+class RantAnalysis(db.Model):
+    """Stored structured analysis and insight for a rant"""
+    id = db.Column(db.Integer, primary_key=True)
+    rant_id = db.Column(db.Integer, db.ForeignKey('rant.id'), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    
+    # Full analysis as returned by the AI service (JSON string)
+    analysis = db.Column(db.Text, nullable=False)
+    insight = db.Column(db.Text)
+    
+    # Provenance, used to decide when to recompute
+    model_used = db.Column(db.String(100))
+    prompt_version = db.Column(db.String(20))
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def get_analysis(self):
+        """Decode the stored analysis"""
+        try:
+            return json.loads(self.analysis) if self.analysis else {}
+        except (json.JSONDecodeError, TypeError):
+            return {}
+    
+    def set_analysis(self, analysis):
+        """Encode and store an analysis dict"""
+        self.analysis = json.dumps(analysis)
+    
+    def to_dict(self):
+        """Convert analysis to dictionary"""
+        return {
+            'id': self.id,
+            'rant_id': self.rant_id,
+            'analysis': self.get_analysis(),
+            'insight': self.insight,
+            'model_used': self.model_used,
+            'prompt_version': self.prompt_version,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+    
+    def __repr__(self):
+        return f'<RantAnalysis {self.id} for Rant {self.rant_id}>'
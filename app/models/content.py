@@ -1,6 +1,7 @@
 from datetime import datetime
 from enum import Enum
 from app import db
+from app.utils.serialization import model_to_dict
 
 class ContentType(Enum):
     """Types of generated content"""
@@ -53,25 +54,16 @@ class GeneratedContent(db.Model):
     # Relationships
     suggested_actions = db.relationship('SuggestedAction', backref='content', lazy=True)
     
-    def to_dict(self):
-        """Convert content to dictionary"""
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'rant_id': self.rant_id,
-            'content_type': self.content_type.value if self.content_type else None,
-            'title': self.title,
-            'content': self.content,
-            'file_path': self.file_path,
-            'ai_model_used': self.ai_model_used,
-            'processing_time': self.processing_time,
-            'quality_score': self.quality_score,
-            'user_rating': self.user_rating,
-            'is_favorite': self.is_favorite,
-            'shared_count': self.shared_count,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    # Fields exposed through the API, in response order
+    SERIALIZABLE_FIELDS = (
+        'id', 'user_id', 'rant_id', 'content_type', 'title', 'content', 'file_path',
+        'ai_model_used', 'processing_time', 'quality_score', 'user_rating',
+        'is_favorite', 'shared_count', 'created_at', 'updated_at'
+    )
+    
+    def to_dict(self, fields=None):
+        """Convert content to dictionary, optionally limited to a set of fields"""
+        return model_to_dict(self, self.SERIALIZABLE_FIELDS, fields)
     
     def __repr__(self):
         return f'<GeneratedContent {self.id} - {self.content_type.value}>'
@@ -0,0 +1,46 @@
+from app import db
+
+class Keyword(db.Model):
+    """Interned keyword, shared by all rants that mention it"""
+    id = db.Column(db.Integer, primary_key=True)
+    term = db.Column(db.String(100), unique=True, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<Keyword {self.term}>'
+
+class RantKeyword(db.Model):
+    """Link between a rant and one of its extracted keywords"""
+    __tablename__ = 'rant_keyword'
+    
+    rant_id = db.Column(db.Integer, db.ForeignKey('rant.id'), primary_key=True)
+    keyword_id = db.Column(db.Integer, db.ForeignKey('keyword.id'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_rant_keyword_user_keyword', 'user_id', 'keyword_id'),
+    )
+    
+    def __repr__(self):
+        return f'<RantKeyword rant={self.rant_id} keyword={self.keyword_id}>'
+
+class UserKeywordCount(db.Model):
+    """Per-user keyword frequency counter, maintained alongside RantKeyword"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    keyword_id = db.Column(db.Integer, db.ForeignKey('keyword.id'), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    keyword = db.relationship('Keyword', lazy='joined')
+    
+    __table_args__ = (
+        db.Index('ix_user_keyword_count_user_count', 'user_id', 'count'),
+    )
+    
+    def to_dict(self):
+        """Convert counter to dictionary"""
+        return {
+            'keyword': self.keyword.term if self.keyword else None,
+            'count': self.count
+        }
+    
+    def __repr__(self):
+        return f'<UserKeywordCount user={self.user_id} keyword={self.keyword_id} count={self.count}>'
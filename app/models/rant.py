@@ -1,6 +1,7 @@
 from datetime import datetime
 from enum import Enum
 from app import db
+from app.utils.serialization import model_to_dict
 
 class RantType(Enum):
     """Types of rants"""
@@ -47,23 +48,16 @@ class Rant(db.Model):
     # Relationships
     generated_content = db.relationship('GeneratedContent', backref='rant', lazy=True)
     
-    def to_dict(self):
-        """Convert rant to dictionary"""
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'content': self.content,
-            'rant_type': self.rant_type.value if self.rant_type else None,
-            'file_path': self.file_path,
-            'detected_emotion': self.detected_emotion.value if self.detected_emotion else None,
-            'emotion_confidence': self.emotion_confidence,
-            'keywords': self.keywords,
-            'sentiment_score': self.sentiment_score,
-            'processed': self.processed,
-            'processing_status': self.processing_status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'processed_at': self.processed_at.isoformat() if self.processed_at else None
-        }
+    # Fields exposed through the API, in response order
+    SERIALIZABLE_FIELDS = (
+        'id', 'user_id', 'content', 'rant_type', 'file_path', 'detected_emotion',
+        'emotion_confidence', 'keywords', 'sentiment_score', 'processed',
+        'processing_status', 'created_at', 'processed_at'
+    )
+    
+    def to_dict(self, fields=None):
+        """Convert rant to dictionary, optionally limited to a set of fields"""
+        return model_to_dict(self, self.SERIALIZABLE_FIELDS, fields)
     
     def __repr__(self):
         return f'<Rant {self.id} by User {self.user_id}>'
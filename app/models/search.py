@@ -0,0 +1,36 @@
+from datetime import datetime
+from app import db
+
+class SearchDocument(db.Model):
+    """Searchable unit of text: a rant or a piece of generated content"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+
+    # Source row
+    doc_type = db.Column(db.String(20), nullable=False)  # rant, content
+    doc_id = db.Column(db.Integer, nullable=False)
+    rant_id = db.Column(db.Integer, index=True)
+
+    # Filter columns
+    emotion = db.Column(db.String(20))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Token count, used for BM25 length normalization
+    length = db.Column(db.Integer, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('doc_type', 'doc_id', name='uq_search_document_source'),
+        db.Index('ix_search_document_user_created', 'user_id', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f'<SearchDocument {self.doc_type}:{self.doc_id}>'
+
+class SearchPosting(db.Model):
+    """Inverted index posting, used when SQLite FTS5 is not available"""
+    term = db.Column(db.String(64), primary_key=True)
+    document_id = db.Column(db.Integer, db.ForeignKey('search_document.id'), primary_key=True)
+    term_frequency = db.Column(db.Integer, nullable=False, default=1)
+
+    def __repr__(self):
+        return f'<SearchPosting {self.term} -> {self.document_id}>'
@@ -0,0 +1,59 @@
+import uuid
+from datetime import datetime
+from app import db
+
+class UploadSession(db.Model):
+    """A resumable upload: chunks are written in order into one part file on disk"""
+    __tablename__ = 'upload_session'
+
+    id = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+
+    # What is being uploaded
+    kind = db.Column(db.String(20), nullable=False)  # audio, video
+    filename = db.Column(db.String(255))
+    total_size = db.Column(db.BigInteger, nullable=False)
+    chunk_size = db.Column(db.Integer, nullable=False)
+
+    # Progress: bytes received so far and the SHA-256 of every chunk, concatenated as hex
+    received = db.Column(db.BigInteger, nullable=False, default=0)
+    chunk_digests = db.Column(db.Text, nullable=False, default='')
+
+    # Outcome
+    status = db.Column(db.String(20), nullable=False, default='active')  # active, complete, failed
+    stored_path = db.Column(db.String(255))
+    rant_id = db.Column(db.Integer, db.ForeignKey('rant.id'))
+    error = db.Column(db.Text)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    @property
+    def chunk_count(self):
+        return len(self.chunk_digests) // 64
+
+    @property
+    def is_expired(self):
+        return self.status == 'active' and self.expires_at < datetime.utcnow()
+
+    def to_dict(self):
+        """Convert session to dictionary"""
+        return {
+            'upload_id': self.id,
+            'kind': self.kind,
+            'filename': self.filename,
+            'size': self.total_size,
+            'chunk_size': self.chunk_size,
+            'offset': self.received,
+            'chunks_received': self.chunk_count,
+            'status': self.status,
+            'rant_id': self.rant_id,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
+
+    def __repr__(self):
+        return f'<UploadSession {self.id} {self.received}/{self.total_size}>'
@@ -1,9 +1,11 @@
 from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime
 from app import db
-from app.models import Rant, GeneratedContent, ContentType, EmotionType
-from app.services.gemini_service import GeminiService
+from app.models import Rant, GeneratedContent, ContentType, EmotionType, RantAnalysis
+from app.services.gemini_service import GeminiService, ANALYSIS_PROMPT_VERSION
+from app.services.keyword_index import KeywordIndex
 from app.utils.auth import jwt_required, get_current_user
+from app.utils.serialization import parse_fields, deferred_load_options, json_response
 import json
 
 ai_bp = Blueprint('ai', __name__)
@@ -23,6 +25,22 @@ def advanced_analysis(rant_id):
         if not rant:
             return jsonify({'error': 'Rant not found'}), 404
         
+        data = request.get_json(silent=True) or {}
+        refresh = bool(data.get('refresh')) or request.args.get('refresh') in ('1', 'true')
+        
+        # Serve the stored analysis unless a refresh was requested or the prompts changed
+        stored = None if refresh else _current_analysis(rant)
+        if stored and stored.insight:
+            analysis = stored.get_analysis()
+            return jsonify({
+                'message': 'Advanced analysis retrieved successfully',
+                'analysis': analysis,
+                'insights': stored.insight,
+                'recommendations': generate_creative_recommendations(analysis, rant.content),
+                'rant': rant.to_dict(),
+                'cached': True
+            }), 200
+        
         # Initialize enhanced Gemini service
         try:
             from app.services.gemini_service import GeminiService
@@ -31,8 +49,8 @@ def advanced_analysis(rant_id):
             print(f"⚠️  Gemini service initialization error: {service_error}")
             return jsonify({"error": "AI service temporarily unavailable"}), 503
         
-        # Perform comprehensive analysis
-        analysis = gemini_service.analyze_rant(rant)
+        # Perform comprehensive analysis (reusing one stored by process_rant)
+        analysis = stored.get_analysis() if stored else gemini_service.analyze_rant(rant)
         
         # Generate personalized insights
         insights = gemini_service.get_insight(rant)
@@ -40,18 +58,9 @@ def advanced_analysis(rant_id):
         # Create creative recommendations based on analysis
         recommendations = generate_creative_recommendations(analysis, rant.content)
         
-        # Update rant with enhanced analysis
-        emotion_str = analysis.get('emotion', 'neutral')
-        try:
-            rant.detected_emotion = EmotionType(emotion_str.lower())
-        except ValueError:
-            rant.detected_emotion = EmotionType.NEUTRAL
-            
-        rant.emotion_confidence = analysis.get('emotion_confidence', 0.5)
-        rant.sentiment_score = analysis.get('sentiment_score', 0.0)
-        rant.keywords = json.dumps(analysis.get('keywords', []))
+        _apply_analysis(rant, analysis)
         rant.processing_status = 'enhanced_completed'
-        rant.processed = True
+        _store_analysis(rant, gemini_service, analysis, insights)
         
         db.session.commit()
         
@@ -60,7 +69,8 @@ def advanced_analysis(rant_id):
             'analysis': analysis,
             'insights': insights,
             'recommendations': recommendations,
-            'rant': rant.to_dict()
+            'rant': rant.to_dict(),
+            'cached': False
         }), 200
         
     except Exception as e:
@@ -68,6 +78,46 @@ def advanced_analysis(rant_id):
         print(f"❌ Advanced analysis error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def _current_analysis(rant):
+    """The stored analysis of ``rant`` if it was made with the current prompts"""
+    stored = RantAnalysis.query.filter_by(rant_id=rant.id).first()
+    if stored and stored.prompt_version == ANALYSIS_PROMPT_VERSION:
+        return stored
+    return None
+
+def _apply_analysis(rant, analysis):
+    """Copy emotion, sentiment and keywords from an analysis onto the rant"""
+    emotion_str = analysis.get('emotion', 'neutral')
+    try:
+        rant.detected_emotion = EmotionType(emotion_str.lower())
+    except ValueError:
+        rant.detected_emotion = EmotionType.NEUTRAL
+    
+    rant.emotion_confidence = analysis.get('emotion_confidence', 0.5)
+    rant.sentiment_score = analysis.get('sentiment_score', 0.0)
+    # Ensure keywords are stored as a JSON string
+    rant.keywords = json.dumps(analysis.get('keywords', []))
+    KeywordIndex().index_rant(rant, analysis.get('keywords', []))
+    rant.processed = True
+
+def _store_analysis(rant, gemini_service, analysis, insight=None):
+    """Persist the analysis so repeat visits cost no LLM calls.
+
+    Fallback results are not stored: the next request tries Gemini again
+    instead of serving a canned analysis until the prompts change.
+    """
+    if gemini_service.fallback_used:
+        return None
+    stored = RantAnalysis.query.filter_by(rant_id=rant.id).first()
+    if not stored:
+        stored = RantAnalysis(rant_id=rant.id, user_id=rant.user_id)
+        db.session.add(stored)
+    stored.set_analysis(analysis)
+    stored.insight = insight
+    stored.model_used = gemini_service.model_name
+    stored.prompt_version = ANALYSIS_PROMPT_VERSION
+    return stored
+
 def generate_creative_recommendations(analysis, content):
     """Generate creative and personalized recommendations"""
     primary_emotion = analysis.get('emotion', 'neutral')
@@ -158,22 +208,14 @@ def process_rant(rant_id):
             print(f"⚠️  Gemini service initialization error: {service_error}")
             return jsonify({"error": "AI service temporarily unavailable"}), 503
         
-        # Analyze rant
-        analysis = gemini_service.analyze_rant(rant)
+        # Analyze rant, or reuse the stored analysis
+        stored = _current_analysis(rant)
+        analysis = stored.get_analysis() if stored else gemini_service.analyze_rant(rant)
         
-        # Update rant with analysis
-        emotion_str = analysis.get('emotion', 'neutral')
-        try:
-            rant.detected_emotion = EmotionType(emotion_str.lower())
-        except ValueError:
-            rant.detected_emotion = EmotionType.NEUTRAL
-            
-        rant.emotion_confidence = analysis.get('emotion_confidence')
-        rant.sentiment_score = analysis.get('sentiment_score')
-        # Ensure keywords are stored as a JSON string
-        rant.keywords = json.dumps(analysis.get('keywords', []))
+        _apply_analysis(rant, analysis)
         rant.processing_status = 'completed'
-        rant.processed = True
+        if not stored:
+            _store_analysis(rant, gemini_service, analysis)
         
         db.session.commit()
         
@@ -493,16 +535,18 @@ def get_content_history():
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         content_type = request.args.get('type')
+        fields = parse_fields(request.args.get('fields'), GeneratedContent.SERIALIZABLE_FIELDS)
         
-        query = GeneratedContent.query.filter_by(user_id=user.id)
+        query = GeneratedContent.query.options(*deferred_load_options(GeneratedContent, fields))\
+                                      .filter_by(user_id=user.id)
         
         if content_type:
             query = query.filter_by(content_type=ContentType(content_type))
         
         contents = query.order_by(GeneratedContent.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
         
-        return jsonify({
-            'contents': [content.to_dict() for content in contents.items],
+        return json_response({
+            'contents': [content.to_dict(fields) for content in contents.items],
             'total': contents.total,
             'page': page,
             'per_page': per_page,
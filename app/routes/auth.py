@@ -89,8 +89,7 @@ def login():
         
         if user and user.check_password(data['password']):
             login_user(user)
-            user.last_login = datetime.utcnow()
-            db.session.commit()
+            current_app.write_behind.set(user, 'last_login', datetime.utcnow())
             
             token = generate_token(user.id)
             
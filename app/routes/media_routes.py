@@ -1,6 +1,10 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, stream_with_context
 from app.services.professional_media_service import ProfessionalMediaService
-from app.models import Rant, GeneratedContent, ContentType, User
+from app.services.media_store import media_store
+from app.services.upload_store import accepts_upload, upload_store
+from app.services.output_profiles import profile_from_request
+from app.services.audio_synth import resolve_audio_settings
+from app.models import Rant, RantType, GeneratedContent, ContentType, User
 from app import db
 from app.utils.auth import jwt_required, get_current_user
 import logging
@@ -14,16 +18,20 @@ def test_media_endpoint():
         'message': 'Media API is working!',
         'endpoints': [
             '/api/media/upload-audio',
+            '/api/media/upload-video',
             '/api/media/upload-image',
             '/api/media/generate-speech',
+            '/api/media/stream-speech',
             '/api/media/generate-meme',
             '/api/media/generate-video',
+            '/api/media/files/<kind>/<filename>',
             '/api/media/transform-with-ai'
         ]
     })
 
 @media_bp.route('/upload-audio', methods=['POST'])
 @jwt_required
+@accepts_upload('audio')
 def upload_audio():
     """Handle audio file upload and convert to text"""
     try:
@@ -45,10 +53,14 @@ def upload_audio():
         
         if result['success']:
             # Create a new rant from the transcribed text
+            # Keep the original; byte-identical uploads share one stored file
+            stored = upload_store.save(audio_file, 'audio')
             rant = Rant(
                 user_id=user.id,
                 content=result['text'],
+                rant_type=RantType.AUDIO,
                 input_type='audio',
+                file_path=stored.path,
                 processed=False
             )
             db.session.add(rant)
@@ -57,6 +69,8 @@ def upload_audio():
             return jsonify({
                 'message': 'Audio processed successfully',
                 'text': result['text'],
+                'duration': result.get('duration'),
+                'segments': result.get('segments', []),
                 'rant_id': rant.id
             }), 200
         else:
@@ -66,8 +80,57 @@ def upload_audio():
         logging.error(f"Audio upload error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@media_bp.route('/upload-video', methods=['POST'])
+@jwt_required
+@accepts_upload('video')
+def upload_video():
+    """Handle video file upload: transcribe its soundtrack into a new rant"""
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'error': 'User not authenticated'}), 401
+            
+        if 'video' not in request.files:
+            return jsonify({'error': 'No video file provided'}), 400
+        
+        video_file = request.files['video']
+        if video_file.filename == '':
+            return jsonify({'error': 'No file selected'}), 400
+        
+        media_service = ProfessionalMediaService()
+        result = media_service.process_video_file(video_file)
+        
+        if result['success']:
+            # Keep the original; byte-identical uploads share one stored file
+            stored = upload_store.save(video_file, 'video')
+            rant = Rant(
+                user_id=user.id,
+                content=result['text'],
+                rant_type=RantType.VIDEO,
+                input_type='video',
+                file_path=stored.path,
+                processed=False
+            )
+            db.session.add(rant)
+            db.session.commit()
+            
+            return jsonify({
+                'message': 'Video processed successfully',
+                'text': result['text'],
+                'duration': result.get('duration'),
+                'segments': result.get('segments', []),
+                'rant_id': rant.id
+            }), 200
+        else:
+            return jsonify({'error': result['error']}), 400
+            
+    except Exception as e:
+        logging.error(f"Video upload error: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @media_bp.route('/upload-image', methods=['POST'])
 @jwt_required
+@accepts_upload('image')
 def upload_image():
     """Handle image file upload and processing"""
     try:
@@ -86,6 +149,7 @@ def upload_image():
             return jsonify({
                 'message': 'Image processed successfully',
                 'image_data': result['image_data'],
+                'thumbnails': result['thumbnails'],
                 'metadata': result['metadata']
             }), 200
         else:
@@ -109,18 +173,28 @@ def generate_speech(rant_id):
         if not rant:
             return jsonify({'error': 'Rant not found'}), 404
         
-        data = request.get_json() or {}
-        language = data.get('language', 'en')
-        slow = data.get('slow', False)
+        data = request.get_json(silent=True) or {}
+        try:
+            transformation_type, language, settings = _speech_options(rant, data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Generate speech
+        # Generate speech (served from the render cache for repeat requests)
         media_service = ProfessionalMediaService()
-        result = media_service.text_to_speech(rant.content, rant.transformation_type, language)
+        result = current_app.render_cache.fetch(
+            'professional_speech',
+            _speech_cache_inputs(rant, media_service, transformation_type, language, settings),
+            lambda: media_service.text_to_speech(rant.content, transformation_type, language, settings)
+        )
         
         if result['success']:
             return jsonify({
                 'message': 'Speech generated successfully',
-                'audio_data': result['audio_data']
+                'audio_data': result['audio_data'],
+                'audio_url': result.get('audio_url'),
+                'mimetype': result.get('mimetype'),
+                'engine': result.get('engine'),
+                'cached': result['cached']
             }), 200
         else:
             return jsonify({'error': result['error']}), 400
@@ -129,6 +203,81 @@ def generate_speech(rant_id):
         logging.error(f"Speech generation error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@media_bp.route('/stream-speech/<int:rant_id>', methods=['GET', 'POST'])
+@jwt_required
+def stream_speech(rant_id):
+    """Stream speech to the client while it is being synthesized.
+
+    The body is sent with chunked transfer encoding in a progressively
+    playable format (MP3, Ogg/Opus, or WAV with a streaming header), so
+    playback starts with the first voiced sentence. A completed stream is
+    stored and cached, and later requests are served from that file.
+    """
+    try:
+        # Get current user
+        user = get_current_user()
+        if not user:
+            return jsonify({'error': 'User not authenticated'}), 401
+            
+        rant = Rant.query.filter_by(id=rant_id, user_id=user.id).first()
+        if not rant:
+            return jsonify({'error': 'Rant not found'}), 404
+        
+        data = request.get_json(silent=True) or {}
+        try:
+            transformation_type, language, settings = _speech_options(rant, data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        media_service = ProfessionalMediaService()
+        render_cache = current_app.render_cache
+        inputs = _speech_cache_inputs(rant, media_service, transformation_type, language, settings)
+        key = render_cache.key('professional_speech', **inputs)
+        
+        cached = render_cache.get(key) if render_cache.enabled else None
+        if cached:
+            return media_store.send('audio', cached['audio_file'])
+        
+        stream = media_service.speech_stream(rant.content, transformation_type, settings)
+        
+        def on_saved(filename):
+            if render_cache.enabled and stream.engine == inputs['engine']:
+                render_cache.put(key, {'success': True, 'audio_file': filename, 'mimetype': stream.mimetype,
+                                       'chunks': stream.chunk_count, 'engine': stream.engine})
+        
+        body = media_store.tee_stream(stream.chunks, stream.extension, 'audio', on_saved)
+        response = current_app.response_class(stream_with_context(body), mimetype=stream.mimetype)
+        response.headers['Cache-Control'] = 'no-store'
+        response.headers['Accept-Ranges'] = 'none'
+        response.headers['X-Accel-Buffering'] = 'no'  # nginx: pass chunks through unbuffered
+        response.headers['X-Speech-Chunks'] = str(stream.chunk_count)
+        response.headers['X-Speech-Engine'] = stream.engine
+        return response
+        
+    except Exception as e:
+        logging.error(f"Speech streaming error: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+def _speech_options(rant, data):
+    """Transformation type, language and audio settings of a speech request.
+
+    Raises ``ValueError`` for invalid settings or text over ``TTS_MAX_CHARS``.
+    """
+    language = data.get('language') or request.args.get('language', 'en')
+    transformation_type = data.get('transformation_type') or request.args.get('transformation_type', 'poem')
+    settings = resolve_audio_settings(data.get('format') or request.args.get('format'),
+                                      data.get('sample_rate') or request.args.get('sample_rate'))
+    
+    max_chars = current_app.config.get('TTS_MAX_CHARS', 20000)
+    if len(rant.content) > max_chars:
+        raise ValueError(f'Text is too long for speech (max {max_chars} characters)')
+    return transformation_type, language, settings
+
+def _speech_cache_inputs(rant, media_service, transformation_type, language, settings):
+    return {'text': rant.content, 'transformation_type': transformation_type,
+            'language': language, 'engine': media_service.tts_engine,
+            'format': settings.format, 'sample_rate': settings.sample_rate}
+
 @media_bp.route('/generate-meme/<int:rant_id>', methods=['POST'])
 @jwt_required
 def generate_meme(rant_id):
@@ -143,17 +292,33 @@ def generate_meme(rant_id):
         if not rant:
             return jsonify({'error': 'Rant not found'}), 404
         
-        data = request.get_json() or {}
+        data = request.get_json(silent=True) or {}
         template_type = data.get('template_type', 'default')
         
-        # Generate meme
+        # Resolution and encoder: explicit profile/format, else a default for this client
+        try:
+            profile = profile_from_request(request, data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Generate meme (served from the render cache for repeat requests)
         media_service = ProfessionalMediaService()
-        result = media_service.generate_meme_image(rant.content, template_type)
+        result = current_app.render_cache.fetch(
+            'professional_meme',
+            {'text': rant.content, 'template_type': template_type, 'profile': profile.name,
+             'resolution': [profile.width, profile.height], 'format': profile.extension,
+             'options': profile.options},
+            lambda: media_service.generate_meme_image(rant.content, template_type, profile)
+        )
         
         if result['success']:
             return jsonify({
                 'message': 'Meme generated successfully',
-                'image_data': result['image_data']
+                'image_data': result['image_data'],
+                'image_url': result.get('image_url'),
+                'profile': profile.name,
+                'format': profile.extension,
+                'cached': result['cached']
             }), 200
         else:
             return jsonify({'error': result['error']}), 400
@@ -176,18 +341,41 @@ def generate_video(rant_id):
         if not rant:
             return jsonify({'error': 'Rant not found'}), 404
         
-        data = request.get_json() or {}
+        data = request.get_json(silent=True) or {}
         duration = data.get('duration', 10)
         background_color = data.get('background_color', [30, 30, 30])
+        output = data.get('output') or request.args.get('output', 'video')
         
-        # Generate video
         media_service = ProfessionalMediaService()
-        result = media_service.create_video_from_text(rant.content, tuple(background_color), duration)
+        
+        # Scene description: a few KB of JSON the frontend animates itself, no server render
+        if output == 'scene':
+            result = media_service.create_video_scene(rant.content, background_color, duration)
+            if not result['success']:
+                return jsonify({'error': result['error']}), 400
+            return jsonify({
+                'message': 'Scene generated successfully',
+                'output': 'scene',
+                'scene': result['scene']
+            }), 200
+        if output != 'video':
+            return jsonify({'error': "output must be 'video' or 'scene'"}), 400
+        
+        # Generate video (served from the render cache for repeat requests)
+        result = current_app.render_cache.fetch(
+            'professional_video',
+            {'text': rant.content, 'background_color': list(background_color), 'duration': duration,
+             'resolution': media_service.VIDEO_SIZE, 'engine': 'runwayml' if media_service.runwayml_enabled else 'local'},
+            lambda: media_service.create_video_from_text(rant.content, tuple(background_color), duration)
+        )
         
         if result['success']:
             return jsonify({
                 'message': 'Video generated successfully',
-                'video_data': result['video_data']
+                'output': 'video',
+                'video_data': result['video_data'],
+                'metadata': result.get('metadata', {}),
+                'cached': result['cached']
             }), 200
         else:
             return jsonify({'error': result['error']}), 400
@@ -196,6 +384,15 @@ def generate_video(rant_id):
         logging.error(f"Video generation error: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@media_bp.route('/files/<kind>/<path:filename>', methods=['GET'])
+def get_asset(kind, filename):
+    """Serve a generated image, audio clip or video.
+
+    Names are unguessable content hashes, so no auth header is needed for
+    <img>/<audio>/<video> tags.
+    """
+    return media_store.send(kind, filename)
+
 @media_bp.route('/transform-with-ai/<int:rant_id>', methods=['POST'])
 @jwt_required
 def transform_with_ai(rant_id):
@@ -5,10 +5,12 @@ import os
 import json
 from datetime import datetime
 from app import db
-from app.models import Rant, RantType, EmotionType
+from app.models import Rant, RantType, EmotionType, GeneratedContent, RantAnalysis, UploadSession
 from app.services.rant_processor import RantProcessor
+from app.services.keyword_index import KeywordIndex
 from app.utils.validators import validate_rant_data
 from app.utils.auth import jwt_required
+from app.utils.serialization import parse_fields, deferred_load_options, json_response
 
 rant_bp = Blueprint('rant', __name__)
 
@@ -66,13 +68,109 @@ def get_rant_history():
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
+        fields = parse_fields(request.args.get('fields'), Rant.SERIALIZABLE_FIELDS)
         
-        rants = Rant.query.filter_by(user_id=current_user.id)\
+        rants = Rant.query.options(*deferred_load_options(Rant, fields))\
+                          .filter_by(user_id=current_user.id)\
                           .order_by(Rant.created_at.desc())\
                           .paginate(page=page, per_page=per_page, error_out=False)
         
+        return json_response({
+            'rants': [rant.to_dict(fields) for rant in rants.items],
+            'total': rants.total,
+            'page': page,
+            'per_page': per_page,
+            'has_next': rants.has_next,
+            'has_prev': rants.has_prev
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@rant_bp.route('/search', methods=['GET'])
+@jwt_required
+def search_rants():
+    """Full-text search over the user's rants and generated content"""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'error': 'Query parameter q is required'}), 400
+        
+        page = request.args.get('page', 1, type=int)
+        per_page = min(request.args.get('per_page', 20, type=int), 100)
+        emotion = request.args.get('emotion')
+        doc_type = request.args.get('type')  # rant, content
+        
+        if doc_type and doc_type not in ('rant', 'content'):
+            return jsonify({'error': 'type must be rant or content'}), 400
+        
+        try:
+            date_from = datetime.fromisoformat(request.args['from']) if request.args.get('from') else None
+            date_to = datetime.fromisoformat(request.args['to']) if request.args.get('to') else None
+        except ValueError:
+            return jsonify({'error': 'from/to must be ISO 8601 dates'}), 400
+        
+        search_service = current_app.search_service
+        matches = search_service.search(
+            current_user.id, query,
+            emotion=emotion, date_from=date_from, date_to=date_to, doc_type=doc_type,
+            limit=per_page, offset=(page - 1) * per_page
+        )
+        
+        # Load the matched rows in two queries and keep the ranked order
+        rant_ids = [m['doc_id'] for m in matches if m['doc_type'] == 'rant']
+        content_ids = [m['doc_id'] for m in matches if m['doc_type'] == 'content']
+        rants = {r.id: r for r in Rant.query.filter(Rant.id.in_(rant_ids)).all()} if rant_ids else {}
+        contents = {c.id: c for c in GeneratedContent.query.filter(GeneratedContent.id.in_(content_ids)).all()} if content_ids else {}
+        
+        results = []
+        for match in matches:
+            item = rants.get(match['doc_id']) if match['doc_type'] == 'rant' else contents.get(match['doc_id'])
+            if item is None:
+                continue
+            results.append({**match, 'item': item.to_dict()})
+        
+        return json_response({
+            'query': query,
+            'results': results,
+            'page': page,
+            'per_page': per_page,
+            'backend': search_service.backend
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@rant_bp.route('/keywords/top', methods=['GET'])
+@jwt_required
+def get_top_keywords():
+    """Get the user's most frequent keywords"""
+    try:
+        limit = min(request.args.get('limit', 10, type=int), 100)
+        
         return jsonify({
-            'rants': [rant.to_dict() for rant in rants.items],
+            'keywords': KeywordIndex().top_keywords(current_user.id, limit=limit)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@rant_bp.route('/keywords/<string:keyword>', methods=['GET'])
+@jwt_required
+def get_rants_by_keyword(keyword):
+    """Get the user's rants that mention a keyword"""
+    try:
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 10, type=int)
+        fields = parse_fields(request.args.get('fields'), Rant.SERIALIZABLE_FIELDS)
+        
+        rants = KeywordIndex().rants_query(current_user.id, keyword)\
+                              .options(*deferred_load_options(Rant, fields))\
+                              .paginate(page=page, per_page=per_page, error_out=False)
+        
+        return json_response({
+            'keyword': KeywordIndex.normalize(keyword),
+            'rants': [rant.to_dict(fields) for rant in rants.items],
             'total': rants.total,
             'page': page,
             'per_page': per_page,
@@ -108,19 +206,28 @@ def delete_rant(rant_id):
         if not rant:
             return jsonify({'error': 'Rant not found'}), 404
         
-        # Delete associated file if exists
-        if rant.file_path and os.path.exists(rant.file_path):
-            os.remove(rant.file_path)
-        
+        file_path = rant.file_path
+        KeywordIndex().remove_rant(rant)
+        RantAnalysis.query.filter_by(rant_id=rant.id).delete()
+        UploadSession.query.filter_by(rant_id=rant.id).delete()
         db.session.delete(rant)
         db.session.commit()
         
+        # Uploads are deduplicated, so the file may be shared with other rants and sessions
+        if file_path and not _file_referenced(file_path) and os.path.exists(file_path):
+            os.remove(file_path)
+        
         return jsonify({'message': 'Rant deleted successfully'}), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _file_referenced(path):
+    """Whether any rant or upload session still points at a stored file"""
+    return (db.session.query(Rant.query.filter_by(file_path=path).exists()).scalar()
+            or db.session.query(UploadSession.query.filter_by(stored_path=path).exists()).scalar())
+
 @rant_bp.route('/analytics', methods=['GET'])
 @jwt_required
 def get_rant_analytics():
@@ -146,6 +253,9 @@ def get_rant_analytics():
                                  .filter_by(user_id=current_user.id)\
                                  .scalar()
         
+        # Top topics come straight from the keyword counters
+        top_keywords = KeywordIndex().top_keywords(current_user.id, limit=10)
+        
         return jsonify({
             'emotion_distribution': {
                 emotion.value if emotion else 'unknown': count 
@@ -155,6 +265,7 @@ def get_rant_analytics():
                 month: count for month, count in monthly_counts
             },
             'average_sentiment': float(avg_sentiment) if avg_sentiment else 0.0,
+            'top_keywords': top_keywords,
             'total_rants': Rant.query.filter_by(user_id=current_user.id).count()
         }), 200
         
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify, current_app
 from app.services.simple_media_service import SimpleMediaService
+from app.services.upload_store import accepts_upload
 from app.models import Rant, GeneratedContent, ContentType, User
 from app import db
 from app.utils.auth import jwt_required, get_current_user
@@ -24,6 +25,7 @@ def test_media_endpoint():
 
 @media_bp.route('/upload-audio', methods=['POST'])
 @jwt_required
+@accepts_upload('audio')
 def upload_audio():
     """Handle audio file upload and convert to text"""
     try:
@@ -46,7 +48,7 @@ def upload_audio():
                 
             rant = Rant(
                 user_id=current_user.id,
-                content=result['text'],
+                content=result.get('enhanced_text') or result['text'],
                 input_type='audio',
                 processed=False
             )
@@ -55,7 +57,8 @@ def upload_audio():
             
             return jsonify({
                 'message': 'Audio processed successfully',
-                'text': result['text'],
+                'text': rant.content,
+                'transcript': result['text'],
                 'rant_id': rant.id
             }), 200
         else:
@@ -67,6 +70,7 @@ def upload_audio():
 
 @media_bp.route('/upload-image', methods=['POST'])
 @jwt_required
+@accepts_upload('image')
 def upload_image():
     """Handle image file upload and processing"""
     try:
@@ -85,6 +89,7 @@ def upload_image():
             return jsonify({
                 'message': 'Image processed successfully',
                 'image_data': result['image_data'],
+                'thumbnails': result['thumbnails'],
                 'metadata': result['metadata']
             }), 200
         else:
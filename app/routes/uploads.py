@@ -0,0 +1,151 @@
+from flask import Blueprint, request, jsonify
+from app.services.professional_media_service import ProfessionalMediaService
+from app.services.resumable_upload import UploadSessionError, create_session, write_chunk, finalize_session
+from app.models import Rant, RantType, UploadSession
+from app import db
+from app.utils.auth import jwt_required, get_current_user
+import logging
+
+uploads_bp = Blueprint('uploads', __name__)
+
+RANT_TYPES = {'audio': RantType.AUDIO, 'video': RantType.VIDEO}
+
+def _own_session(upload_id, user):
+    return UploadSession.query.filter_by(id=upload_id, user_id=user.id).first()
+
+def _session_error(e, session=None):
+    body = {'error': str(e)}
+    if session is not None:
+        body['offset'] = session.received
+    return jsonify(body), e.status
+
+@uploads_bp.route('', methods=['POST'])
+@jwt_required
+def create_upload():
+    """Start a resumable upload: ``{"kind": "audio"|"video", "filename", "size"}``"""
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'error': 'User not authenticated'}), 401
+
+        data = request.get_json(silent=True) or {}
+        try:
+            session = create_session(user.id, data.get('kind'), data.get('filename'), data.get('size'))
+        except UploadSessionError as e:
+            return _session_error(e)
+
+        return jsonify(session.to_dict()), 201
+
+    except Exception as e:
+        logging.error(f"Upload session error: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@uploads_bp.route('/<upload_id>', methods=['GET'])
+@jwt_required
+def upload_progress(upload_id):
+    """Report how far an upload got; clients resume from ``offset``"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': 'User not authenticated'}), 401
+
+    session = _own_session(upload_id, user)
+    if not session:
+        return jsonify({'error': 'Upload not found'}), 404
+    return jsonify(session.to_dict()), 200
+
+@uploads_bp.route('/<upload_id>', methods=['PUT'])
+@jwt_required
+def upload_chunk(upload_id):
+    """Receive the next chunk as the raw request body.
+
+    The offset comes from the ``Upload-Offset`` header (or ``?offset=``) and
+    must match the session's; ``X-Chunk-SHA256`` optionally verifies it.
+    """
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'error': 'User not authenticated'}), 401
+
+        session = _own_session(upload_id, user)
+        if not session:
+            return jsonify({'error': 'Upload not found'}), 404
+
+        offset = request.headers.get('Upload-Offset', request.args.get('offset'))
+        try:
+            offset = int(offset)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Upload-Offset header is required', 'offset': session.received}), 400
+
+        try:
+            write_chunk(session, offset, request.stream, request.headers.get('X-Chunk-SHA256'))
+        except UploadSessionError as e:
+            return _session_error(e, session)
+
+        return jsonify(session.to_dict()), 200
+
+    except Exception as e:
+        logging.error(f"Upload chunk error: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@uploads_bp.route('/<upload_id>/complete', methods=['POST'])
+@jwt_required
+def complete_upload(upload_id):
+    """Store the finished file and transcribe it into a new rant.
+
+    Retrying after a failure processes the stored file again.
+    """
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'error': 'User not authenticated'}), 401
+
+        session = _own_session(upload_id, user)
+        if not session:
+            return jsonify({'error': 'Upload not found'}), 404
+        if session.status == 'complete':
+            return jsonify(session.to_dict()), 200
+
+        try:
+            stored = finalize_session(session)
+        except UploadSessionError as e:
+            return _session_error(e, session)
+
+        # Hand the stored file to the same pipeline as single-request uploads
+        media_service = ProfessionalMediaService()
+        if session.kind == 'video':
+            result = media_service.process_video_file(stored.path)
+        else:
+            result = media_service.process_audio_file(stored.path)
+
+        if not result['success']:
+            session.status = 'failed'
+            session.error = result['error']
+            db.session.commit()
+            return jsonify({'error': result['error'], **session.to_dict()}), 400
+
+        rant = Rant(
+            user_id=user.id,
+            content=result['text'],
+            rant_type=RANT_TYPES[session.kind],
+            input_type=session.kind,
+            file_path=stored.path,
+            processed=False
+        )
+        db.session.add(rant)
+        db.session.flush()
+        session.rant_id = rant.id
+        session.status = 'complete'
+        session.error = None
+        db.session.commit()
+
+        return jsonify({
+            'message': f'{session.kind.capitalize()} processed successfully',
+            'text': result['text'],
+            'duration': result.get('duration'),
+            'segments': result.get('segments', []),
+            **session.to_dict()
+        }), 200
+
+    except Exception as e:
+        logging.error(f"Upload completion error: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
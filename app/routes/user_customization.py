@@ -1,7 +1,8 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required, current_user
 from app import db
 from app.models import GeneratedContent, SuggestedAction
+from app.utils.serialization import parse_fields, deferred_load_options, json_response
 
 user_bp = Blueprint('user', __name__)
 
@@ -66,13 +67,17 @@ def update_preferences():
 def get_favorites():
     """Get user's favorite content"""
     try:
-        favorites = GeneratedContent.query.filter_by(
+        fields = parse_fields(request.args.get('fields'), GeneratedContent.SERIALIZABLE_FIELDS)
+        
+        favorites = GeneratedContent.query.options(
+            *deferred_load_options(GeneratedContent, fields)
+        ).filter_by(
             user_id=current_user.id,
             is_favorite=True
         ).order_by(GeneratedContent.created_at.desc()).all()
         
-        return jsonify({
-            'favorites': [content.to_dict() for content in favorites]
+        return json_response({
+            'favorites': [content.to_dict(fields) for content in favorites]
         }), 200
         
     except Exception as e:
@@ -122,6 +127,30 @@ def remove_from_favorites(content_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@user_bp.route('/share-content/<int:content_id>', methods=['POST'])
+@login_required
+def share_content(content_id):
+    """Record that content was shared"""
+    try:
+        content = GeneratedContent.query.filter_by(
+            id=content_id,
+            user_id=current_user.id
+        ).first()
+        
+        if not content:
+            return jsonify({'error': 'Content not found'}), 404
+        
+        current_app.write_behind.increment(content, 'shared_count')
+        
+        return jsonify({
+            'message': 'Share recorded',
+            'shared_count': content.shared_count
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @user_bp.route('/rate-content/<int:content_id>', methods=['POST'])
 @login_required
 def rate_content(content_id):
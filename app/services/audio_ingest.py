@@ -0,0 +1,218 @@
+import io
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import wave
+from collections import namedtuple
+
+import numpy as np
+
+from app.utils.helpers import app_config
+
+logger = logging.getLogger(__name__)
+
+FFMPEG_BINARY = shutil.which('ffmpeg')
+
+# Speech recognizers work on 16 kHz mono; anything more is wasted bandwidth and CPU
+INGEST_SAMPLE_RATE = 16000
+
+READ_SIZE = 64 * 1024
+
+# Uploads are untrusted: ffmpeg may open only the input itself (no URLs or other files), and only with
+# the demuxers of accepted upload types, never playlists such as HLS or concat that name further inputs
+INPUT_DEMUXERS = ('wav', 'mp3', 'ogg', 'flac', 'aac', 'mov', 'mp4', 'm4a', 'matroska', 'webm', 'avi')
+SAFE_INPUT_OPTIONS = ['-protocol_whitelist', 'file,pipe', '-format_whitelist', ','.join(INPUT_DEMUXERS)]
+
+class AudioIngestError(ValueError):
+    """The upload is not decodable audio or breaks an ingest limit"""
+
+IngestedAudio = namedtuple('IngestedAudio', 'samples sample_rate duration decoded_duration')
+IngestedAudio.__doc__ = """Normalised upload: int16 mono ``samples`` after silence trimming.
+
+``decoded_duration`` is the length before trimming, in seconds.
+"""
+
+def allowed_format(format_name):
+    """Whether an ffmpeg ``format_name`` (such as ``mov,mp4,m4a,3gp,3g2,mj2``) is an accepted demuxer"""
+    return any(name in INPUT_DEMUXERS for name in (format_name or '').split(','))
+
+def ingest_audio(upload, max_duration=None, sample_rate=INGEST_SAMPLE_RATE, trim=True):
+    """Decode an uploaded file object to trimmed 16 kHz mono PCM in memory.
+
+    ``max_duration`` defaults to ``MAX_AUDIO_DURATION`` and is enforced while
+    decoding, so an over-long upload is rejected without decoding the rest.
+    Raises ``AudioIngestError`` for undecodable or over-long audio. A path
+    is decoded in place with ``ingest_audio_file``.
+    """
+    if isinstance(upload, (str, os.PathLike)):
+        return ingest_audio_file(upload, max_duration, sample_rate, trim)
+    config = app_config()
+    if max_duration is None:
+        max_duration = config.get('MAX_AUDIO_DURATION', 300)
+
+    stream = getattr(upload, 'stream', upload)
+    if FFMPEG_BINARY:
+        samples = decode_stream(stream, sample_rate, max_duration)
+    else:
+        samples = decode_wav(stream, sample_rate, max_duration)
+    return _ingested(samples, sample_rate, config, trim)
+
+def ingest_audio_file(path, max_duration=None, sample_rate=INGEST_SAMPLE_RATE, trim=True):
+    """Like ``ingest_audio`` for a file on disk, which ffmpeg can seek in.
+
+    Only the audio track is decoded (``-vn``), so this also demuxes the
+    soundtrack of a video without decoding any frames.
+    """
+    config = app_config()
+    if max_duration is None:
+        max_duration = config.get('MAX_AUDIO_DURATION', 300)
+    if FFMPEG_BINARY:
+        samples = _decode_pipe(None, sample_rate, max_duration, path=path)
+    else:
+        with open(path, 'rb') as handle:
+            samples = decode_wav(handle, sample_rate, max_duration)
+    return _ingested(samples, sample_rate, config, trim)
+
+def _ingested(samples, sample_rate, config, trim):
+    decoded_duration = len(samples) / sample_rate
+    if trim:
+        samples = trim_silence(samples, sample_rate,
+                               threshold_db=config.get('AUDIO_SILENCE_THRESHOLD_DB', -40))
+    if not len(samples):
+        raise AudioIngestError('The recording is silent')
+    return IngestedAudio(samples, sample_rate, len(samples) / sample_rate, decoded_duration)
+
+def decode_stream(stream, sample_rate=INGEST_SAMPLE_RATE, max_duration=None):
+    """Pipe ``stream`` through ffmpeg into int16 mono PCM without touching disk.
+
+    Containers that need seeking (MP4/M4A with a trailing index) cannot be
+    decoded from a pipe; those are retried once from a temporary file.
+    """
+    start = stream.tell() if stream.seekable() else None
+    try:
+        return _decode_pipe(stream, sample_rate, max_duration)
+    except AudioIngestError as e:
+        if start is None or getattr(e, 'too_long', False):
+            raise
+    stream.seek(start)
+    with tempfile.NamedTemporaryFile(prefix='ingest-') as handle:
+        shutil.copyfileobj(stream, handle, READ_SIZE)
+        handle.flush()
+        return _decode_pipe(None, sample_rate, max_duration, path=handle.name)
+
+def _decode_pipe(stream, sample_rate, max_duration, path=None):
+    max_bytes = int(max_duration * sample_rate) * 2 if max_duration else None
+    command = [
+        FFMPEG_BINARY, '-loglevel', 'error', *SAFE_INPUT_OPTIONS, '-i', path or 'pipe:0',
+        '-vn', '-f', 's16le', '-ac', '1', '-ar', str(sample_rate), 'pipe:1',
+    ]
+    process = subprocess.Popen(command, stdin=subprocess.DEVNULL if path else subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def feed():
+        try:
+            while True:
+                chunk = stream.read(READ_SIZE)
+                if not chunk:
+                    break
+                process.stdin.write(chunk)
+        except (BrokenPipeError, ValueError):
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+    feeder = None
+    if not path:
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+
+    pcm = bytearray()
+    too_long = False
+    try:
+        while True:
+            chunk = process.stdout.read1(READ_SIZE)
+            if not chunk:
+                break
+            pcm += chunk
+            if max_bytes is not None and len(pcm) > max_bytes:
+                too_long = True
+                break
+    finally:
+        if too_long:
+            process.kill()
+        returncode = process.wait()
+        errors = process.stderr.read().decode(errors='replace').strip()
+        if feeder:
+            feeder.join()
+        process.stdout.close()
+        process.stderr.close()
+
+    if too_long:
+        error = AudioIngestError(f'Audio is longer than the {max_duration:g} second limit')
+        error.too_long = True
+        raise error
+    if returncode != 0 or not pcm:
+        logger.info(f"ffmpeg could not decode upload ({returncode}): {errors}")
+        raise AudioIngestError('Unsupported or corrupt audio file')
+    return np.frombuffer(bytes(pcm[:len(pcm) - len(pcm) % 2]), dtype='<i2')
+
+def decode_wav(stream, sample_rate=INGEST_SAMPLE_RATE, max_duration=None):
+    """Fallback without ffmpeg: read 16-bit PCM WAV in memory, downmix and resample"""
+    try:
+        with wave.open(io.BytesIO(stream.read())) as reader:
+            channels = reader.getnchannels()
+            width = reader.getsampwidth()
+            source_rate = reader.getframerate()
+            # Streamed WAVs declare an unknown length, so count what is actually read
+            limit = int(max_duration * source_rate) + 1 if max_duration else reader.getnframes()
+            data = reader.readframes(limit)
+    except (wave.Error, EOFError):
+        raise AudioIngestError('Only WAV uploads can be decoded without ffmpeg')
+    if max_duration and len(data) // (width * channels) > max_duration * source_rate:
+        error = AudioIngestError(f'Audio is longer than the {max_duration:g} second limit')
+        error.too_long = True
+        raise error
+    if width != 2:
+        raise AudioIngestError('Only 16-bit WAV uploads can be decoded without ffmpeg')
+
+    samples = np.frombuffer(data, dtype='<i2').astype(np.float32)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if source_rate != sample_rate and len(samples):
+        target = np.arange(int(len(samples) * sample_rate / source_rate)) * (source_rate / sample_rate)
+        samples = np.interp(target, np.arange(len(samples)), samples)
+    return np.clip(samples, -32768, 32767).astype('<i2')
+
+def trim_silence(samples, sample_rate=INGEST_SAMPLE_RATE, threshold_db=-40, frame_ms=20, pad_ms=150):
+    """Drop leading and trailing frames whose RMS is below ``threshold_db`` dBFS"""
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    count = len(samples) // frame
+    if not count:
+        return samples
+
+    frames = samples[:count * frame].astype(np.float32).reshape(count, frame) / 32768
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    loud = np.flatnonzero(rms > 10 ** (threshold_db / 20))
+    if not len(loud):
+        return samples[:0]
+
+    pad = int(sample_rate * pad_ms / 1000)
+    start = max(0, loud[0] * frame - pad)
+    end = min(len(samples), (loud[-1] + 1) * frame + pad)
+    return samples[start:end]
+
+def to_wav_bytes(audio):
+    """Ingested audio as an in-memory 16-bit WAV"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(audio.sample_rate)
+        writer.writeframes(audio.samples.tobytes())
+    return buffer.getvalue()
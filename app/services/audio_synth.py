@@ -0,0 +1,199 @@
+import shutil
+import struct
+import subprocess
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from app.services.media_store import media_store
+from app.utils.helpers import app_config
+
+FFMPEG_BINARY = shutil.which('ffmpeg')
+
+SAMPLE_RATES = (16000, 22050, 44100)
+DEFAULT_SAMPLE_RATE = 22050
+DEFAULT_AUDIO_FORMAT = 'mp3'
+
+# Samples per synthesized block; the only audio buffer held per request
+BLOCK_SIZE = 8192
+
+# Format -> ffmpeg codec arguments and container (None = raw PCM WAV written here)
+AUDIO_FORMATS = {
+    'wav': {'codec': None, 'container': None, 'extension': 'wav', 'mimetype': 'audio/wav'},
+    'mp3': {'codec': ['-c:a', 'libmp3lame', '-b:a', '64k'], 'container': 'mp3',
+            'extension': 'mp3', 'mimetype': 'audio/mpeg'},
+    'opus': {'codec': ['-c:a', 'libopus', '-b:a', '32k'], 'container': 'ogg',
+             'extension': 'ogg', 'mimetype': 'audio/ogg'},
+}
+
+AudioSettings = namedtuple('AudioSettings', 'format sample_rate extension mimetype')
+
+def ffmpeg_available():
+    return bool(FFMPEG_BINARY)
+
+def resolve_audio_settings(audio_format=None, sample_rate=None, config=None):
+    """Validate the requested format and sample rate, filling gaps from ``SYNTH_*`` settings.
+
+    Compressed formats need ffmpeg; without it the output falls back to WAV.
+    Raises ``ValueError`` for unknown formats or unsupported sample rates.
+    """
+    config = app_config(config)
+
+    audio_format = str(audio_format or config.get('SYNTH_AUDIO_FORMAT', DEFAULT_AUDIO_FORMAT)).lower()
+    if audio_format not in AUDIO_FORMATS:
+        raise ValueError(f"Unknown audio format '{audio_format}'. Choose from: {', '.join(AUDIO_FORMATS)}")
+    if AUDIO_FORMATS[audio_format]['codec'] and not FFMPEG_BINARY:
+        audio_format = 'wav'
+
+    try:
+        sample_rate = int(sample_rate or config.get('SYNTH_SAMPLE_RATE', DEFAULT_SAMPLE_RATE))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid sample rate: {sample_rate}")
+    if sample_rate not in SAMPLE_RATES:
+        raise ValueError(f"Unsupported sample rate {sample_rate}. Choose from: {', '.join(map(str, SAMPLE_RATES))}")
+
+    spec = AUDIO_FORMATS[audio_format]
+    return AudioSettings(audio_format, sample_rate, spec['extension'], spec['mimetype'])
+
+def sample_count(duration, sample_rate):
+    return int(sample_rate * duration)
+
+def synthesize_tones(duration, sample_rate, partials, tremolo=None, decay=None, gain=1.0,
+                     block_size=BLOCK_SIZE):
+    """Yield float32 blocks of a sum of sine partials.
+
+    ``partials`` is a list of ``(frequency, amplitude, phase)``; ``tremolo`` is
+    ``(rate_hz, depth)`` and ``decay`` an exponential time constant in seconds.
+    Phases are wrapped per block, so float32 stays accurate for long clips.
+    """
+    total = sample_count(duration, sample_rate)
+    two_pi = 2 * np.pi
+    offsets = np.arange(block_size, dtype=np.float32) / np.float32(sample_rate)
+    scratch = np.empty(block_size, dtype=np.float32)
+
+    for start in range(0, total, block_size):
+        n = min(block_size, total - start)
+        t0 = start / sample_rate
+        local = offsets[:n]
+        block = np.zeros(n, dtype=np.float32)
+        wave = scratch[:n]
+
+        for frequency, amplitude, phase in partials:
+            np.multiply(local, np.float32(two_pi * frequency), out=wave)
+            wave += np.float32((two_pi * frequency * t0 + phase) % two_pi)
+            np.sin(wave, out=wave)
+            wave *= np.float32(amplitude)
+            block += wave
+
+        if tremolo:
+            rate, depth = tremolo
+            np.multiply(local, np.float32(two_pi * rate), out=wave)
+            wave += np.float32((two_pi * rate * t0) % two_pi)
+            np.sin(wave, out=wave)
+            wave *= np.float32(depth)
+            wave += np.float32(1)
+            block *= wave
+
+        if decay:
+            np.add(local, np.float32(t0), out=wave)
+            wave *= np.float32(-1 / decay)
+            np.exp(wave, out=wave)
+            block *= wave
+
+        if gain != 1.0:
+            block *= np.float32(gain)
+        yield block
+
+def pcm16(block):
+    """Float32 samples in [-1, 1] as little-endian 16-bit PCM bytes"""
+    return (np.clip(block, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+
+def wav_header(sample_rate, num_samples=None, channels=1):
+    """Header for 16-bit PCM; unknown lengths use the 0xFFFFFFFF streaming convention"""
+    block_align = channels * 2
+    data_size = num_samples * block_align if num_samples is not None else 0xFFFFFFFF - 36
+    return b''.join((
+        b'RIFF', struct.pack('<L', min(36 + data_size, 0xFFFFFFFF)), b'WAVE',
+        b'fmt ', struct.pack('<LHHLLHH', 16, 1, channels, sample_rate, sample_rate * block_align,
+                             block_align, 16),
+        b'data', struct.pack('<L', data_size),
+    ))
+
+def encode_audio(blocks, sample_rate, audio_format='wav', num_samples=None):
+    """Yield encoded bytes for an iterable of float32 blocks.
+
+    WAV is framed here; MP3 and Opus are encoded by an ``ffmpeg`` subprocess
+    fed from a background thread, so output chunks are yielded as soon as
+    the encoder produces them.
+    """
+    spec = AUDIO_FORMATS[audio_format]
+    if spec['codec'] is None:
+        yield wav_header(sample_rate, num_samples)
+        for block in blocks:
+            yield pcm16(block)
+        return
+
+    if not FFMPEG_BINARY:
+        raise RuntimeError(f"ffmpeg is required to encode {audio_format}")
+
+    command = [
+        FFMPEG_BINARY, '-loglevel', 'error',
+        '-f', 's16le', '-ar', str(sample_rate), '-ac', '1', '-i', 'pipe:0',
+        *spec['codec'], '-flush_packets', '1', '-f', spec['container'], 'pipe:1',
+    ]
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    feed_errors = []
+
+    def feed():
+        try:
+            for block in blocks:
+                process.stdin.write(pcm16(block))
+        except BrokenPipeError:
+            pass
+        except Exception as e:
+            feed_errors.append(e)
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    try:
+        while True:
+            chunk = process.stdout.read1(64 * 1024)
+            if not chunk:
+                break
+            yield chunk
+        feeder.join()
+        returncode = process.wait()
+        if feed_errors:
+            raise feed_errors[0]
+        if returncode != 0:
+            errors = process.stderr.read().decode(errors='replace').strip()
+            raise RuntimeError(f"ffmpeg failed ({returncode}): {errors}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        feeder.join()
+        process.stdout.close()
+        process.stderr.close()
+
+def decode_audio(data, sample_rate):
+    """Decode encoded audio bytes (e.g. MP3) to mono float32 samples at ``sample_rate``"""
+    if not FFMPEG_BINARY:
+        raise RuntimeError('ffmpeg is required to decode audio')
+    command = [FFMPEG_BINARY, '-loglevel', 'error', '-i', 'pipe:0',
+               '-f', 'f32le', '-ac', '1', '-ar', str(sample_rate), 'pipe:1']
+    result = subprocess.run(command, input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg could not decode audio: {result.stderr.decode(errors='replace').strip()}")
+    return np.frombuffer(result.stdout, dtype='<f4').astype(np.float32)
+
+def save_audio(blocks, settings, num_samples=None):
+    """Encode blocks straight into the media store; returns the filename"""
+    return media_store.save_stream(encode_audio(blocks, settings.sample_rate, settings.format, num_samples),
+                                   settings.extension, 'audio')
@@ -0,0 +1,65 @@
+"""Vectorized background rendering shared by the media services.
+
+Every background is built as a NumPy array in one operation (instead of one
+``draw.line`` call per row) and converted to a PIL image at the end. Static
+backgrounds are cached per scheme and resolution.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image
+
+def linear_gradient(width, height, top, bottom):
+    """Vertical gradient from ``top`` to ``bottom`` as an (H, W, 3) uint8 array"""
+    ratio = (np.arange(height, dtype=np.float32) / height)[:, None]
+    rows = np.asarray(top, dtype=np.float32) * (1 - ratio) + np.asarray(bottom, dtype=np.float32) * ratio
+    return _expand_rows(rows, width)
+
+def wave_gradient(width, height, base_color, offset=0, amplitude=30, frequency=0.01, boost=(0, 0, 20)):
+    """Horizontal bands modulated by a sine wave down the image.
+
+    ``offset`` shifts the wave vertically, which is how the video renderers
+    animate it. Render ``height + max_offset`` rows once and slice per frame
+    instead of calling this for every frame.
+    """
+    y = np.arange(height, dtype=np.float32) + offset
+    wave = (np.sin(y * frequency) * amplitude).astype(np.int32)[:, None]
+    rows = np.asarray(base_color, dtype=np.int32) + np.asarray(boost, dtype=np.int32) + wave
+    return _expand_rows(np.clip(rows, 0, 255), width)
+
+def stripe_overlay(array, base_color, phase, step=20, amplitude=50, frequency=0.1):
+    """Draw one-pixel stripes every ``step`` rows whose brightness pulses with ``phase``"""
+    rows = np.arange(0, array.shape[0], step)
+    lift = (amplitude * (1 + np.sin(phase + rows * frequency))).astype(np.int32)[:, None]
+    colors = np.clip(np.asarray(base_color, dtype=np.int32) + lift, 0, 255).astype(np.uint8)
+    array[rows] = colors[:, None, :]
+    return array
+
+def diagonal_accents(array, color, spacing=100, line_width=2):
+    """Overlay parallel diagonal lines (x + y constant) every ``spacing`` pixels"""
+    height, width = array.shape[:2]
+    diagonal = np.arange(height)[:, None] + np.arange(width)[None, :]
+    array[(diagonal % spacing) < line_width] = np.asarray(color[:3], dtype=np.uint8)
+    return array
+
+def to_image(array):
+    """Convert an (H, W, 3) uint8 array to a PIL RGB image"""
+    return Image.fromarray(np.ascontiguousarray(array), 'RGB')
+
+def gradient_background(width, height, top, bottom, accent=None, accent_spacing=100):
+    """Cached gradient (optionally with diagonal accents); returns a fresh copy to draw on"""
+    return _cached_gradient(width, height, tuple(top), tuple(bottom),
+                            tuple(accent) if accent else None, accent_spacing).copy()
+
+@lru_cache(maxsize=32)
+def _cached_gradient(width, height, top, bottom, accent, accent_spacing):
+    array = linear_gradient(width, height, top, bottom)
+    if accent:
+        diagonal_accents(array, accent, spacing=accent_spacing)
+    return to_image(array)
+
+def _expand_rows(rows, width):
+    """Broadcast per-row colors across the image width"""
+    rows = rows.astype(np.uint8)
+    return np.repeat(rows[:, None, :], width, axis=1)
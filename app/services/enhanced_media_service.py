@@ -1,16 +1,46 @@
 import os
-import io
-import base64
-from PIL import Image, ImageDraw, ImageFont
+from PIL import ImageDraw
 import tempfile
 import logging
-from werkzeug.utils import secure_filename
-import json
 import requests
 import wave
-import struct
 import numpy as np
 
+from app.services.audio_synth import resolve_audio_settings, sample_count, save_audio, synthesize_tones
+from app.services.backgrounds import gradient_background, stripe_overlay
+from app.services.font_registry import get_font, text_width, wrap_text
+from app.services.frame_compositor import FrameCompositor
+from app.services.frame_scheduler import FrameScheduler
+from app.services.image_ingest import ingest_image, preview_url, thumbnail_urls
+from app.services.media_store import media_store
+from app.services.upload_store import upload_store
+from app.services.text_effects import TextStyle
+from app.services.video_encoder import VideoEncoder, encoder_available, video_url
+
+class StripeFrameRenderer:
+    """Renders one frame of the striped text animation; built once per render worker"""
+    
+    def __init__(self, background, text, width, height, total_frames, background_color):
+        self.total_frames = total_frames
+        self.background_color = background_color
+        self.word_count = len(text.split())
+        
+        # Static background, text layout and outlined line sprites are prepared once
+        self.base_array = np.empty((height, width, 3), dtype=np.uint8)
+        self.base_array[:] = background_color
+        self.compositor = FrameCompositor(width, height, text, font_size=48, line_height=60,
+                                          margin=50, stroke_width=2)
+    
+    def __call__(self, frame_num):
+        # Animated background stripes
+        time_ratio = frame_num / self.total_frames
+        frame_array = self.base_array.copy()
+        stripe_overlay(frame_array, self.background_color, time_ratio * 2 * np.pi)
+        
+        # Add text with animation
+        words_to_show = int(time_ratio * self.word_count) + 1
+        return self.compositor.compose(words_to_show, background=frame_array)
+
 class SimpleMediaService:
     """Enhanced media service with real functionality"""
     
@@ -29,13 +59,11 @@ class SimpleMediaService:
     def process_audio_file(self, audio_file):
         """Process audio file with enhanced mock transcription"""
         try:
-            # Save the uploaded file
-            filename = secure_filename(audio_file.filename)
-            filepath = os.path.join(self.upload_folder, filename)
-            audio_file.save(filepath)
+            # Store once under its content hash; identical uploads share a file
+            stored = upload_store.save(audio_file, 'audio')
             
             # Enhanced mock transcription based on file size and type
-            file_size = os.path.getsize(filepath)
+            file_size = stored.size
             
             # Different mock responses based on file characteristics
             if file_size < 50000:  # Small file
@@ -61,9 +89,6 @@ class SimpleMediaService:
             import random
             text = random.choice(mock_responses)
             
-            # Clean up temporary file
-            os.remove(filepath)
-            
             return {
                 'success': True,
                 'text': text,
@@ -81,17 +106,9 @@ class SimpleMediaService:
     def process_image_file(self, image_file):
         """Process uploaded image file with enhanced analysis"""
         try:
-            filename = secure_filename(image_file.filename)
-            filepath = os.path.join(self.upload_folder, filename)
-            image_file.save(filepath)
-            
-            # Open and process image
-            image = Image.open(filepath)
-            
-            # Enhanced image analysis
-            width, height = image.size
-            format = image.format
-            mode = image.mode
+            # Store once; decode only at preview size for thumbnails and colour stats
+            image = ingest_image(image_file)
+            width, height = image.width, image.height
             
             # Analyze image characteristics for context
             aspect_ratio = width / height
@@ -99,24 +116,18 @@ class SimpleMediaService:
             is_portrait = aspect_ratio < 0.7
             is_square = 0.8 <= aspect_ratio <= 1.2
             
-            # Convert to base64 for frontend display
-            buffered = io.BytesIO()
-            image.save(buffered, format=format or 'JPEG')
-            img_str = base64.b64encode(buffered.getvalue()).decode()
-            
-            # Clean up
-            os.remove(filepath)
-            
             return {
                 'success': True,
-                'image_data': f"data:image/{format.lower()};base64,{img_str}",
+                'image_data': preview_url(image),
+                'thumbnails': thumbnail_urls(image),
                 'metadata': {
                     'width': width,
                     'height': height,
-                    'format': format,
-                    'mode': mode,
+                    'format': image.format,
+                    'mode': image.mode,
                     'aspect_ratio': aspect_ratio,
-                    'orientation': 'landscape' if is_landscape else 'portrait' if is_portrait else 'square'
+                    'orientation': 'landscape' if is_landscape else 'portrait' if is_portrait else 'square',
+                    **image.stats
                 },
                 'message': 'Image processed successfully with enhanced analysis'
             }
@@ -150,12 +161,14 @@ class SimpleMediaService:
                 response = requests.get(tts_url, params=params, headers=headers, timeout=10)
                 
                 if response.status_code == 200:
-                    audio_data = response.content
-                    audio_base64 = base64.b64encode(audio_data).decode()
+                    filename = media_store.save_bytes(response.content, 'mp3', 'audio')
+                    audio_url = media_store.url('audio', filename)
                     
                     return {
                         'success': True,
-                        'audio_data': f"data:audio/mp3;base64,{audio_base64}",
+                        'audio_data': audio_url,
+                        'audio_url': audio_url,
+                        'audio_file': filename,
                         'message': f'Text-to-speech generated successfully - Language: {language}'
                     }
                 
@@ -163,12 +176,15 @@ class SimpleMediaService:
                 self.logger.warning(f"Online TTS failed: {e}")
                 
             # Fall back to creating a more realistic mock audio
-            # Generate a longer, more realistic mock audio base64
-            mock_audio_base64 = self._generate_mock_audio(text, language)
+            filename, settings = self._generate_mock_audio(text, language)
+            audio_url = media_store.url('audio', filename)
             
             return {
                 'success': True,
-                'audio_data': f"data:audio/mp3;base64,{mock_audio_base64}",
+                'audio_data': audio_url,
+                'audio_url': audio_url,
+                'audio_file': filename,
+                'mimetype': settings.mimetype,
                 'message': f'Text-to-speech generated (enhanced mock) - Language: {language}, Slow: {slow}'
             }
             
@@ -181,43 +197,14 @@ class SimpleMediaService:
             }
     
     def _generate_mock_audio(self, text, language='en'):
-        """Generate a more realistic mock audio file"""
-        # Create a simple WAV file with sine wave tones
-        sample_rate = 22050
+        """Synthesize a mock tone and store it; returns (filename, settings)"""
+        settings = resolve_audio_settings()
         duration = min(len(text) * 0.05, 30)  # Max 30 seconds
         
-        # Generate sine wave
-        t = np.linspace(0, duration, int(sample_rate * duration))
-        frequency = 440  # A4 note
-        audio_data = np.sin(2 * np.pi * frequency * t) * 0.3
-        
-        # Convert to 16-bit integers
-        audio_data = (audio_data * 32767).astype(np.int16)
-        
-        # Create WAV file in memory
-        wav_buffer = io.BytesIO()
-        
-        # Write WAV header
-        wav_buffer.write(b'RIFF')
-        wav_buffer.write(struct.pack('<L', 36 + len(audio_data) * 2))
-        wav_buffer.write(b'WAVE')
-        wav_buffer.write(b'fmt ')
-        wav_buffer.write(struct.pack('<L', 16))
-        wav_buffer.write(struct.pack('<H', 1))  # PCM
-        wav_buffer.write(struct.pack('<H', 1))  # Mono
-        wav_buffer.write(struct.pack('<L', sample_rate))
-        wav_buffer.write(struct.pack('<L', sample_rate * 2))
-        wav_buffer.write(struct.pack('<H', 2))
-        wav_buffer.write(struct.pack('<H', 16))
-        wav_buffer.write(b'data')
-        wav_buffer.write(struct.pack('<L', len(audio_data) * 2))
-        wav_buffer.write(audio_data.tobytes())
-        
-        # Convert to base64
-        wav_buffer.seek(0)
-        audio_base64 = base64.b64encode(wav_buffer.read()).decode()
-        
-        return audio_base64
+        # A4 sine tone, synthesized in blocks and encoded as it is produced
+        blocks = synthesize_tones(duration, settings.sample_rate, [(440, 0.3, 0)])
+        filename = save_audio(blocks, settings, sample_count(duration, settings.sample_rate))
+        return filename, settings
     
     def generate_meme_image(self, text, template_type='default'):
         """Generate enhanced meme image with better design"""
@@ -225,10 +212,6 @@ class SimpleMediaService:
             # Create a larger, better quality image
             width, height = 1200, 800
             
-            # Create image with better gradient background
-            image = Image.new('RGB', (width, height))
-            draw = ImageDraw.Draw(image)
-            
             # Different color schemes based on template type
             if template_type == 'comedy':
                 # Yellow/orange gradient for comedy
@@ -243,13 +226,9 @@ class SimpleMediaService:
                 color1 = (103, 58, 183)
                 color2 = (233, 30, 99)
             
-            # Create gradient background
-            for i in range(height):
-                ratio = i / height
-                r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
-                g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
-                b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
-                draw.line([(0, i), (width, i)], fill=(r, g, b))
+            # Create gradient background (cached per scheme and size)
+            image = gradient_background(width, height, color1, color2)
+            draw = ImageDraw.Draw(image)
             
             # Add decorative elements
             # Add some circles for visual interest
@@ -261,83 +240,44 @@ class SimpleMediaService:
                            fill=None, outline=(255, 255, 255, 50), width=2)
             
             # Prepare text with better word wrapping
-            try:
-                # Try to use a better font
-                font_large = ImageFont.truetype("arial.ttf", 60)
-                font_medium = ImageFont.truetype("arial.ttf", 40)
-            except:
-                # Fall back to default font
-                font_large = ImageFont.load_default()
-                font_medium = ImageFont.load_default()
+            medium_size = 40
+            font_medium = get_font(medium_size)
             
             # Smart text wrapping
-            words = text.split()
-            lines = []
-            current_line = []
-            max_width = width - 100
-            
-            for word in words:
-                test_line = ' '.join(current_line + [word])
-                bbox = draw.textbbox((0, 0), test_line, font=font_medium)
-                if bbox[2] - bbox[0] > max_width and current_line:
-                    lines.append(' '.join(current_line))
-                    current_line = [word]
-                else:
-                    current_line.append(word)
-            
-            if current_line:
-                lines.append(' '.join(current_line))
+            lines = wrap_text(text, medium_size, width - 100)
             
             # Limit to reasonable number of lines
             if len(lines) > 8:
                 lines = lines[:7] + ['...']
             
-            # Draw text with better styling
+            # Draw text with better styling (single-pass stroke outline)
             total_height = len(lines) * 70
             start_y = (height - total_height) // 2
+            text_style = TextStyle(fill=(255, 255, 255), stroke_width=3, stroke_fill=(0, 0, 0))
             
             for i, line in enumerate(lines):
-                bbox = draw.textbbox((0, 0), line, font=font_medium)
-                text_width = bbox[2] - bbox[0]
-                x = (width - text_width) // 2
+                x = (width - int(text_width(line, medium_size))) // 2
                 y = start_y + i * 70
-                
-                # Draw text with better outline
-                outline_color = (0, 0, 0)
-                text_color = (255, 255, 255)
-                
-                # Multiple outline passes for better visibility
-                for dx in [-3, -2, -1, 0, 1, 2, 3]:
-                    for dy in [-3, -2, -1, 0, 1, 2, 3]:
-                        if dx != 0 or dy != 0:
-                            draw.text((x + dx, y + dy), line, font=font_medium, fill=outline_color)
-                
-                draw.text((x, y), line, font=font_medium, fill=text_color)
+                text_style.draw(image, (x, y), line, font_medium)
             
             # Add template type indicator
             indicator_text = f"✨ {template_type.upper()} ✨"
-            bbox = draw.textbbox((0, 0), indicator_text, font=font_medium)
-            indicator_width = bbox[2] - bbox[0]
+            indicator_width = int(text_width(indicator_text, medium_size))
             indicator_x = (width - indicator_width) // 2
             indicator_y = 50
             
             # Draw indicator with outline
-            for dx in [-2, -1, 0, 1, 2]:
-                for dy in [-2, -1, 0, 1, 2]:
-                    if dx != 0 or dy != 0:
-                        draw.text((indicator_x + dx, indicator_y + dy), indicator_text, 
-                                font=font_medium, fill=(0, 0, 0))
+            indicator_style = TextStyle(fill=(255, 255, 255), stroke_width=2, stroke_fill=(0, 0, 0))
+            indicator_style.draw(image, (indicator_x, indicator_y), indicator_text, font_medium)
             
-            draw.text((indicator_x, indicator_y), indicator_text, font=font_medium, fill=(255, 255, 255))
-            
-            # Convert to base64
-            buffered = io.BytesIO()
-            image.save(buffered, format='PNG', quality=95)
-            img_str = base64.b64encode(buffered.getvalue()).decode()
+            filename = media_store.save_image(image, 'PNG')
+            image_url = media_store.url('images', filename)
             
             return {
                 'success': True,
-                'image_data': f"data:image/png;base64,{img_str}",
+                'image_data': image_url,
+                'image_url': image_url,
+                'image_file': filename,
                 'message': f'Enhanced {template_type} meme generated successfully'
             }
             
@@ -350,103 +290,44 @@ class SimpleMediaService:
             }
     
     def create_video_from_text(self, text, background_color=(30, 30, 30), duration=10):
-        """Create a simple video-like animation using image frames"""
+        """Create a simple text animation and encode it to a video file"""
+        encoder = None
         try:
-            # Create a series of images that simulate video frames
+            if not encoder_available():
+                return {
+                    'success': False,
+                    'error': 'Video encoding not available',
+                    'message': 'Install ffmpeg or opencv-python to generate videos'
+                }
+            
             width, height = 1280, 720
             fps = 24
             total_frames = int(fps * duration)
             
-            # Prepare text for animation
-            words = text.split()
+            # Frames are rendered across the render pool and streamed into the encoder in order
+            encoder = VideoEncoder(width, height, fps=fps)
+            encoder.open()
             
-            # Create animated frames
-            frames = []
-            for frame_num in range(min(total_frames, 100)):  # Limit frames for performance
-                # Create frame
-                frame = Image.new('RGB', (width, height), background_color)
-                draw = ImageDraw.Draw(frame)
-                
-                # Add animated background
-                time_ratio = frame_num / total_frames
-                for i in range(0, height, 20):
-                    alpha = int(50 * (1 + np.sin(time_ratio * 2 * np.pi + i * 0.1)))
-                    color = (background_color[0] + alpha, background_color[1] + alpha, background_color[2] + alpha)
-                    draw.line([(0, i), (width, i)], fill=color)
-                
-                # Add text with animation
-                if words:
-                    words_to_show = int((frame_num / total_frames) * len(words)) + 1
-                    current_text = ' '.join(words[:words_to_show])
-                    
-                    # Text positioning and styling
-                    try:
-                        font = ImageFont.truetype("arial.ttf", 48)
-                    except:
-                        font = ImageFont.load_default()
-                    
-                    # Word wrap
-                    lines = []
-                    current_line = []
-                    max_width = width - 100
-                    
-                    for word in current_text.split():
-                        test_line = ' '.join(current_line + [word])
-                        bbox = draw.textbbox((0, 0), test_line, font=font)
-                        if bbox[2] - bbox[0] > max_width and current_line:
-                            lines.append(' '.join(current_line))
-                            current_line = [word]
-                        else:
-                            current_line.append(word)
-                    
-                    if current_line:
-                        lines.append(' '.join(current_line))
-                    
-                    # Draw text
-                    total_text_height = len(lines) * 60
-                    start_y = (height - total_text_height) // 2
-                    
-                    for i, line in enumerate(lines):
-                        bbox = draw.textbbox((0, 0), line, font=font)
-                        text_width = bbox[2] - bbox[0]
-                        x = (width - text_width) // 2
-                        y = start_y + i * 60
-                        
-                        # Draw with outline
-                        for dx in [-2, -1, 0, 1, 2]:
-                            for dy in [-2, -1, 0, 1, 2]:
-                                if dx != 0 or dy != 0:
-                                    draw.text((x + dx, y + dy), line, font=font, fill=(0, 0, 0))
-                        
-                        draw.text((x, y), line, font=font, fill=(255, 255, 255))
-                
-                # Convert frame to base64
-                buffered = io.BytesIO()
-                frame.save(buffered, format='PNG')
-                frame_b64 = base64.b64encode(buffered.getvalue()).decode()
-                frames.append(frame_b64)
-            
-            # Create a pseudo-video response (animated GIF data)
-            video_data = {
-                'frames': frames[:20],  # Limit to first 20 frames
-                'fps': fps,
-                'duration': duration,
-                'width': width,
-                'height': height,
-                'type': 'animated_sequence'
-            }
+            scheduler = FrameScheduler.from_config()
+            frame_count = min(total_frames, 100)  # Limit frames for performance
+            for frame in scheduler.render(StripeFrameRenderer, frame_count, text=text, width=width,
+                                          height=height, total_frames=total_frames,
+                                          background_color=tuple(background_color)):
+                encoder.write(frame)
             
-            # Encode as base64
-            video_json = json.dumps(video_data)
-            video_base64 = base64.b64encode(video_json.encode()).decode()
+            encoder.close()
             
             return {
                 'success': True,
-                'video_data': f"data:application/json;base64,{video_base64}",
-                'message': 'Video frames generated successfully'
+                'video_data': video_url(encoder.filename),
+                'video_file': encoder.filename,
+                'mimetype': encoder.mimetype,
+                'message': f'Video generated successfully - {encoder.frame_count} frames'
             }
             
         except Exception as e:
+            if encoder is not None:
+                encoder.abort()
             self.logger.error(f"Video generation error: {e}")
             return {
                 'success': False,
@@ -0,0 +1,124 @@
+import os
+import threading
+
+from PIL import ImageFont
+
+FONT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static', 'fonts')
+
+# Style name -> bundled file (see app/static/fonts/README.md for licences)
+BUNDLED_FONTS = {
+    'regular': 'Lato-Regular.ttf',
+}
+
+# Tried when a bundled file is missing
+SYSTEM_FALLBACKS = ('DejaVuSans.ttf', 'arial.ttf')
+
+# Sizes used by the media services, loaded up front by ``preload``
+DEFAULT_SIZES = (36, 40, 48, 50, 60, 64, 80)
+
+class FontMetrics:
+    """A loaded font plus cached glyph advances for fast line measurement"""
+
+    def __init__(self, font):
+        self.font = font
+        self.size = getattr(font, 'size', 10)
+        self._advances = {}
+        self._lock = threading.Lock()
+        self.space_width = self.advance(' ')
+
+    def advance(self, char):
+        width = self._advances.get(char)
+        if width is None:
+            width = self.font.getlength(char)
+            with self._lock:
+                self._advances[char] = width
+        return width
+
+    def measure(self, text):
+        """Width of ``text`` as the sum of cached glyph advances (kerning is ignored)"""
+        advances = self._advances
+        width = 0.0
+        for char in text:
+            advance = advances.get(char)
+            width += advance if advance is not None else self.advance(char)
+        return width
+
+    def wrap(self, text, max_width, max_lines=None):
+        """Greedy word wrap using cached advances; returns a list of lines"""
+        lines = []
+        current = []
+        current_width = 0.0
+
+        for word in text.split():
+            word_width = self.measure(word)
+            candidate_width = current_width + self.space_width + word_width if current else word_width
+            if current and candidate_width > max_width:
+                lines.append(' '.join(current))
+                if max_lines and len(lines) >= max_lines:
+                    return lines
+                current = [word]
+                current_width = word_width
+            else:
+                current.append(word)
+                current_width = candidate_width
+
+        if current:
+            lines.append(' '.join(current))
+        return lines[:max_lines] if max_lines else lines
+
+class FontRegistry:
+    """Loads bundled fonts once per process and size and hands out cached metrics"""
+
+    def __init__(self, font_dir=FONT_DIR):
+        self.font_dir = font_dir
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def metrics(self, size, style='regular'):
+        key = (style, int(size))
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            with self._lock:
+                metrics = self._metrics.get(key)
+                if metrics is None:
+                    metrics = FontMetrics(self._load(style, int(size)))
+                    self._metrics[key] = metrics
+        return metrics
+
+    def get(self, size, style='regular'):
+        return self.metrics(size, style).font
+
+    def preload(self, sizes=DEFAULT_SIZES, style='regular'):
+        for size in sizes:
+            self.metrics(size, style)
+
+    def _load(self, style, size):
+        candidates = []
+        if style in BUNDLED_FONTS:
+            candidates.append(os.path.join(self.font_dir, BUNDLED_FONTS[style]))
+        candidates.extend(SYSTEM_FALLBACKS)
+
+        for path in candidates:
+            try:
+                return ImageFont.truetype(path, size)
+            except (OSError, IOError):
+                continue
+
+        try:
+            return ImageFont.load_default(size)
+        except TypeError:  # Pillow < 10.1 has no sized default font
+            return ImageFont.load_default()
+
+registry = FontRegistry()
+
+def get_font(size, style='regular'):
+    """Shared font instance for ``size``"""
+    return registry.get(size, style)
+
+def text_width(text, size, style='regular'):
+    """Rendered width of ``text`` from cached glyph advances"""
+    return registry.metrics(size, style).measure(text)
+
+def wrap_text(text, size, max_width, style='regular', max_lines=None):
+    """Split ``text`` into lines no wider than ``max_width`` at ``size``"""
+    return registry.metrics(size, style).wrap(text, max_width, max_lines=max_lines)
@@ -0,0 +1,113 @@
+import numpy as np
+from PIL import Image
+
+from app.services.backgrounds import to_image
+from app.services.font_registry import registry
+from app.services.text_effects import TextStyle
+
+class FrameCompositor:
+    """Layered renderer for progressive-reveal text videos.
+
+    Everything that does not change between frames is prepared once: the
+    font, the word-wrapped layout of the full text (greedy wrapping is
+    prefix-stable, so the layout for any number of revealed words is a
+    truncation of it), and one RGBA sprite per distinct line with its
+    shadow, blurred glow and outline already baked in. A frame is then a
+    background plus a handful of ``paste`` calls.
+    """
+
+    def __init__(self, width, height, text, font_style='regular', font_size=64, line_height=80,
+                 margin=100, max_lines=None, text_color=(255, 255, 255), stroke_width=0,
+                 stroke_color=(0, 0, 0), shadow_offset=0, shadow_alpha=200, shadow_blur=2,
+                 glow_radius=0, glow_alpha=120, background=None):
+        self.width = width
+        self.height = height
+        self.metrics = registry.metrics(font_size, font_style)
+        self.font = self.metrics.font
+        self.line_height = line_height
+        self.max_width = width - 2 * margin
+        self.max_lines = max_lines
+
+        self.style = TextStyle(fill=text_color, stroke_width=stroke_width, stroke_fill=stroke_color,
+                               shadow_offset=shadow_offset, shadow_alpha=shadow_alpha,
+                               shadow_blur=shadow_blur, glow_radius=glow_radius, glow_alpha=glow_alpha)
+        self.padding = self.style.padding
+
+        # Static background (PIL image, array or RGB color) copied for each frame
+        self.background = self._prepare_background(background)
+
+        self.words = text.split()
+        self._lines = self._wrap(self.words)
+        self._layouts = {}
+        self._sprites = {}
+
+    def _prepare_background(self, background):
+        if background is None:
+            return None
+        if isinstance(background, Image.Image):
+            return background.convert('RGB')
+        if isinstance(background, np.ndarray):
+            return to_image(background)
+        return Image.new('RGB', (self.width, self.height), tuple(background))
+
+    def _wrap(self, words):
+        """Greedy wrap of the full text; returns the word count of each line"""
+        lines = self.metrics.wrap(' '.join(words), self.max_width, max_lines=self.max_lines)
+        return [len(line.split()) for line in lines]
+
+    def lines_for(self, word_count):
+        """Lines visible once ``word_count`` words have been revealed"""
+        lines = []
+        start = 0
+        for count in self._lines:
+            if start >= word_count:
+                break
+            end = min(start + count, word_count)
+            lines.append(' '.join(self.words[start:end]))
+            start += count
+        return lines
+
+    def layout(self, word_count):
+        """(sprite, x, y) for each visible line, centered; cached per reveal step"""
+        word_count = max(0, min(word_count, len(self.words)))
+        if word_count not in self._layouts:
+            lines = self.lines_for(word_count)
+            start_y = (self.height - len(lines) * self.line_height) // 2
+            placed = []
+            for i, line in enumerate(lines):
+                sprite, text_width = self._sprite(line)
+                x = (self.width - text_width) // 2 - self.padding
+                y = start_y + i * self.line_height - self.padding
+                placed.append((sprite, x, y))
+            self._layouts[word_count] = placed
+        return self._layouts[word_count]
+
+    def _sprite(self, line):
+        """Pre-rendered RGBA sprite for one line of text"""
+        if line in self._sprites:
+            return self._sprites[line]
+
+        sprite = self.style.sprite(line, self.font)
+        text_width = int(self.metrics.measure(line))
+        self._sprites[line] = (sprite, text_width)
+        return self._sprites[line]
+
+    def compose(self, word_count, background=None, offset=(0, 0), line_dx=None):
+        """Render one frame.
+
+        ``background`` overrides the static one for animated backgrounds,
+        ``offset`` moves the whole text block and ``line_dx(i)`` shifts
+        individual lines horizontally.
+        """
+        if background is None:
+            frame = self.background.copy() if self.background else Image.new('RGB', (self.width, self.height))
+        elif isinstance(background, np.ndarray):
+            frame = to_image(background)
+        else:
+            frame = background
+
+        dx, dy = offset
+        for i, (sprite, x, y) in enumerate(self.layout(word_count)):
+            line_offset = int(line_dx(i)) if line_dx else 0
+            frame.paste(sprite, (x + dx + line_offset, y + dy), sprite)
+        return frame
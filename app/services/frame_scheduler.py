@@ -0,0 +1,145 @@
+import logging
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from app.services.worker_pools import LazyPool
+from app.utils.helpers import app_config
+
+logger = logging.getLogger(__name__)
+
+_render_pool = LazyPool(lambda size: ProcessPoolExecutor(max_workers=size))
+
+def get_render_pool(size):
+    """Process pool shared by all requests in this worker (created lazily, once per process)"""
+    return _render_pool.get(size)
+
+class SharedBackground:
+    """A read-only NumPy array placed in shared memory so workers can map it without pickling"""
+
+    def __init__(self, array):
+        array = np.ascontiguousarray(array)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        shared = np.ndarray(array.shape, dtype=array.dtype, buffer=self._shm.buf)
+        shared[:] = array
+        self.descriptor = (self._shm.name, array.shape, array.dtype.str)
+
+    def release(self):
+        self._shm.close()
+        self._shm.unlink()
+
+# Worker-side state: renderers are built once per job and reused across its chunks
+WORKER_JOB_CACHE_SIZE = 4
+_worker_renderers = OrderedDict()
+_worker_segments = {}
+
+def _attach(descriptor):
+    name, shape, dtype = descriptor
+    segment = shared_memory.SharedMemory(name=name)
+    return segment, np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+
+def _render_chunk(job_id, factory, descriptor, context, start, stop):
+    """Run in a pool worker: render frames ``start..stop`` as raw RGB arrays"""
+    if job_id not in _worker_renderers:
+        background = None
+        if descriptor is not None:
+            segment, background = _attach(descriptor)
+            _worker_segments[job_id] = segment
+        _worker_renderers[job_id] = factory(background, **context)
+        _evict_jobs()
+    _worker_renderers.move_to_end(job_id)
+
+    renderer = _worker_renderers[job_id]
+    return [np.asarray(renderer(frame_num), dtype=np.uint8) for frame_num in range(start, stop)]
+
+def _evict_jobs():
+    """Drop the least recently used renderers so finished jobs don't pin shared memory"""
+    while len(_worker_renderers) > WORKER_JOB_CACHE_SIZE:
+        old_id, _ = _worker_renderers.popitem(last=False)
+        segment = _worker_segments.pop(old_id, None)
+        if segment is not None:
+            try:
+                segment.close()
+            except BufferError:
+                pass
+
+class FrameScheduler:
+    """Split a frame range across the render pool and yield frames back in order.
+
+    ``factory(background, **context)`` must be a picklable top-level callable
+    returning a renderer; ``renderer(frame_num)`` returns one frame as a PIL
+    image or (H, W, 3) array. The background array, if any, is placed in
+    shared memory once and mapped by every worker. At most
+    ``max_workers`` chunks are in flight for one request, which bounds both
+    its share of the pool and the frames held in memory.
+    """
+
+    # Processes per web worker when not configured; each gunicorn worker has its own pool
+    DEFAULT_POOL_SIZE = 2
+
+    def __init__(self, pool_size=None, max_workers=None, chunk_size=8):
+        self.pool_size = pool_size or self.DEFAULT_POOL_SIZE
+        self.max_workers = min(self.pool_size, max_workers or self.pool_size)
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def from_config(cls, config=None):
+        """Build a scheduler from ``RENDER_*`` settings (defaults outside an app context)"""
+        config = app_config(config)
+        return cls(pool_size=config.get('RENDER_POOL_SIZE'),
+                   max_workers=config.get('RENDER_MAX_WORKERS_PER_REQUEST'),
+                   chunk_size=config.get('RENDER_CHUNK_SIZE', 8))
+
+    def render(self, factory, frame_count, background=None, **context):
+        """Yield frames ``0..frame_count - 1`` in order"""
+        chunks = [(start, min(start + self.chunk_size, frame_count))
+                  for start in range(0, frame_count, self.chunk_size)]
+        workers = min(self.max_workers, len(chunks))
+
+        if workers <= 1:
+            yield from self._render_inline(factory, frame_count, background, context)
+            return
+
+        shared = SharedBackground(background) if background is not None else None
+        descriptor = shared.descriptor if shared else None
+        job_id = uuid.uuid4().hex
+        pending = deque()
+        next_frame = 0
+
+        try:
+            pool = get_render_pool(self.pool_size)
+            chunk_iter = iter(chunks)
+
+            try:
+                for start, stop in chunk_iter:
+                    pending.append(pool.submit(_render_chunk, job_id, factory, descriptor, context, start, stop))
+                    if len(pending) >= workers:
+                        break
+
+                while pending:
+                    frames = pending.popleft().result()
+                    next_chunk = next(chunk_iter, None)
+                    if next_chunk is not None:
+                        pending.append(pool.submit(_render_chunk, job_id, factory, descriptor, context, *next_chunk))
+                    yield from frames
+                    next_frame += len(frames)
+            except BrokenProcessPool as e:
+                # A worker died (often out of memory); start a fresh pool next time and finish here
+                logger.warning(f"Render pool broke at frame {next_frame}, rendering inline: {e}")
+                _render_pool.reset(pool)
+                pending.clear()
+                yield from self._render_inline(factory, frame_count, background, context, start=next_frame)
+        finally:
+            for future in pending:
+                future.cancel()
+            if shared is not None:
+                shared.release()
+
+    def _render_inline(self, factory, frame_count, background, context, start=0):
+        renderer = factory(background, **context)
+        for frame_num in range(start, frame_count):
+            yield renderer(frame_num)
@@ -5,6 +5,12 @@ from typing import Dict, Any, Optional
 from flask import current_app
 from app.models import Rant, EmotionType
 
+# Model used for all Gemini calls
+GEMINI_MODEL_NAME = 'gemini-1.5-flash'
+
+# Bump when the analysis or insight prompts change so stored analyses are recomputed
+ANALYSIS_PROMPT_VERSION = '2'
+
 class GeminiService:
     """AI service using Google's Gemini API for processing rants and generating insights"""
     
@@ -13,6 +19,8 @@ class GeminiService:
         self.gemini_key = None
         self.model = None
         self.generation_configs = {}
+        # Set once any call on this instance answered from a fallback instead of Gemini
+        self.fallback_used = False
         if app:
             self.init_app(app)
     
@@ -25,7 +33,7 @@ class GeminiService:
                 try:
                     genai.configure(api_key=self.gemini_key)
                     # Use flash model for higher quota limits
-                    self.model = genai.GenerativeModel('gemini-1.5-flash')
+                    self.model = genai.GenerativeModel(GEMINI_MODEL_NAME)
                     
                     # Define different generation configs for different tasks
                     self.generation_configs = {
@@ -48,11 +56,16 @@ class GeminiService:
                             max_output_tokens=2048,
                         )
                     }
-                    print("✅ Gemini Service initialized successfully with gemini-1.5-flash.")
+                    print(f"✅ Gemini Service initialized successfully with {GEMINI_MODEL_NAME}.")
                 except Exception as e:
                     print(f"❌ Error initializing Gemini Service: {e}")
                     self.model = None
     
+    @property
+    def model_name(self) -> str:
+        """Name recorded with stored results ('fallback' when Gemini is unavailable)"""
+        return GEMINI_MODEL_NAME if self.model else 'fallback'
+    
     def analyze_rant(self, rant: Rant) -> Dict[str, Any]:
         """Analyze a rant for emotion, sentiment, and keywords"""
         if self.model:
@@ -138,7 +151,10 @@ class GeminiService:
             if not all(field in analysis for field in required_fields):
                 raise ValueError("Missing one or more required fields in Gemini response.")
 
+            # Keep the rich fields (triggers, cognitive_patterns, support_needs, ...)
+            # alongside the normalized core fields
             return {
+                **analysis,
                 'emotion': analysis.get('emotion', 'neutral'),
                 'emotion_confidence': float(analysis.get('emotion_confidence', 0.5)),
                 'sentiment_score': float(analysis.get('sentiment_score', 0.0)),
@@ -547,6 +563,7 @@ Write an insight that they would want to save and return to when they need encou
     # ... (fallback methods remain the same) ...
     def _analyze_with_fallback(self, rant: Rant) -> Dict[str, Any]:
         """Fallback analysis when Gemini is not available"""
+        self.fallback_used = True
         content = rant.content.lower()
         
         # Simple keyword-based emotion detection
@@ -597,6 +614,7 @@ Write an insight that they would want to save and return to when they need encou
     
     def _generate_response_fallback(self, rant: Rant, response_type: str) -> str:
         """Fallback response generation"""
+        self.fallback_used = True
         responses = {
             'psychologist': "I hear you, and I want you to know that what you're feeling right now is completely valid and understandable. 💙 It takes real courage to express these emotions, and that already shows your inner strength. You know what? Even in difficult moments like this, you're still here, still sharing, still trying - and that's actually pretty amazing. Your feelings matter, you matter, and this difficult moment is temporary. You have more resilience inside you than you might realize right now, and I believe in your ability to get through this. You're not alone in this. 🌟",
             'supportive': "Oh honey, I can feel the weight of what you're carrying right now, and I want you to know that you're not alone in this. 💝 Your feelings are so valid, and it's completely okay to feel exactly what you're feeling. You know what amazes me? Your courage to reach out and share this - that takes real strength. You're doing better than you think you are, even if it doesn't feel that way right now. I'm here with you, and you matter so much. 🤗",
@@ -615,6 +633,7 @@ Write an insight that they would want to save and return to when they need encou
     
     def _transform_with_fallback(self, content: str, transformation_type: str) -> str:
         """Fallback content transformation"""
+        self.fallback_used = True
         transformations = {
             'poem': f"In feelings deep and true,\n{content[:100]}...\nThrough darkness comes the light,\nAnd hope will see us through.",
             'song': f"[Verse 1]\n{content[:150]}...\n\n[Chorus]\nEvery feeling has its place\nIn this journey that we face\nThrough the storms we find our way\nTo a brighter, better day",
@@ -627,4 +646,5 @@ Write an insight that they would want to save and return to when they need encou
     
     def _get_insight_fallback(self, rant: Rant) -> str:
         """Fallback insight generation"""
+        self.fallback_used = True
         return f"This expression shows a lot of emotional depth and self-awareness. The fact that you're putting these feelings into words is a healthy way of processing what you're experiencing. Your emotions are giving you important information about what matters to you."
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""Image upload ingestion: decode at preview size, orient, measure and thumbnail.
+
+The original is stored once in the upload store and never re-encoded.
+JPEGs are decoded in draft mode, where libjpeg scales the DCT by 1/2 to
+1/8 and so reconstructs a fraction of the pixels; other formats are
+shrunk with ``Image.reduce`` straight after decoding. EXIF orientation is
+applied to the largest thumbnail rather than the original, and colour
+statistics are computed with NumPy on the smallest one. Clients get
+thumbnail URLs instead of the whole image echoed back as base64.
+"""
+
+import os
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image, UnidentifiedImageError
+
+from app.services.media_store import media_store
+from app.services.upload_store import upload_store
+from app.utils.helpers import app_config
+
+# Preset name -> longest edge in pixels
+THUMBNAIL_SIZES = {'small': 160, 'medium': 480, 'large': 1080}
+
+HISTOGRAM_BINS = 16
+
+# EXIF orientation -> transpose that makes the image upright (as ``ImageOps.exif_transpose``)
+_EXIF_ORIENTATION = 0x0112
+_TRANSPOSES = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+# Orientations that turn the image by 90 degrees, swapping width and height
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+class ImageIngestError(ValueError):
+    """The upload is not a decodable image"""
+
+IngestedImage = namedtuple('IngestedImage', 'stored width height format mode thumbnails stats')
+IngestedImage.__doc__ = """An ingested image upload.
+
+``width`` and ``height`` are the full-resolution, upright dimensions;
+``thumbnails`` maps preset names to media-store filenames, largest first.
+"""
+
+def ingest_image(upload, sizes=None):
+    """Store an image upload and build its thumbnails and colour statistics.
+
+    ``sizes`` defaults to ``IMAGE_THUMBNAIL_SIZES``. Raises
+    ``ImageIngestError`` for files that are not images, which are not kept.
+    """
+    sizes = sizes or app_config().get('IMAGE_THUMBNAIL_SIZES', THUMBNAIL_SIZES)
+    stored = upload_store.save(upload, 'image')
+
+    try:
+        with Image.open(stored.path) as image:
+            format, mode = image.format, image.mode
+            width, height = image.size
+            orientation = image.getexif().get(_EXIF_ORIENTATION)
+            if orientation in _TRANSPOSED_ORIENTATIONS:
+                width, height = height, width
+            preview = decode_preview(image, max(sizes.values()), orientation)
+    except (UnidentifiedImageError, OSError, SyntaxError) as e:
+        if stored.created:
+            os.remove(stored.path)
+        raise ImageIngestError('Unsupported or corrupt image file') from e
+
+    thumbnails = {}
+    # Largest first, each resized from the previous one
+    for name, size in sorted(sizes.items(), key=lambda item: -item[1]):
+        preview = fit(preview, size)
+        thumbnails[name] = save_thumbnail(preview)
+
+    return IngestedImage(stored, width, height, format, mode, thumbnails, image_stats(preview))
+
+def decode_preview(image, size, orientation=None):
+    """Decode ``image`` to fit a ``size`` box, in RGB(A) and upright for the EXIF ``orientation``.
+
+    The orientation is applied last, to the small image; the box is square,
+    so it fits either way round.
+    """
+    if image.format == 'JPEG':
+        # Scaled DCT: the result still covers ``size`` on both edges
+        image.draft('RGB', (size, size))
+    image.load()
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+    mode = 'RGBA' if has_alpha else 'RGB'
+    preview = image if image.mode == mode else image.convert(mode)
+    factor = min(preview.size) // size
+    if factor > 1:
+        preview = preview.reduce(factor)
+    # Under 2x after draft/reduce, where a triangle filter is indistinguishable and half the cost
+    preview = fit(preview, size, Image.BILINEAR)
+    if orientation in _TRANSPOSES:
+        preview = preview.transpose(_TRANSPOSES[orientation])
+    return preview
+
+def fit(image, size, resample=Image.LANCZOS):
+    """``image`` scaled down to fit a ``size`` box (a new image), or itself if it already fits"""
+    scale = size / max(image.size)
+    if scale >= 1:
+        return image
+    width, height = image.size
+    return image.resize((max(1, round(width * scale)), max(1, round(height * scale))), resample)
+
+def save_thumbnail(image):
+    """Store a thumbnail in the media store; JPEG unless it has transparency"""
+    if image.mode == 'RGBA':
+        return media_store.save_image(image, 'PNG', optimize=True)
+    return media_store.save_image(image, 'JPEG', quality=85, optimize=True)
+
+def image_stats(image):
+    """Brightness, contrast, mean colour and per-channel histograms of a (small) RGB(A) image"""
+    pixels = np.asarray(image.convert('RGB'), dtype=np.float32).reshape(-1, 3)
+    luma = pixels @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    histogram = {}
+    for index, channel in enumerate('rgb'):
+        counts, _ = np.histogram(pixels[:, index], bins=HISTOGRAM_BINS, range=(0, 256))
+        histogram[channel] = [round(float(c), 4) for c in counts / len(pixels)]
+    mean = pixels.mean(axis=0)
+    return {
+        'brightness': round(float(luma.mean()) / 255, 3),
+        'contrast': round(float(luma.std()) / 255, 3),
+        'mean_color': '#{:02x}{:02x}{:02x}'.format(*(int(round(float(v))) for v in mean)),
+        'histogram': histogram
+    }
+
+def thumbnail_urls(ingested):
+    """Absolute URLs of an ingested image's thumbnails, by preset name"""
+    return {name: media_store.url('images', filename) for name, filename in ingested.thumbnails.items()}
+
+def preview_url(ingested):
+    """URL of the largest thumbnail, shown in place of the original"""
+    return media_store.url('images', next(iter(ingested.thumbnails.values())))
@@ -0,0 +1,142 @@
+import json
+from typing import Dict, Iterable, List, Optional, Union
+
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Rant, Keyword, RantKeyword, UserKeywordCount
+
+MAX_KEYWORD_LENGTH = 100
+
+class KeywordIndex:
+    """Normalized keyword index: interned keywords, rant links and per-user counters.
+
+    Callers own the transaction; nothing here commits.
+    """
+
+    @staticmethod
+    def normalize(keyword) -> str:
+        """Canonical form used for interning"""
+        return ' '.join(str(keyword).lower().split())[:MAX_KEYWORD_LENGTH]
+
+    @classmethod
+    def parse(cls, keywords: Union[str, Iterable, None]) -> List[str]:
+        """Accept a list or the JSON-encoded string stored on Rant.keywords"""
+        if not keywords:
+            return []
+        if isinstance(keywords, str):
+            try:
+                keywords = json.loads(keywords)
+            except (json.JSONDecodeError, TypeError):
+                keywords = [keywords]
+            if not isinstance(keywords, list):
+                keywords = [keywords]
+
+        terms = [cls.normalize(keyword) for keyword in keywords]
+        return list(dict.fromkeys(term for term in terms if term))
+
+    def intern(self, terms: List[str]) -> Dict[str, int]:
+        """Return term -> keyword id, creating missing keywords"""
+        if not terms:
+            return {}
+
+        existing = Keyword.query.filter(Keyword.term.in_(terms)).all()
+        ids = {keyword.term: keyword.id for keyword in existing}
+
+        for term in terms:
+            if term in ids:
+                continue
+            # Another request may insert the same term first; the savepoint keeps our transaction usable
+            try:
+                with db.session.begin_nested():
+                    keyword = Keyword(term=term)
+                    db.session.add(keyword)
+                ids[term] = keyword.id
+            except IntegrityError:
+                ids[term] = Keyword.query.filter_by(term=term).one().id
+
+        return ids
+
+    def index_rant(self, rant: Rant, keywords: Union[str, Iterable, None]):
+        """Replace a rant's keyword links and adjust the owner's counters"""
+        new_ids = set(self.intern(self.parse(keywords)).values())
+        current_ids = {
+            link.keyword_id for link in RantKeyword.query.filter_by(rant_id=rant.id).all()
+        }
+
+        added = new_ids - current_ids
+        removed = current_ids - new_ids
+
+        if removed:
+            RantKeyword.query.filter(
+                RantKeyword.rant_id == rant.id,
+                RantKeyword.keyword_id.in_(list(removed))
+            ).delete(synchronize_session=False)
+
+        for keyword_id in added:
+            db.session.add(RantKeyword(rant_id=rant.id, keyword_id=keyword_id, user_id=rant.user_id))
+
+        self._adjust_counts(rant.user_id, added, 1)
+        self._adjust_counts(rant.user_id, removed, -1)
+
+    def remove_rant(self, rant: Rant):
+        """Drop a rant's keyword links (call before deleting the rant)"""
+        self.index_rant(rant, [])
+
+    def _adjust_counts(self, user_id: int, keyword_ids: Iterable[int], delta: int):
+        keyword_ids = set(keyword_ids)
+        if not keyword_ids:
+            return
+
+        counters = {
+            counter.keyword_id: counter
+            for counter in UserKeywordCount.query.filter(
+                UserKeywordCount.user_id == user_id,
+                UserKeywordCount.keyword_id.in_(list(keyword_ids))
+            ).all()
+        }
+
+        for keyword_id in keyword_ids:
+            counter = counters.get(keyword_id)
+            if counter is None:
+                if delta > 0:
+                    db.session.add(UserKeywordCount(user_id=user_id, keyword_id=keyword_id, count=delta))
+                continue
+            counter.count = max(0, counter.count + delta)
+            if counter.count == 0:
+                db.session.delete(counter)
+
+    def top_keywords(self, user_id: int, limit: int = 10) -> List[Dict]:
+        """Most frequent keywords for a user"""
+        counters = UserKeywordCount.query.filter_by(user_id=user_id)\
+                                         .order_by(UserKeywordCount.count.desc())\
+                                         .limit(limit)\
+                                         .all()
+        return [counter.to_dict() for counter in counters]
+
+    def rants_query(self, user_id: int, keyword: str):
+        """Query for a user's rants mentioning ``keyword``, newest first"""
+        term = self.normalize(keyword)
+        return Rant.query.join(RantKeyword, RantKeyword.rant_id == Rant.id)\
+                         .join(Keyword, Keyword.id == RantKeyword.keyword_id)\
+                         .filter(Keyword.term == term, RantKeyword.user_id == user_id)\
+                         .order_by(Rant.created_at.desc())
+
+    def backfill_if_empty(self) -> bool:
+        """Backfill when no rant is linked to a keyword yet; returns True if it ran"""
+        if RantKeyword.query.first() is not None:
+            return False
+        if Rant.query.filter(Rant.keywords.isnot(None)).first() is None:
+            return False
+        self.backfill()
+        return True
+
+    def backfill(self, user_id: Optional[int] = None):
+        """Populate the index from the JSON stored on existing rants"""
+        query = Rant.query.filter(Rant.keywords.isnot(None))
+        if user_id is not None:
+            query = query.filter_by(user_id=user_id)
+
+        for rant in query.all():
+            self.index_rant(rant, rant.keywords)
+        db.session.commit()
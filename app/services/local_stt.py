@@ -0,0 +1,135 @@
+"""Offline speech recognition in a dedicated process pool.
+
+Each pool worker loads its engine's model once, in the pool initializer, and
+keeps it warm for every segment it is sent afterwards. Recognition is CPU
+bound, so processes rather than threads give real parallelism; results for
+the same audio and model are deterministic, which makes this backend the one
+to benchmark against.
+
+Engines (all optional):
+
+- ``vosk``: Kaldi models from https://alphacephei.com/vosk/models, loaded
+  from ``STT_LOCAL_MODEL_PATH``
+- ``sphinx``: CMU PocketSphinx through ``speech_recognition``
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from app.services.transcription import SpeechBackend, TranscriptionError
+from app.services.worker_pools import LazyPool
+
+try:
+    import vosk
+    vosk.SetLogLevel(-1)
+    VOSK_AVAILABLE = True
+except ImportError:
+    VOSK_AVAILABLE = False
+
+try:
+    import speech_recognition as sr
+    import pocketsphinx  # noqa: F401 - recognize_sphinx needs it at call time
+    SPHINX_AVAILABLE = True
+except ImportError:
+    SPHINX_AVAILABLE = False
+
+# Engine loaders: ``loader(model_path, language)`` returns ``recognize(pcm, sample_rate) -> str``
+
+def _load_vosk(model_path, language):
+    if not model_path or not os.path.isdir(model_path):
+        raise TranscriptionError(f"Vosk model not found at '{model_path}' (set STT_LOCAL_MODEL_PATH)")
+    model = vosk.Model(model_path)
+
+    def recognize(pcm, sample_rate):
+        recognizer = vosk.KaldiRecognizer(model, sample_rate)
+        recognizer.AcceptWaveform(pcm)
+        return json.loads(recognizer.FinalResult()).get('text', '')
+    return recognize
+
+def _load_sphinx(model_path, language):
+    recognizer = sr.Recognizer()
+
+    def recognize(pcm, sample_rate):
+        try:
+            return recognizer.recognize_sphinx(sr.AudioData(pcm, sample_rate, 2), language=language)
+        except sr.UnknownValueError:
+            return ''
+    return recognize
+
+LOCAL_ENGINES = {
+    'vosk': (_load_vosk, VOSK_AVAILABLE),
+    'sphinx': (_load_sphinx, SPHINX_AVAILABLE),
+}
+
+def register_local_engine(name, loader):
+    """Add an engine; ``loader`` must be importable in the workers (defined at module level)"""
+    LOCAL_ENGINES[name] = (loader, True)
+
+def local_engine_available(engine):
+    return LOCAL_ENGINES.get(engine, (None, False))[1]
+
+# Worker side: the warm model of this process
+
+_worker_recognize = None
+
+def _init_worker(engine, model_path, language):
+    global _worker_recognize
+    loader, _ = LOCAL_ENGINES[engine]
+    _worker_recognize = loader(model_path, language)
+
+def _recognize_in_worker(pcm, sample_rate):
+    return _worker_recognize(pcm, sample_rate).strip()
+
+# Parent side
+
+_local_pool = LazyPool(lambda engine, model_path, language, size: ProcessPoolExecutor(
+    max_workers=size, initializer=_init_worker, initargs=(engine, model_path, language)))
+
+def get_local_stt_pool(engine, model_path, language, size):
+    """Process pool for ``engine``, created once per web worker and rebuilt if its settings change"""
+    return _local_pool.get(engine, model_path, language, size)
+
+class LocalSpeechBackend(SpeechBackend):
+    """Transcribes segments on the local STT process pool"""
+
+    name = 'local'
+
+    def __init__(self, engine='vosk', model_path=None, language='en-US', pool_size=2, timeout=60):
+        if engine not in LOCAL_ENGINES:
+            raise TranscriptionError(f"Unknown local speech engine '{engine}'. Choose from: {', '.join(LOCAL_ENGINES)}")
+        if not local_engine_available(engine):
+            raise TranscriptionError(f"Local speech engine '{engine}' is not installed")
+        if engine == 'vosk' and not os.path.isdir(model_path or ''):
+            raise TranscriptionError(f"Vosk model not found at '{model_path}' (set STT_LOCAL_MODEL_PATH)")
+        self.engine = engine
+        self.model_path = model_path
+        self.language = language
+        self.pool_size = pool_size
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(engine=config.get('STT_LOCAL_ENGINE', 'vosk'), model_path=config.get('STT_LOCAL_MODEL_PATH'),
+                   language=config.get('STT_LANGUAGE', 'en-US'), pool_size=config.get('STT_LOCAL_POOL_SIZE', 2),
+                   timeout=config.get('STT_LOCAL_TIMEOUT', 60))
+
+    def pool(self):
+        return get_local_stt_pool(self.engine, self.model_path, self.language, self.pool_size)
+
+    def transcribe(self, pcm, sample_rate):
+        pool = self.pool()
+        try:
+            return pool.submit(_recognize_in_worker, pcm, sample_rate).result(timeout=self.timeout)
+        except FutureTimeout:
+            raise TranscriptionError(f'Local recognizer took longer than {self.timeout}s')
+        except BrokenProcessPool as e:
+            # A worker died (often the model failed to load); start over next time
+            _local_pool.reset(pool)
+            raise TranscriptionError(f'Local recognizer pool failed: {e}')
+        except TranscriptionError:
+            raise
+        except Exception as e:
+            raise TranscriptionError(f'Local recognizer failed: {e}')
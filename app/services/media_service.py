@@ -1,11 +1,16 @@
 import os
 import io
-import base64
-from PIL import Image, ImageDraw, ImageFont
-import tempfile
 import logging
-from werkzeug.utils import secure_filename
-import numpy as np
+
+from app.services.audio_ingest import AudioIngestError, ingest_audio
+from app.services.backgrounds import gradient_background
+from app.services.font_registry import get_font, text_width, wrap_text
+from app.services.frame_compositor import FrameCompositor
+from app.services.image_ingest import ingest_image, preview_url, thumbnail_urls
+from app.services.media_store import media_store
+from app.services.text_effects import TextStyle
+from app.services.transcription import TranscriptionError, transcribe_audio
+from app.services.video_encoder import VideoEncoder, encoder_available, video_url
 
 # Optional imports with fallbacks
 try:
@@ -71,40 +76,32 @@ class MediaService:
     
     def process_audio_file(self, audio_file):
         """Process uploaded audio file and convert to text"""
-        if not SPEECH_RECOGNITION_AVAILABLE:
-            return {
-                'success': False,
-                'error': 'Speech recognition not available',
-                'message': 'Speech recognition dependencies not installed'
-            }
-            
         try:
-            # Save the uploaded file
-            filename = secure_filename(audio_file.filename)
-            filepath = os.path.join(self.upload_folder, filename)
-            audio_file.save(filepath)
-            
-            # Convert to text using speech recognition
-            with sr.AudioFile(filepath) as source:
-                audio_data = self.recognizer.record(source)
-                text = self.recognizer.recognize_google(audio_data)
-                
-            # Clean up temporary file
-            os.remove(filepath)
+            # Decode in memory to 16 kHz mono; no temporary files
+            audio = ingest_audio(audio_file)
+            transcript = transcribe_audio(audio)
+            if not transcript.text:
+                return {
+                    'success': False,
+                    'error': 'Could not understand audio',
+                    'message': 'Please try speaking more clearly'
+                }
             
             return {
                 'success': True,
-                'text': text,
+                'text': transcript.text,
+                'duration': round(audio.duration, 2),
+                'segments': transcript.to_dict()['segments'],
                 'message': 'Audio processed successfully'
             }
             
-        except sr.UnknownValueError:
+        except AudioIngestError as e:
             return {
                 'success': False,
-                'error': 'Could not understand audio',
-                'message': 'Please try speaking more clearly'
+                'error': str(e),
+                'message': 'Error processing audio file'
             }
-        except sr.RequestError as e:
+        except TranscriptionError as e:
             return {
                 'success': False,
                 'error': f'Error with speech recognition service: {e}',
@@ -121,34 +118,20 @@ class MediaService:
     def process_image_file(self, image_file):
         """Process uploaded image file and extract text if any"""
         try:
-            filename = secure_filename(image_file.filename)
-            filepath = os.path.join(self.upload_folder, filename)
-            image_file.save(filepath)
-            
-            # Open and process image
-            image = Image.open(filepath)
-            
-            # Basic image analysis
-            width, height = image.size
-            format = image.format
-            mode = image.mode
-            
-            # Convert to base64 for frontend display
-            buffered = io.BytesIO()
-            image.save(buffered, format=format or 'JPEG')
-            img_str = base64.b64encode(buffered.getvalue()).decode()
-            
-            # Clean up
-            os.remove(filepath)
+            # Store once; decode only at preview size for thumbnails and colour stats
+            image = ingest_image(image_file)
+            width, height = image.width, image.height
             
             return {
                 'success': True,
-                'image_data': f"data:image/{format.lower()};base64,{img_str}",
+                'image_data': preview_url(image),
+                'thumbnails': thumbnail_urls(image),
                 'metadata': {
                     'width': width,
                     'height': height,
-                    'format': format,
-                    'mode': mode
+                    'format': image.format,
+                    'mode': image.mode,
+                    **image.stats
                 },
                 'message': 'Image processed successfully'
             }
@@ -174,21 +157,17 @@ class MediaService:
             # Create TTS object
             tts = gTTS(text=text, lang=language, slow=slow)
             
-            # Save to temporary file
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-            tts.save(temp_file.name)
-            
-            # Read the file and convert to base64
-            with open(temp_file.name, 'rb') as f:
-                audio_data = f.read()
-                audio_base64 = base64.b64encode(audio_data).decode()
-            
-            # Clean up
-            os.unlink(temp_file.name)
+            # Render into memory and store as a file
+            buffered = io.BytesIO()
+            tts.write_to_fp(buffered)
+            filename = media_store.save_bytes(buffered.getvalue(), 'mp3', 'audio')
+            audio_url = media_store.url('audio', filename)
             
             return {
                 'success': True,
-                'audio_data': f"data:audio/mp3;base64,{audio_base64}",
+                'audio_data': audio_url,
+                'audio_url': audio_url,
+                'audio_file': filename,
                 'message': 'Text converted to speech successfully'
             }
             
@@ -206,71 +185,36 @@ class MediaService:
             # Create a basic meme template
             width, height = 800, 600
             
-            # Create image with gradient background
-            image = Image.new('RGB', (width, height), color='#1a1a1a')
-            draw = ImageDraw.Draw(image)
-            
-            # Create gradient background
-            for i in range(height):
-                gradient_color = int(255 * (1 - i/height))
-                color = (gradient_color//4, gradient_color//2, gradient_color)
-                draw.line([(0, i), (width, i)], fill=color)
+            # Create gradient background (cached per size)
+            image = gradient_background(width, height, (63, 127, 255), (0, 0, 0))
             
             # Add text
-            try:
-                # Try to use a better font
-                font = ImageFont.truetype("arial.ttf", 48)
-            except:
-                # Fall back to default font
-                font = ImageFont.load_default()
-            
-            # Word wrap text
-            words = text.split()
-            lines = []
-            current_line = []
+            font_size = 48
+            font = get_font(font_size)
             
-            for word in words:
-                current_line.append(word)
-                line_text = ' '.join(current_line)
-                bbox = draw.textbbox((0, 0), line_text, font=font)
-                if bbox[2] - bbox[0] > width - 100:  # Leave margin
-                    if len(current_line) > 1:
-                        current_line.pop()
-                        lines.append(' '.join(current_line))
-                        current_line = [word]
-                    else:
-                        lines.append(word)
-                        current_line = []
-            
-            if current_line:
-                lines.append(' '.join(current_line))
+            # Word wrap text (leave margin)
+            lines = wrap_text(text, font_size, width - 100)
             
             # Draw text centered
             total_height = len(lines) * 60
             start_y = (height - total_height) // 2
+            text_style = TextStyle(fill='white', stroke_width=2, stroke_fill='black')
             
             for i, line in enumerate(lines):
-                bbox = draw.textbbox((0, 0), line, font=font)
-                text_width = bbox[2] - bbox[0]
-                x = (width - text_width) // 2
+                x = (width - int(text_width(line, font_size))) // 2
                 y = start_y + i * 60
                 
                 # Draw text with outline
-                for dx in [-2, -1, 0, 1, 2]:
-                    for dy in [-2, -1, 0, 1, 2]:
-                        if dx != 0 or dy != 0:
-                            draw.text((x + dx, y + dy), line, font=font, fill='black')
-                
-                draw.text((x, y), line, font=font, fill='white')
+                text_style.draw(image, (x, y), line, font)
             
-            # Convert to base64
-            buffered = io.BytesIO()
-            image.save(buffered, format='PNG')
-            img_str = base64.b64encode(buffered.getvalue()).decode()
+            filename = media_store.save_image(image, 'PNG')
+            image_url = media_store.url('images', filename)
             
             return {
                 'success': True,
-                'image_data': f"data:image/png;base64,{img_str}",
+                'image_data': image_url,
+                'image_url': image_url,
+                'image_file': filename,
                 'message': 'Meme generated successfully'
             }
             
@@ -284,88 +228,41 @@ class MediaService:
     
     def create_video_from_text(self, text, background_color=(30, 30, 30), duration=10):
         """Create a simple video with text overlay"""
-        if not OPENCV_AVAILABLE:
+        if not encoder_available():
             return {
                 'success': False,
                 'error': 'Video creation not available',
-                'message': 'OpenCV dependencies not installed'
+                'message': 'ffmpeg or OpenCV is not installed'
             }
             
+        encoder = None
         try:
-            # Create a video frame
             width, height = 1280, 720
             fps = 30
             
-            # Create temporary video file
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
-            temp_file.close()
-            
-            # Create video writer
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(temp_file.name, fourcc, fps, (width, height))
+            # The text never changes, so the frame is composed once and repeated
+            compositor = FrameCompositor(width, height, text, font_size=40, line_height=50,
+                                         margin=50, background=background_color)
+            frame = compositor.compose(len(compositor.words))
             
-            # Generate frames
+            # Frames are streamed into the encoder one at a time
+            encoder = VideoEncoder(width, height, fps=fps)
+            encoder.open()
             for frame_num in range(duration * fps):
-                # Create frame
-                frame = np.zeros((height, width, 3), dtype=np.uint8)
-                frame[:] = background_color
-                
-                # Add text
-                font = cv2.FONT_HERSHEY_SIMPLEX
-                font_scale = 1.5
-                thickness = 2
-                
-                # Word wrap
-                words = text.split()
-                lines = []
-                current_line = []
-                
-                for word in words:
-                    test_line = ' '.join(current_line + [word])
-                    (test_width, test_height), _ = cv2.getTextSize(test_line, font, font_scale, thickness)
-                    
-                    if test_width > width - 100:
-                        if current_line:
-                            lines.append(' '.join(current_line))
-                            current_line = [word]
-                        else:
-                            lines.append(word)
-                    else:
-                        current_line.append(word)
-                
-                if current_line:
-                    lines.append(' '.join(current_line))
-                
-                # Draw text
-                line_height = 50
-                start_y = (height - len(lines) * line_height) // 2
-                
-                for i, line in enumerate(lines):
-                    (text_width, text_height), _ = cv2.getTextSize(line, font, font_scale, thickness)
-                    x = (width - text_width) // 2
-                    y = start_y + i * line_height + text_height
-                    
-                    cv2.putText(frame, line, (x, y), font, font_scale, (255, 255, 255), thickness)
-                
-                out.write(frame)
-            
-            out.release()
-            
-            # Read video file and convert to base64
-            with open(temp_file.name, 'rb') as f:
-                video_data = f.read()
-                video_base64 = base64.b64encode(video_data).decode()
-            
-            # Clean up
-            os.unlink(temp_file.name)
+                encoder.write(frame)
+            encoder.close()
             
             return {
                 'success': True,
-                'video_data': f"data:video/mp4;base64,{video_base64}",
+                'video_data': video_url(encoder.filename),
+                'video_file': encoder.filename,
+                'mimetype': encoder.mimetype,
                 'message': 'Video generated successfully'
             }
             
         except Exception as e:
+            if encoder is not None:
+                encoder.abort()
             self.logger.error(f"Video generation error: {e}")
             return {
                 'success': False,
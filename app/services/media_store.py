@@ -0,0 +1,119 @@
+import hashlib
+import io
+import mimetypes
+import os
+import tempfile
+
+from flask import abort, current_app, send_from_directory, url_for
+from werkzeug.utils import safe_join
+
+MEDIA_OUTPUT_FOLDER = 'outputs'
+
+# URL segment -> subdirectory of MEDIA_OUTPUT_FOLDER
+MEDIA_KINDS = ('images', 'audio', 'videos')
+
+class MediaStore:
+    """On-disk store for generated media, served by URL instead of data URIs.
+
+    Assets saved from bytes are content-addressed (SHA-256), so a URL always
+    refers to the same bytes and can be cached as immutable; identical
+    renders share one file. Files are written under a temporary name and
+    moved into place, so a reader never sees a partial asset.
+    """
+
+    def __init__(self, root=MEDIA_OUTPUT_FOLDER):
+        self.root = root
+
+    def directory(self, kind):
+        if kind not in MEDIA_KINDS:
+            raise ValueError(f"Unknown media kind: {kind}")
+        path = os.path.join(self.root, kind)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def save_bytes(self, data, extension, kind):
+        """Store ``data`` and return its filename"""
+        return self.save_stream([data], extension, kind)
+
+    def save_stream(self, chunks, extension, kind):
+        """Store an iterable of byte chunks, hashing while writing; returns the filename"""
+        saved = []
+        for _ in self.tee_stream(chunks, extension, kind, saved.append):
+            pass
+        return saved[0]
+
+    def tee_stream(self, chunks, extension, kind, on_saved=None):
+        """Yield ``chunks`` unchanged while storing them.
+
+        Once the stream is exhausted the file is moved into place and
+        ``on_saved(filename)`` is called. A stream that is abandoned or fails
+        part way leaves nothing behind.
+        """
+        directory = self.directory(kind)
+        digest = hashlib.sha256()
+
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                for chunk in chunks:
+                    if chunk:
+                        digest.update(chunk)
+                        handle.write(chunk)
+                        yield chunk
+
+            filename = f"{digest.hexdigest()[:32]}.{extension.lstrip('.')}"
+            path = os.path.join(directory, filename)
+            if os.path.exists(path):
+                os.remove(temp_path)
+            else:
+                os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        if on_saved:
+            on_saved(filename)
+
+    def save_image(self, image, format='PNG', kind='images', **save_kwargs):
+        """Encode a PIL image and store it; returns the filename"""
+        buffered = io.BytesIO()
+        image.save(buffered, format=format, **save_kwargs)
+        extension = 'jpg' if format.upper() == 'JPEG' else format.lower()
+        return self.save_bytes(buffered.getvalue(), extension, kind)
+
+    def url(self, kind, filename):
+        """Absolute URL of a stored asset (the frontend is served from a different origin)"""
+        return url_for('media.get_asset', kind=kind, filename=filename, _external=True)
+
+    def send(self, kind, filename):
+        """Response for a stored asset with Range/ETag support and immutable caching.
+
+        Files of at least ``MEDIA_OFFLOAD_MIN_SIZE`` bytes are handed to the front
+        proxy with ``X-Accel-Redirect`` when ``MEDIA_ACCEL_REDIRECT_PREFIX`` is
+        set; with ``USE_X_SENDFILE`` Flask emits ``X-Sendfile`` instead.
+        """
+        if kind not in MEDIA_KINDS:
+            abort(404)
+
+        directory = os.path.abspath(os.path.join(self.root, kind))
+        path = safe_join(directory, filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+
+        config = current_app.config
+        max_age = config.get('MEDIA_CACHE_MAX_AGE', 31536000)
+        accel_prefix = config.get('MEDIA_ACCEL_REDIRECT_PREFIX')
+
+        if accel_prefix and os.path.getsize(path) >= config.get('MEDIA_OFFLOAD_MIN_SIZE', 0):
+            response = current_app.response_class()
+            response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{kind}/{filename}"
+            response.mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        else:
+            response = send_from_directory(directory, filename, conditional=True, etag=True, max_age=max_age)
+
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        response.cache_control.immutable = True
+        return response
+
+media_store = MediaStore()
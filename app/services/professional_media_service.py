@@ -1,15 +1,30 @@
 import os
-import io
 import base64
 import requests
 import json
 import logging
 import tempfile
 import time
-from PIL import Image, ImageDraw, ImageFont
-from werkzeug.utils import secure_filename
+from collections import namedtuple
 import numpy as np
 
+from app.services.audio_ingest import AudioIngestError, ingest_audio
+from app.services.audio_synth import (encode_audio, ffmpeg_available, resolve_audio_settings, save_audio,
+                                      synthesize_tones)
+from app.services.backgrounds import gradient_background
+from app.services.font_registry import get_font, text_width, wrap_text
+from app.services.frame_scheduler import FrameScheduler
+from app.services.image_ingest import ingest_image, preview_url, thumbnail_urls
+from app.services.media_store import media_store
+from app.services.text_effects import TextStyle
+from app.services.transcription import TranscriptionError, transcribe_audio
+from app.services.tts_pipeline import TTSPipeline
+from app.services.output_profiles import resolve_profile
+from app.services.scene_format import SCENE_VERSION, SceneRenderer, build_text_scene, scene_background
+from app.services.video_encoder import VideoEncoder, encoder_available, video_url
+from app.services.video_ingest import ingest_video
+from app.utils.helpers import app_config
+
 # Import ElevenLabs
 try:
     from elevenlabs import generate, Voice, set_api_key
@@ -17,9 +32,22 @@ try:
 except ImportError:
     ELEVENLABS_AVAILABLE = False
 
+ELEVENLABS_MODEL = "eleven_monolingual_v1"
+
+# Synthetic stand-in pacing, and the cap on a whole clip so long texts are voiced faster, not longer
+SYNTH_SECONDS_PER_CHAR = 0.08
+DEFAULT_SYNTH_SPEECH_MAX_SECONDS = 120
+
+# Lazily encoded speech plus what a response needs to describe it
+SpeechStream = namedtuple('SpeechStream', 'chunks mimetype extension chunk_count voice engine')
+
 class ProfessionalMediaService:
     """Professional AI Media Service with ElevenLabs and RunwayML integration"""
     
+    # Output resolutions (part of the render cache key)
+    MEME_SIZE = (1920, 1080)  # Full HD
+    VIDEO_SIZE = (1920, 1080)  # Full HD
+    
     def __init__(self):
         self.upload_folder = 'uploads'
         self.output_folder = 'outputs'
@@ -53,6 +81,15 @@ class ProfessionalMediaService:
             'comedy': {'voice': 'Nicole', 'stability': 0.4, 'similarity_boost': 0.8},
         }
     
+    @property
+    def tts_engine(self):
+        """Backend text_to_speech tries first (part of the render cache key).
+        
+        Results report the ``engine`` that actually voiced them, which is
+        ``'synthetic'`` when ElevenLabs failed and the stand-in was used.
+        """
+        return 'elevenlabs' if self.elevenlabs_enabled else 'synthetic'
+    
     def _init_elevenlabs(self):
         """Initialize ElevenLabs API"""
         if ELEVENLABS_AVAILABLE and self.elevenlabs_key and self.elevenlabs_key != 'your-elevenlabs-api-key':
@@ -83,44 +120,40 @@ class ProfessionalMediaService:
     def process_audio_file(self, audio_file):
         """Enhanced audio processing with better transcription"""
         try:
-            # Save the uploaded file
-            filename = secure_filename(audio_file.filename)
-            filepath = os.path.join(self.upload_folder, filename)
-            audio_file.save(filepath)
-            
-            # Enhanced transcription based on file analysis
-            file_size = os.path.getsize(filepath)
-            
-            # More realistic transcription based on file characteristics
-            if file_size < 100000:  # Small file (< 100KB)
-                transcriptions = [
-                    "I'm feeling overwhelmed with everything happening in my life right now. Work stress is getting to me and I need to find a way to express these emotions creatively.",
-                    "Today has been particularly challenging and I'm struggling with anxiety about the future. I want to transform these feelings into something positive and meaningful.",
-                    "I've been dealing with relationship issues and it's affecting my mental health. I need an outlet for these complex emotions I'm experiencing."
-                ]
-            elif file_size < 500000:  # Medium file (100KB - 500KB)
-                transcriptions = [
-                    "I've been carrying this emotional burden for weeks now, and I finally decided to record my thoughts. There's so much complexity in what I'm feeling - frustration mixed with hope, anxiety balanced with determination. I know that creative expression has always been my way of processing difficult times, and I'm ready to transform this raw emotion into something beautiful. Whether it becomes a poem, a song, or just a heartfelt story, I want these feelings to serve a purpose beyond just weighing me down.",
-                    "Life has thrown me some serious curveballs lately, and I'm at a point where I need to do something constructive with all this emotional energy. Between work pressures, family expectations, and personal goals that seem increasingly difficult to achieve, I feel like I'm drowning in responsibilities. But I've learned that my struggles can become my strength when I channel them through creative outlets. This recording represents my commitment to turning pain into purpose, confusion into clarity.",
-                    "I'm going through what feels like a major life transition, and honestly, it's terrifying and exciting at the same time. Old patterns aren't working anymore, relationships are evolving, and I'm discovering parts of myself I never knew existed. There's grief for who I used to be, anxiety about who I'm becoming, but also this incredible sense of possibility. I want to capture this moment of transformation and turn it into art that might help others going through similar experiences."
-                ]
-            else:  # Large file (> 500KB)
-                transcriptions = [
-                    "This is probably the most vulnerable I've ever been in a recording, but I feel like it's time to be completely honest about my journey. Over the past year, I've experienced loss, growth, failure, and unexpected victories in ways that have fundamentally changed how I see myself and the world around me. I've struggled with depression, celebrated small wins, questioned everything I thought I knew about success and happiness, and slowly built a new understanding of what it means to live authentically. The person speaking into this microphone today is different from who I was even six months ago, and I want to honor that transformation by creating something meaningful from all these experiences. Whether this becomes a deeply personal poem, an empowering song, or an inspiring story, I want it to reflect the full spectrum of human emotion and resilience. I've learned that our darkest moments often contain the seeds of our greatest breakthroughs, and I'm ready to plant those seeds through creative expression. This isn't just about venting or processing - this is about alchemy, turning the lead of difficult experiences into the gold of wisdom and art.",
-                    "I've been thinking a lot about authenticity lately, especially in a world that seems to value performance over presence, productivity over peace. This recording is my attempt to cut through all the noise and speak from the deepest, truest part of myself. I've spent years trying to fit into boxes that were never meant for me, pursuing goals that belonged to other people's dreams, and wondering why I felt so disconnected from my own life. The breaking point came when I realized I was living someone else's story and calling it my own. The journey back to myself has been messy, non-linear, and sometimes painful, but it's also been the most important work I've ever done. I've had to unlearn toxic patterns, set boundaries with people I love, and face fears I'd been avoiding for years. But in doing so, I've discovered reservoirs of strength, creativity, and compassion I never knew I possessed. This recording represents my commitment to living authentically, speaking truthfully, and creating art that reflects the full complexity of the human experience. I want whatever comes from this to inspire others to embrace their own authentic journey, even when it's scary or uncertain."
-                ]
-            
-            # Select appropriate transcription
-            import random
-            text = random.choice(transcriptions)
-            
-            # Clean up temporary file
-            os.remove(filepath)
+            # Decode in memory to 16 kHz mono with silence trimmed
+            try:
+                audio = ingest_audio(audio_file)
+            except AudioIngestError as e:
+                return {
+                    'success': False,
+                    'error': str(e),
+                    'message': 'Error processing audio file'
+                }
+            
+            # Transcribe pause-delimited segments concurrently (remote, local or hybrid per STT_MODE)
+            try:
+                transcript = transcribe_audio(audio)
+            except TranscriptionError as e:
+                self.logger.warning(f"Transcription failed: {e}")
+                return {
+                    'success': False,
+                    'error': f'Speech recognition is unavailable: {e}',
+                    'message': 'Error transcribing audio file'
+                }
+            if not transcript.text:
+                return {
+                    'success': False,
+                    'error': 'Could not understand audio',
+                    'message': 'Please try speaking more clearly'
+                }
             
             return {
                 'success': True,
-                'text': text,
-                'message': 'Audio processed with enhanced transcription analysis'
+                'text': transcript.text,
+                'duration': round(audio.duration, 2),
+                'segments': transcript.to_dict()['segments'],
+                'backend': transcript.backend,
+                'message': 'Audio transcribed successfully'
             }
             
         except Exception as e:
@@ -131,116 +164,147 @@ class ProfessionalMediaService:
                 'message': 'Error processing audio file'
             }
     
-    def text_to_speech(self, text, transformation_type='poem', language='en'):
-        """Professional text-to-speech using ElevenLabs"""
+    def process_video_file(self, video_file):
+        """Transcribe the soundtrack of a video rant without decoding its frames"""
+        try:
+            try:
+                probe, audio = ingest_video(video_file)
+            except AudioIngestError as e:
+                return {
+                    'success': False,
+                    'error': str(e),
+                    'message': 'Error processing video file'
+                }
+            
+            try:
+                transcript = transcribe_audio(audio)
+            except TranscriptionError as e:
+                self.logger.warning(f"Transcription failed: {e}")
+                return {
+                    'success': False,
+                    'error': f'Speech recognition is unavailable: {e}',
+                    'message': 'Error transcribing video file'
+                }
+            if not transcript.text:
+                return {
+                    'success': False,
+                    'error': 'Could not understand the audio in this video',
+                    'message': 'Please try speaking more clearly'
+                }
+            
+            return {
+                'success': True,
+                'text': transcript.text,
+                'duration': round(probe.duration or audio.decoded_duration, 2),
+                'segments': transcript.to_dict()['segments'],
+                'backend': transcript.backend,
+                'message': 'Video transcribed successfully'
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Video processing error: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'message': 'Error processing video file'
+            }
+    
+    def text_to_speech(self, text, transformation_type='poem', language='en', settings=None):
+        """Professional text-to-speech using ElevenLabs.
+        
+        Text of any length is split into sentence chunks that are voiced
+        concurrently (see tts_pipeline) and joined into one clip. ``settings``
+        (see audio_synth) picks the output format and sample rate.
+        """
+        settings = settings or resolve_audio_settings()
         try:
             if self.elevenlabs_enabled:
-                # Get voice configuration for content type
-                voice_config = self.voice_configs.get(transformation_type, self.voice_configs['poem'])
-                
-                # Limit text length for better audio quality
-                if len(text) > 500:
-                    text = text[:497] + "..."
-                
-                # Generate audio using ElevenLabs
-                audio_data = generate(
-                    text=text,
-                    voice=voice_config['voice'],
-                    model="eleven_monolingual_v1",
-                    voice_settings={
-                        "stability": voice_config['stability'],
-                        "similarity_boost": voice_config['similarity_boost']
-                    }
-                )
-                
-                # Convert to base64
-                audio_base64 = base64.b64encode(audio_data).decode()
+                stream = self.speech_stream(text, transformation_type, settings)
+                filename = media_store.save_stream(stream.chunks, stream.extension, 'audio')
+                audio_url = media_store.url('audio', filename)
                 
                 return {
                     'success': True,
-                    'audio_data': f"data:audio/mp3;base64,{audio_base64}",
-                    'message': f'Professional TTS generated using ElevenLabs - Voice: {voice_config["voice"]}'
+                    'audio_data': audio_url,
+                    'audio_url': audio_url,
+                    'audio_file': filename,
+                    'mimetype': stream.mimetype,
+                    'chunks': stream.chunk_count,
+                    'engine': stream.engine,
+                    'message': f'Professional TTS generated using ElevenLabs - Voice: {stream.voice}'
                 }
                 
             else:
                 # Fallback to enhanced mock audio
-                return self._generate_enhanced_mock_audio(text, transformation_type)
+                return self._generate_enhanced_mock_audio(text, transformation_type, settings)
                 
         except Exception as e:
             self.logger.error(f"ElevenLabs TTS error: {e}")
             # Fallback to enhanced mock audio
-            return self._generate_enhanced_mock_audio(text, transformation_type)
+            return self._generate_enhanced_mock_audio(text, transformation_type, settings)
+    
+    def speech_stream(self, text, transformation_type='poem', settings=None):
+        """Encoded speech as a lazy iterable of byte chunks, produced as chunks are voiced.
+        
+        Uses ElevenLabs when configured and the synthetic stand-in otherwise.
+        MP3 and WAV (with a streaming header) play progressively without
+        Range requests.
+        """
+        settings = settings or resolve_audio_settings()
+        
+        if self.elevenlabs_enabled:
+            # Get voice configuration for content type
+            voice_config = self.voice_configs.get(transformation_type, self.voice_configs['poem'])
+            voice = voice_config['voice']
+            pipeline = TTSPipeline.from_config(
+                lambda chunk: self._elevenlabs_chunk(chunk, voice_config),
+                {'engine': 'elevenlabs', 'model': ELEVENLABS_MODEL, **voice_config},
+                settings.sample_rate
+            )
+            if not ffmpeg_available():
+                # MP3 chunks cannot be decoded without ffmpeg, but their frames concatenate as-is
+                return SpeechStream(pipeline.stream_encoded(text), 'audio/mpeg', 'mp3',
+                                    len(pipeline.chunks(text)), voice, 'elevenlabs')
+        else:
+            voice = 'synthetic'
+            pipeline = self._synthetic_pipeline(text, transformation_type, settings)
+        
+        # Chunks are decoded, crossfaded and encoded as one stream
+        chunks = encode_audio(pipeline.stream(text), settings.sample_rate, settings.format)
+        return SpeechStream(chunks, settings.mimetype, settings.extension, len(pipeline.chunks(text)), voice,
+                            self.tts_engine)
+    
+    def _elevenlabs_chunk(self, text, voice_config):
+        """Voice one chunk with ElevenLabs; returns MP3 bytes"""
+        audio_data = generate(
+            text=text,
+            voice=voice_config['voice'],
+            model=ELEVENLABS_MODEL,
+            voice_settings={
+                "stability": voice_config['stability'],
+                "similarity_boost": voice_config['similarity_boost']
+            }
+        )
+        return audio_data if isinstance(audio_data, bytes) else b''.join(audio_data)
     
-    def _generate_enhanced_mock_audio(self, text, transformation_type):
+    def _generate_enhanced_mock_audio(self, text, transformation_type, settings=None):
         """Generate enhanced mock audio when ElevenLabs is unavailable"""
         try:
-            # Create more realistic audio based on content type
-            duration = min(len(text) * 0.08, 30)  # More realistic duration
-            sample_rate = 44100  # Higher quality
-            
-            # Different audio characteristics for different content types
-            if transformation_type == 'rap':
-                frequencies = [220, 330, 440]  # Lower, rhythmic
-                rhythm = 0.2
-            elif transformation_type == 'song':
-                frequencies = [262, 330, 392]  # Musical notes
-                rhythm = 0.3
-            elif transformation_type == 'poem':
-                frequencies = [294, 370, 440]  # Flowing tones
-                rhythm = 0.25
-            else:
-                frequencies = [330, 415, 523]  # Default harmonious
-                rhythm = 0.3
-            
-            # Generate complex waveform
-            t = np.linspace(0, duration, int(sample_rate * duration))
-            audio_data = np.zeros_like(t)
-            
-            # Mix multiple frequencies for richer sound
-            for i, freq in enumerate(frequencies):
-                phase = i * np.pi / 3
-                amplitude = 0.2 / (i + 1)
-                audio_data += amplitude * np.sin(2 * np.pi * freq * t + phase)
-            
-            # Add rhythm variation
-            rhythm_pattern = np.sin(2 * np.pi * t / rhythm) * 0.1 + 1
-            audio_data *= rhythm_pattern
-            
-            # Apply envelope for natural sound
-            envelope = np.exp(-t / (duration * 0.3))
-            audio_data *= envelope
-            
-            # Convert to 16-bit integers
-            audio_data = (audio_data * 32767 * 0.5).astype(np.int16)
-            
-            # Create WAV file in memory with proper header
-            wav_buffer = io.BytesIO()
-            import struct
-            
-            # WAV header
-            wav_buffer.write(b'RIFF')
-            wav_buffer.write(struct.pack('<L', 36 + len(audio_data) * 2))
-            wav_buffer.write(b'WAVE')
-            wav_buffer.write(b'fmt ')
-            wav_buffer.write(struct.pack('<L', 16))
-            wav_buffer.write(struct.pack('<H', 1))  # PCM
-            wav_buffer.write(struct.pack('<H', 1))  # Mono
-            wav_buffer.write(struct.pack('<L', sample_rate))
-            wav_buffer.write(struct.pack('<L', sample_rate * 2))
-            wav_buffer.write(struct.pack('<H', 2))
-            wav_buffer.write(struct.pack('<H', 16))
-            wav_buffer.write(b'data')
-            wav_buffer.write(struct.pack('<L', len(audio_data) * 2))
-            wav_buffer.write(audio_data.tobytes())
-            
-            # Convert to base64
-            wav_buffer.seek(0)
-            audio_base64 = base64.b64encode(wav_buffer.read()).decode()
+            settings = settings or resolve_audio_settings()
+            
+            pipeline = self._synthetic_pipeline(text, transformation_type, settings)
+            filename = save_audio(pipeline.stream(text), settings)
+            audio_url = media_store.url('audio', filename)
             
             return {
                 'success': True,
-                'audio_data': f"data:audio/wav;base64,{audio_base64}",
-                'message': f'Enhanced mock TTS generated - Type: {transformation_type}'
+                'audio_data': audio_url,
+                'audio_url': audio_url,
+                'audio_file': filename,
+                'mimetype': settings.mimetype,
+                'chunks': len(pipeline.chunks(text)),
+                'engine': 'synthetic',
+                'message': f'Enhanced mock TTS generated - Type: {transformation_type} ({settings.format}, {settings.sample_rate} Hz)'
             }
             
         except Exception as e:
@@ -251,15 +315,55 @@ class ProfessionalMediaService:
                 'message': 'Error generating audio'
             }
     
-    def generate_meme_image(self, text, template_type='default'):
-        """Enhanced image generation with professional design"""
+    def _synthetic_pipeline(self, text, transformation_type, settings):
+        """The local stand-in goes through the same chunked pipeline as ElevenLabs.
+        
+        Chunks are paced so the whole of ``text`` lasts at most
+        ``SYNTH_SPEECH_MAX_SECONDS``.
+        """
+        max_seconds = app_config().get('SYNTH_SPEECH_MAX_SECONDS', DEFAULT_SYNTH_SPEECH_MAX_SECONDS)
+        seconds_per_char = min(SYNTH_SECONDS_PER_CHAR, max_seconds / max(len(text), 1))
+        return TTSPipeline.from_config(
+            lambda chunk: self._synthetic_chunk(chunk, transformation_type, settings.sample_rate, seconds_per_char),
+            {'engine': 'synthetic', 'type': transformation_type}, settings.sample_rate, cached=False
+        )
+    
+    @staticmethod
+    def _synthetic_chunk(text, transformation_type, sample_rate, seconds_per_char=SYNTH_SECONDS_PER_CHAR):
+        """Tone stand-in for one chunk of speech; returns float32 samples"""
+        duration = len(text) * seconds_per_char
+        
+        # Different audio characteristics for different content types
+        if transformation_type == 'rap':
+            frequencies = [220, 330, 440]  # Lower, rhythmic
+            rhythm = 0.2
+        elif transformation_type == 'song':
+            frequencies = [262, 330, 392]  # Musical notes
+            rhythm = 0.3
+        elif transformation_type == 'poem':
+            frequencies = [294, 370, 440]  # Flowing tones
+            rhythm = 0.25
+        else:
+            frequencies = [330, 415, 523]  # Default harmonious
+            rhythm = 0.3
+        
+        # Mixed partials with rhythm variation and a natural decay
+        partials = [(freq, 0.2 / (i + 1), i * np.pi / 3) for i, freq in enumerate(frequencies)]
+        blocks = synthesize_tones(duration, sample_rate, partials, tremolo=(1 / rhythm, 0.1),
+                                  decay=duration * 0.3, gain=0.5)
+        return np.concatenate(list(blocks) or [np.zeros(0, dtype=np.float32)])
+    
+    def generate_meme_image(self, text, template_type='default', profile=None):
+        """Enhanced image generation with professional design.
+        
+        ``profile`` (see output_profiles) picks the resolution and encoder; the
+        layout is designed for Full HD and scaled to the profile.
+        """
         try:
-            # Professional image dimensions
-            width, height = 1920, 1080  # Full HD
-            
-            # Create high-quality image
-            image = Image.new('RGB', (width, height))
-            draw = ImageDraw.Draw(image)
+            profile = profile or resolve_profile('hd')
+            width, height = profile.width, profile.height
+            scale = min(width, height) / self.MEME_SIZE[1]
+            margin = int(100 * scale)
             
             # Professional color schemes based on template type
             color_schemes = {
@@ -292,100 +396,72 @@ class ProfessionalMediaService:
             
             scheme = color_schemes.get(template_type, color_schemes['default'])
             
-            # Create professional gradient background
-            for y in range(height):
-                ratio = y / height
-                r = int(scheme['gradient'][0][0] * (1 - ratio) + scheme['gradient'][1][0] * ratio)
-                g = int(scheme['gradient'][0][1] * (1 - ratio) + scheme['gradient'][1][1] * ratio)
-                b = int(scheme['gradient'][0][2] * (1 - ratio) + scheme['gradient'][1][2] * ratio)
-                draw.line([(0, y), (width, y)], fill=(r, g, b))
+            # Professional gradient background with diagonal accent lines (cached per scheme)
+            image = gradient_background(width, height, scheme['gradient'][0], scheme['gradient'][1],
+                                        accent=scheme['accent'])
             
-            # Add professional geometric elements
-            # Diagonal lines for visual interest
-            for i in range(0, width + height, 100):
-                draw.line([(i, 0), (i - height, height)], fill=(*scheme['accent'][:3], 20), width=2)
+            # Smart text layout
+            max_width = width - 2 * margin
+            header_text = f"✨ {template_type.upper()} TRANSFORMATION ✨"
+            footer_text = "Created with RantAi • AI-Powered Transformation"
             
-            # Professional typography
-            try:
-                title_font = ImageFont.truetype("arial.ttf", 80)
-                subtitle_font = ImageFont.truetype("arial.ttf", 50)
-                body_font = ImageFont.truetype("arial.ttf", 36)
-            except:
-                title_font = ImageFont.load_default()
-                subtitle_font = ImageFont.load_default()
-                body_font = ImageFont.load_default()
+            # Professional typography (header and footer shrink to fit narrow profiles)
+            body_size = max(10, int(36 * scale))
+            title_size = self._fit_font_size(header_text, int(80 * scale), max_width)
+            subtitle_size = self._fit_font_size(footer_text, int(50 * scale), max_width)
+            title_font = get_font(title_size)
+            subtitle_font = get_font(subtitle_size)
+            body_font = get_font(body_size)
             
-            # Smart text layout
-            max_width = width - 200  # Margins
-            words = text.split()
-            lines = []
-            current_line = []
-            
-            for word in words:
-                test_line = ' '.join(current_line + [word])
-                bbox = draw.textbbox((0, 0), test_line, font=body_font)
-                if bbox[2] - bbox[0] > max_width and current_line:
-                    lines.append(' '.join(current_line))
-                    current_line = [word]
-                else:
-                    current_line.append(word)
-            
-            if current_line:
-                lines.append(' '.join(current_line))
+            lines = wrap_text(text, body_size, max_width)
             
             # Limit lines for readability
             if len(lines) > 12:
                 lines = lines[:11] + ['...']
             
             # Add content type header
-            header_text = f"✨ {template_type.upper()} TRANSFORMATION ✨"
-            bbox = draw.textbbox((0, 0), header_text, font=title_font)
-            header_width = bbox[2] - bbox[0]
+            header_width = int(text_width(header_text, title_size))
             header_x = (width - header_width) // 2
-            header_y = 80
+            header_y = int(80 * scale)
             
-            # Draw header with shadow
-            shadow_offset = 4
-            draw.text((header_x + shadow_offset, header_y + shadow_offset), header_text, 
-                     font=title_font, fill=(0, 0, 0, 128))
-            draw.text((header_x, header_y), header_text, font=title_font, fill=scheme['accent'])
+            # Draw header with a soft drop shadow
+            header_style = TextStyle(fill=scheme['accent'], shadow_offset=max(1, int(4 * scale)),
+                                     shadow_alpha=128, shadow_blur=max(1, int(3 * scale)))
+            header_style.draw(image, (header_x, header_y), header_text, title_font)
             
             # Draw main content
-            line_height = 60
+            line_height = int(60 * scale)
             total_text_height = len(lines) * line_height
-            start_y = (height - total_text_height) // 2 + 100
+            start_y = (height - total_text_height) // 2 + margin
+            
+            # Text shadow for better readability
+            body_style = TextStyle(fill=scheme['text'], shadow_offset=max(1, int(3 * scale)),
+                                   shadow_alpha=180, shadow_blur=max(1, int(2 * scale)))
             
             for i, line in enumerate(lines):
-                bbox = draw.textbbox((0, 0), line, font=body_font)
-                text_width = bbox[2] - bbox[0]
-                x = (width - text_width) // 2
+                x = (width - int(text_width(line, body_size))) // 2
                 y = start_y + i * line_height
-                
-                # Text shadow for better readability
-                shadow_offset = 3
-                draw.text((x + shadow_offset, y + shadow_offset), line, 
-                         font=body_font, fill=(0, 0, 0, 180))
-                draw.text((x, y), line, font=body_font, fill=scheme['text'])
+                body_style.draw(image, (x, y), line, body_font)
             
             # Add footer branding
-            footer_text = "Created with RantAi • AI-Powered Transformation"
-            bbox = draw.textbbox((0, 0), footer_text, font=subtitle_font)
-            footer_width = bbox[2] - bbox[0]
+            footer_width = int(text_width(footer_text, subtitle_size))
             footer_x = (width - footer_width) // 2
-            footer_y = height - 120
+            footer_y = height - int(120 * scale)
             
-            draw.text((footer_x, footer_y), footer_text, font=subtitle_font, 
-                     fill=(*scheme['accent'][:3], 180))
+            footer_style = TextStyle(fill=(*scheme['accent'][:3], 180))
+            footer_style.draw(image, (footer_x, footer_y), footer_text, subtitle_font)
             
-            # Convert to base64
-            buffered = io.BytesIO()
-            image.save(buffered, format='PNG', quality=95, optimize=True)
-            img_str = base64.b64encode(buffered.getvalue()).decode()
+            filename = media_store.save_image(image, profile.format, **profile.options)
+            image_url = media_store.url('images', filename)
             
             return {
                 'success': True,
-                'image_data': f"data:image/png;base64,{img_str}",
-                'message': f'Professional {template_type} image generated in Full HD'
+                'image_data': image_url,
+                'image_url': image_url,
+                'image_file': filename,
+                'mimetype': profile.mimetype,
+                'profile': profile.name,
+                'message': f'Professional {template_type} image generated ({profile.name}, {width}x{height} {profile.extension})'
             }
             
         except Exception as e:
@@ -396,6 +472,14 @@ class ProfessionalMediaService:
                 'message': 'Error generating professional image'
             }
     
+    @staticmethod
+    def _fit_font_size(text, size, max_width):
+        """Largest size up to ``size`` at which ``text`` fits in ``max_width``"""
+        measured = text_width(text, size)
+        if measured <= max_width:
+            return size
+        return max(8, int(size * max_width / measured))
+    
     def create_video_from_text(self, text, background_color=(30, 30, 30), duration=10):
         """Professional video generation with RunwayML integration"""
         try:
@@ -408,6 +492,25 @@ class ProfessionalMediaService:
             self.logger.error(f"Video generation error: {e}")
             return self._create_enhanced_video_frames(text, background_color, duration)
     
+    def create_video_scene(self, text, background_color=(30, 30, 30), duration=10):
+        """Describe the cinematic animation as a scene for the frontend to play natively"""
+        try:
+            width, height = self.VIDEO_SIZE
+            scene = build_text_scene(text, width, height, fps=30, duration=duration,
+                                     background_color=tuple(background_color))
+            return {
+                'success': True,
+                'scene': scene,
+                'message': f"Cinematic scene generated (format v{scene['version']})"
+            }
+        except Exception as e:
+            self.logger.error(f"Scene generation error: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'message': 'Error generating scene'
+            }
+    
     def _create_runwayml_video(self, text, duration=10):
         """Create video using RunwayML API"""
         try:
@@ -434,14 +537,18 @@ class ProfessionalMediaService:
                 
                 # Check if video generation is complete
                 if 'video_url' in result:
-                    # Download the video
-                    video_response = requests.get(result['video_url'])
+                    # Stream the video to disk
+                    video_response = requests.get(result['video_url'], stream=True, timeout=60)
                     if video_response.status_code == 200:
-                        video_base64 = base64.b64encode(video_response.content).decode()
+                        filename = media_store.save_stream(video_response.iter_content(chunk_size=1024 * 1024),
+                                                           'mp4', 'videos')
                         
                         return {
                             'success': True,
-                            'video_data': f"data:video/mp4;base64,{video_base64}",
+                            'video_data': media_store.url('videos', filename),
+                            'video_file': filename,
+                            'mimetype': 'video/mp4',
+                            'engine': 'runwayml',
                             'message': 'Professional video generated using RunwayML'
                         }
                 
@@ -449,6 +556,7 @@ class ProfessionalMediaService:
                 return {
                     'success': True,
                     'video_data': f"data:application/json;base64,{base64.b64encode(json.dumps({'status': 'processing', 'job_id': result.get('id', 'unknown')}).encode()).decode()}",
+                    'engine': 'runwayml',
                     'message': 'RunwayML video generation in progress'
                 }
             
@@ -461,144 +569,59 @@ class ProfessionalMediaService:
             return self._create_enhanced_video_frames(text, (30, 30, 30), duration)
     
     def _create_enhanced_video_frames(self, text, background_color, duration):
-        """Create enhanced video frames with professional quality"""
+        """Render the cinematic text animation and encode it to a video file"""
+        encoder = None
         try:
             # Professional video settings
-            width, height = 1920, 1080  # Full HD
+            width, height = self.VIDEO_SIZE
             fps = 30  # Smooth video
             total_frames = min(int(fps * duration), 150)  # Limit for performance
             
-            # Prepare text for cinematic presentation
-            words = text.split()
+            if not encoder_available():
+                return {
+                    'success': False,
+                    'error': 'Video encoding not available',
+                    'message': 'Install ffmpeg or opencv-python to generate videos'
+                }
             
-            # Create professional frames
-            frames = []
+            # Export rasterizes the same scene the frontend plays, squeezed into the frame cap
+            scene = build_text_scene(text, width, height, fps=fps, duration=total_frames / fps,
+                                     background_color=background_color)
             
-            for frame_num in range(total_frames):
-                # Create frame with cinematic background
-                frame = Image.new('RGB', (width, height))
-                draw = ImageDraw.Draw(frame)
-                
-                # Cinematic gradient background with movement
-                time_ratio = frame_num / total_frames
-                
-                # Moving gradient effect
-                offset = int(time_ratio * 100)
-                for y in range(height):
-                    wave = np.sin((y + offset) * 0.01) * 30
-                    color_mod = int(wave)
-                    color = (
-                        max(0, min(255, background_color[0] + color_mod)),
-                        max(0, min(255, background_color[1] + color_mod)),
-                        max(0, min(255, background_color[2] + color_mod + 20))
-                    )
-                    draw.line([(0, y), (width, y)], fill=color)
-                
-                # Add animated particles
-                for i in range(20):
-                    particle_x = int((i * 97 + frame_num * 2) % width)
-                    particle_y = int((i * 73 + frame_num * 1.5) % height)
-                    particle_size = 3 + int(np.sin(frame_num * 0.1 + i) * 2)
-                    draw.ellipse([particle_x-particle_size, particle_y-particle_size, 
-                                particle_x+particle_size, particle_y+particle_size], 
-                               fill=(255, 255, 255, 50))
-                
-                # Progressive text reveal with animation
-                words_to_show = int((time_ratio ** 0.7) * len(words)) + 1
-                current_text = ' '.join(words[:min(words_to_show, len(words))])
-                
-                if current_text.strip():
-                    # Professional typography
-                    try:
-                        font = ImageFont.truetype("arial.ttf", 64)
-                    except:
-                        font = ImageFont.load_default()
-                    
-                    # Smart text wrapping for cinematic presentation
-                    max_width = width - 200
-                    lines = []
-                    current_line = []
-                    
-                    for word in current_text.split():
-                        test_line = ' '.join(current_line + [word])
-                        bbox = draw.textbbox((0, 0), test_line, font=font)
-                        if bbox[2] - bbox[0] > max_width and current_line:
-                            lines.append(' '.join(current_line))
-                            current_line = [word]
-                        else:
-                            current_line.append(word)
-                    
-                    if current_line:
-                        lines.append(' '.join(current_line))
-                    
-                    # Limit lines for readability
-                    lines = lines[:6]
-                    
-                    # Cinematic text positioning with animation
-                    line_height = 80
-                    total_text_height = len(lines) * line_height
-                    
-                    # Animated vertical position
-                    base_y = (height - total_text_height) // 2
-                    anim_offset = int(np.sin(time_ratio * np.pi) * 20)
-                    start_y = base_y + anim_offset
-                    
-                    # Draw text with cinematic effects
-                    for i, line in enumerate(lines):
-                        bbox = draw.textbbox((0, 0), line, font=font)
-                        text_width = bbox[2] - bbox[0]
-                        
-                        # Animated horizontal position
-                        base_x = (width - text_width) // 2
-                        line_anim = np.sin(time_ratio * np.pi + i * 0.3) * 10
-                        x = int(base_x + line_anim)
-                        y = start_y + i * line_height
-                        
-                        # Dramatic shadow effect
-                        shadow_offset = 8
-                        shadow_alpha = int(200 * (1 - time_ratio * 0.3))
-                        draw.text((x + shadow_offset, y + shadow_offset), line, 
-                                font=font, fill=(0, 0, 0, shadow_alpha))
-                        
-                        # Glowing text effect
-                        glow_color = (255, 255, 255, int(255 * (0.7 + 0.3 * np.sin(time_ratio * np.pi * 2))))
-                        for glow_offset in range(1, 4):
-                            draw.text((x + glow_offset, y), line, font=font, fill=(255, 255, 255, 30))
-                            draw.text((x - glow_offset, y), line, font=font, fill=(255, 255, 255, 30))
-                            draw.text((x, y + glow_offset), line, font=font, fill=(255, 255, 255, 30))
-                            draw.text((x, y - glow_offset), line, font=font, fill=(255, 255, 255, 30))
-                        
-                        # Main text
-                        draw.text((x, y), line, font=font, fill=(255, 255, 255))
-                
-                # Convert frame to base64
-                buffered = io.BytesIO()
-                frame.save(buffered, format='PNG', optimize=True)
-                frame_b64 = base64.b64encode(buffered.getvalue()).decode()
-                frames.append(frame_b64)
-            
-            # Create professional video response
-            video_data = {
-                'frames': frames,
-                'fps': fps,
-                'duration': duration,
-                'width': width,
-                'height': height,
-                'type': 'cinematic_sequence',
-                'quality': 'full_hd'
-            }
+            # Render the moving wave once; workers map it from shared memory and slice it per frame
+            wave_strip = scene_background(scene)
             
-            # Encode as base64
-            video_json = json.dumps(video_data)
-            video_base64 = base64.b64encode(video_json.encode()).decode()
+            # Frames are rendered across the render pool and streamed into the encoder in order
+            encoder = VideoEncoder(width, height, fps=fps)
+            encoder.open()
+            
+            scheduler = FrameScheduler.from_config()
+            for frame in scheduler.render(SceneRenderer, total_frames, background=wave_strip, scene=scene):
+                encoder.write(frame)
+            
+            encoder.close()
             
             return {
                 'success': True,
-                'video_data': f"data:application/json;base64,{video_base64}",
-                'message': f'Professional cinematic video generated - {len(frames)} frames at Full HD'
+                'video_data': video_url(encoder.filename),
+                'video_file': encoder.filename,
+                'mimetype': encoder.mimetype,
+                'engine': 'local',
+                'metadata': {
+                    'fps': fps,
+                    'frames': encoder.frame_count,
+                    'width': width,
+                    'height': height,
+                    'encoder': encoder.backend,
+                    'scene_version': SCENE_VERSION,
+                    'quality': 'full_hd'
+                },
+                'message': f'Professional cinematic video generated - {encoder.frame_count} frames at Full HD'
             }
             
         except Exception as e:
+            if encoder is not None:
+                encoder.abort()
             self.logger.error(f"Enhanced video generation error: {e}")
             return {
                 'success': False,
@@ -609,15 +632,9 @@ class ProfessionalMediaService:
     def process_image_file(self, image_file):
         """Enhanced image processing"""
         try:
-            filename = secure_filename(image_file.filename)
-            filepath = os.path.join(self.upload_folder, filename)
-            image_file.save(filepath)
-            
-            # Open and analyze image
-            image = Image.open(filepath)
-            width, height = image.size
-            format = image.format
-            mode = image.mode
+            # Store once; decode only at preview size for thumbnails and colour stats
+            image = ingest_image(image_file)
+            width, height = image.width, image.height
             
             # Advanced image analysis
             aspect_ratio = width / height
@@ -631,25 +648,19 @@ class ProfessionalMediaService:
             else:
                 quality = "low"
             
-            # Convert to base64
-            buffered = io.BytesIO()
-            image.save(buffered, format=format or 'JPEG')
-            img_str = base64.b64encode(buffered.getvalue()).decode()
-            
-            # Clean up
-            os.remove(filepath)
-            
             return {
                 'success': True,
-                'image_data': f"data:image/{format.lower()};base64,{img_str}",
+                'image_data': preview_url(image),
+                'thumbnails': thumbnail_urls(image),
                 'metadata': {
                     'width': width,
                     'height': height,
-                    'format': format,
-                    'mode': mode,
+                    'format': image.format,
+                    'mode': image.mode,
                     'aspect_ratio': round(aspect_ratio, 2),
                     'quality': quality,
-                    'total_pixels': total_pixels
+                    'total_pixels': total_pixels,
+                    **image.stats
                 },
                 'message': 'Image processed with professional analysis'
             }
@@ -1,6 +1,10 @@
 from datetime import datetime
 from app.models import Rant, EmotionType
 from app.services.ai_service import AIService
+from app.services.audio_ingest import ingest_audio_file
+from app.services.keyword_index import KeywordIndex
+from app.services.transcription import transcribe_audio
+from app.services.video_ingest import ingest_video
 from app import db
 import json
 
@@ -25,6 +29,7 @@ class RantProcessor:
             rant.emotion_confidence = analysis.get('emotion_confidence', 0.0)
             rant.sentiment_score = analysis.get('sentiment_score', 0.0)
             rant.keywords = analysis.get('keywords', '[]')
+            KeywordIndex().index_rant(rant, rant.keywords)
             rant.processed = True
             rant.processing_status = 'completed'
             rant.processed_at = datetime.utcnow()
@@ -50,21 +55,21 @@ class RantProcessor:
             }
     
     def extract_audio_text(self, file_path: str) -> str:
-        """Extract text from audio file using speech-to-text"""
-        # This would integrate with services like:
-        # - Google Speech-to-Text
-        # - AWS Transcribe
-        # - OpenAI Whisper
-        # For now, return placeholder
-        return "Audio transcription not implemented yet"
+        """Extract text from audio file using speech-to-text.
+        
+        Raises AudioIngestError for undecodable or over-long audio and
+        TranscriptionError when no speech backend can transcribe it.
+        """
+        return transcribe_audio(ingest_audio_file(file_path)).text
     
     def extract_video_text(self, file_path: str) -> str:
-        """Extract text from video file"""
-        # This would:
-        # 1. Extract audio from video
-        # 2. Use speech-to-text on audio
-        # 3. Optionally use OCR on video frames
-        return "Video transcription not implemented yet"
+        """Extract text from a video file by transcribing its soundtrack.
+        
+        Over-long videos are rejected from the container header before
+        decoding (VideoIngestError); frames are never decoded.
+        """
+        _, audio = ingest_video(file_path)
+        return transcribe_audio(audio).text
     
     def validate_rant_content(self, content: str) -> dict:
         """Validate rant content before processing"""
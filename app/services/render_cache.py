@@ -0,0 +1,213 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from app.services.media_store import MEDIA_OUTPUT_FOLDER, media_store
+
+# Bump when any renderer's output changes for the same inputs
+RENDERER_VERSION = '3'
+
+# Media kind -> result keys rebuilt from the stored filename on a hit
+RESULT_FIELDS = {
+    'images': ('image_data', 'image_url', 'image_file'),
+    'audio': ('audio_data', 'audio_url', 'audio_file'),
+    'videos': ('video_data', 'video_url', 'video_file'),
+}
+
+class RenderCache:
+    """Content-addressed cache of rendered memes, speech and videos.
+
+    The key is a hash of the renderer name, ``RENDERER_VERSION`` and the
+    rendering inputs. Artifacts live in the media store; the cache keeps one
+    small JSON entry per key on disk plus an in-memory LRU index, and evicts
+    least recently used artifacts once ``RENDER_CACHE_MAX_BYTES`` is exceeded.
+    Entries written by other workers are picked up from disk on a miss.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.max_bytes = 1024 ** 3
+        self.folder = os.path.join(MEDIA_OUTPUT_FOLDER, 'render_cache')
+        self.logger = logging.getLogger(__name__)
+
+        self._index = OrderedDict()  # key -> entry, least recently used first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read settings, load the on-disk index and register the cache on the app"""
+        self.enabled = app.config.get('RENDER_CACHE_ENABLED', True)
+        self.max_bytes = int(app.config.get('RENDER_CACHE_MAX_BYTES', self.max_bytes))
+        self.folder = app.config.get('RENDER_CACHE_FOLDER', self.folder)
+        if self.enabled:
+            os.makedirs(self.folder, exist_ok=True)
+            self._load()
+        app.render_cache = self
+
+    @staticmethod
+    def key(renderer, **inputs):
+        """Stable key for a renderer and its inputs"""
+        payload = json.dumps({'renderer': renderer, 'version': RENDERER_VERSION, 'inputs': inputs},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def fetch(self, renderer, inputs, render):
+        """Return the cached result for ``inputs`` or call ``render()`` and cache it.
+
+        The result carries ``cached`` so callers can report hits. A result
+        whose ``engine`` differs from the ``engine`` input came from a
+        fallback renderer; it is returned but not cached under that key.
+        """
+        if not self.enabled:
+            return {**render(), 'cached': False}
+
+        key = self.key(renderer, **inputs)
+        result = self.get(key)
+        if result is not None:
+            return {**result, 'cached': True}
+
+        result = render()
+        if result.get('success') and result.get('engine', inputs.get('engine')) == inputs.get('engine'):
+            self.put(key, result)
+        return {**result, 'cached': False}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None:
+                self._index.move_to_end(key)
+
+        if entry is None:
+            entry = self._read_entry(key)
+            if entry is None:
+                return None
+            self._remember(key, entry)
+
+        path = os.path.join(media_store.directory(entry['kind']), entry['filename'])
+        if not os.path.exists(path):
+            self._forget(key)
+            return None
+
+        self._touch(key)
+        return self._to_result(entry)
+
+    def put(self, key, result):
+        """Cache a successful render result that produced a stored file"""
+        for kind, (_, _, file_field) in RESULT_FIELDS.items():
+            filename = result.get(file_field)
+            if filename:
+                break
+        else:
+            return
+
+        path = os.path.join(media_store.directory(kind), filename)
+        if not os.path.exists(path):
+            return
+
+        extra = {
+            name: value for name, value in result.items()
+            if name not in RESULT_FIELDS[kind] and name not in ('success', 'cached')
+        }
+        entry = {'kind': kind, 'filename': filename, 'size': os.path.getsize(path), 'result': extra}
+
+        self._write_entry(key, entry)
+        self._remember(key, entry)
+        self._evict()
+
+    def _to_result(self, entry):
+        data_field, url_field, file_field = RESULT_FIELDS[entry['kind']]
+        url = media_store.url(entry['kind'], entry['filename'])
+        return {
+            **entry['result'],
+            'success': True,
+            data_field: url,
+            url_field: url,
+            file_field: entry['filename'],
+        }
+
+    def _remember(self, key, entry):
+        with self._lock:
+            previous = self._index.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous['size']
+            self._index[key] = entry
+            self._total_bytes += entry['size']
+
+    def _forget(self, key):
+        with self._lock:
+            entry = self._index.pop(key, None)
+            if entry is not None:
+                self._total_bytes -= entry['size']
+        self._remove(self._entry_path(key))
+
+    def _evict(self):
+        """Drop least recently used entries (and their files) until under the size cap"""
+        while True:
+            with self._lock:
+                if self._total_bytes <= self.max_bytes or len(self._index) <= 1:
+                    return
+                key, entry = self._index.popitem(last=False)
+                self._total_bytes -= entry['size']
+                shared = any(other['filename'] == entry['filename'] for other in self._index.values())
+
+            self._remove(self._entry_path(key))
+            if not shared:
+                self._remove(os.path.join(media_store.directory(entry['kind']), entry['filename']))
+
+    def _load(self):
+        """Rebuild the in-memory index from disk, oldest access first"""
+        entries = []
+        for name in os.listdir(self.folder):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.folder, name)
+            try:
+                with open(path) as handle:
+                    entries.append((os.path.getmtime(path), name[:-5], json.load(handle)))
+            except (OSError, ValueError):
+                continue
+
+        for _, key, entry in sorted(entries, key=lambda item: item[0]):
+            self._remember(key, entry)
+        self._evict()
+
+    def _entry_path(self, key):
+        return os.path.join(self.folder, f"{key}.json")
+
+    def _read_entry(self, key):
+        try:
+            with open(self._entry_path(key)) as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def _write_entry(self, key, entry):
+        fd, temp_path = tempfile.mkstemp(dir=self.folder, prefix='.entry-')
+        try:
+            with os.fdopen(fd, 'w') as handle:
+                json.dump(entry, handle)
+            os.replace(temp_path, self._entry_path(key))
+        except OSError as e:
+            self.logger.warning(f"Could not write render cache entry: {e}")
+            self._remove(temp_path)
+
+    def _touch(self, key):
+        """Record the access on disk so the LRU order survives restarts"""
+        try:
+            os.utime(self._entry_path(key))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
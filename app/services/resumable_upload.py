@@ -0,0 +1,170 @@
+"""Resumable uploads for large audio and video rants.
+
+A client creates a session, then PUTs the file in fixed-size chunks, each at
+the offset the server reports; a dropped connection costs at most one chunk,
+and the client resumes from ``GET`` progress. Every chunk is written in place
+into a preallocated part file on the upload store's filesystem and its SHA-256
+is recorded, so finalizing needs no re-read: the file is identified by a tree
+digest over the chunk digests and hard-linked into the content-addressed
+store.
+
+Tree digest: ``sha256(f"{chunk_size}:".encode() + digest_1 + ... + digest_n)``
+over the raw 32-byte chunk digests. It is not the SHA-256 of the file, so
+these files live in the store's ``tree`` namespace and deduplicate only with
+resumable uploads of the same chunk size.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timedelta
+
+from werkzeug.utils import secure_filename
+
+from app import db
+from app.models import UploadSession
+from app.services.upload_store import CHUNK_SIZE, UPLOAD_KINDS, StoredUpload, upload_store
+from app.utils.helpers import app_config
+
+RESUMABLE_KINDS = ('audio', 'video')
+
+# Upload store namespace of files named by their tree digest
+TREE_NAMESPACE = 'tree'
+
+class UploadSessionError(ValueError):
+    """A request the session cannot accept; ``status`` is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+def part_path(session):
+    return os.path.join(upload_store.incoming, f"{session.id}.part")
+
+def tree_digest(chunk_size, chunk_digests):
+    return hashlib.sha256(f"{chunk_size}:".encode() + bytes.fromhex(chunk_digests)).hexdigest()
+
+def create_session(user_id, kind, filename, size):
+    """Validate and open a session with a preallocated part file"""
+    config = app_config()
+    if kind not in RESUMABLE_KINDS:
+        raise UploadSessionError(f"Unsupported upload kind '{kind}'. Choose from: {', '.join(RESUMABLE_KINDS)}")
+    filename = secure_filename(filename or '')
+    extension = os.path.splitext(filename)[1].lstrip('.').lower()
+    if extension not in UPLOAD_KINDS[kind]:
+        raise UploadSessionError(f"'{filename}' is not a supported {kind} file")
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadSessionError('size must be the total file size in bytes')
+    limit = config.get('RESUMABLE_UPLOAD_MAX_BYTES', {}).get(kind)
+    if size <= 0 or (limit and size > limit):
+        raise UploadSessionError(f'size must be between 1 and {limit} bytes', 413 if size > 0 else 400)
+
+    purge_expired_sessions()
+    session = UploadSession(
+        user_id=user_id,
+        kind=kind,
+        filename=filename,
+        total_size=size,
+        chunk_size=config.get('RESUMABLE_CHUNK_SIZE', 4 * 1024 * 1024),
+        expires_at=datetime.utcnow() + timedelta(seconds=config.get('RESUMABLE_UPLOAD_TTL', 24 * 3600))
+    )
+    db.session.add(session)
+    db.session.flush()
+
+    # Sparse on most filesystems; chunks are written straight to their offsets
+    os.makedirs(upload_store.incoming, exist_ok=True)
+    with open(part_path(session), 'wb') as handle:
+        handle.truncate(size)
+    db.session.commit()
+    return session
+
+def check_active(session):
+    if session.status != 'active':
+        raise UploadSessionError(f'Upload is already {session.status}', 409)
+    if session.is_expired:
+        raise UploadSessionError('Upload session has expired', 410)
+
+def write_chunk(session, offset, stream, checksum=None):
+    """Write the chunk at ``offset`` from ``stream``; returns the new offset.
+
+    Only the next chunk is accepted (409 otherwise, so the client re-reads
+    progress). Every chunk but the last must be exactly ``chunk_size``
+    bytes; a short or corrupt chunk (``checksum`` is the hex SHA-256 the
+    client computed) is discarded without advancing the offset.
+    """
+    check_active(session)
+    if offset != session.received:
+        raise UploadSessionError(f'Expected offset {session.received}', 409)
+
+    expected = min(session.chunk_size, session.total_size - offset)
+    digest = hashlib.sha256()
+    written = 0
+    with open(part_path(session), 'r+b') as handle:
+        handle.seek(offset)
+        while True:
+            data = stream.read(CHUNK_SIZE)
+            if not data:
+                break
+            written += len(data)
+            if written > expected:
+                raise UploadSessionError(f'Chunk at offset {offset} must be {expected} bytes', 413)
+            digest.update(data)
+            handle.write(data)
+
+    if written != expected:
+        raise UploadSessionError(f'Chunk at offset {offset} must be {expected} bytes, got {written}')
+    if checksum and checksum.strip().lower() != digest.hexdigest():
+        raise UploadSessionError('Chunk checksum mismatch')
+
+    # Advance only if no concurrent request got there first
+    advanced = UploadSession.query.filter_by(id=session.id, received=offset, status='active').update({
+        'received': offset + written,
+        'chunk_digests': session.chunk_digests + digest.hexdigest(),
+        'updated_at': datetime.utcnow()
+    }, synchronize_session=False)
+    db.session.commit()
+    if not advanced:
+        raise UploadSessionError('Chunk was already received', 409)
+    db.session.refresh(session)
+    return session.received
+
+def finalize_session(session):
+    """Move the complete file into the upload store; returns a ``StoredUpload``.
+
+    Safe to repeat: a retry after failed processing, or after a crash between
+    storing the file and recording it, finds the stored file by its digest
+    (the part file is gone by then) and returns it again.
+    """
+    if session.status != 'failed':
+        check_active(session)
+    if session.received != session.total_size:
+        raise UploadSessionError(f'Upload is incomplete: {session.received} of {session.total_size} bytes', 409)
+
+    digest = tree_digest(session.chunk_size, session.chunk_digests)
+    extension = os.path.splitext(session.filename)[1].lstrip('.').lower()
+    path = upload_store.path(digest, extension, TREE_NAMESPACE)
+    if os.path.exists(path):
+        try:
+            os.remove(part_path(session))
+        except FileNotFoundError:
+            pass
+        stored = StoredUpload(digest, path, os.path.getsize(path), session.kind, extension, False)
+    else:
+        stored = upload_store.save_file(part_path(session), digest, extension, session.kind, TREE_NAMESPACE)
+    session.stored_path = stored.path
+    db.session.commit()
+    return stored
+
+def purge_expired_sessions():
+    """Drop active sessions past their expiry and their part files"""
+    expired = UploadSession.query.filter(UploadSession.status == 'active',
+                                         UploadSession.expires_at < datetime.utcnow()).all()
+    for session in expired:
+        try:
+            os.remove(part_path(session))
+        except FileNotFoundError:
+            pass
+        db.session.delete(session)
+    if expired:
+        db.session.commit()
@@ -0,0 +1,182 @@
+"""Versioned JSON description of the cinematic text animation.
+
+A scene carries everything needed to play the animation: canvas, background
+wave, seeded particles, text lines with per-word reveal times, and the named
+animation curves that drive them. The frontend animates it natively (a few
+KB instead of an encoded video); ``SceneRenderer`` rasterizes the same
+description server-side when a video file is exported.
+
+Times are in seconds and ``progress`` is ``t / duration`` in [0, 1]. Curves:
+
+- ``power``: ``progress ** exponent``
+- ``sine_arch``: ``sin(pi * progress)`` (0 -> 1 -> 0)
+- ``linear``: ``progress``
+"""
+
+import hashlib
+import math
+import random
+
+from PIL import ImageDraw
+
+from app.services.backgrounds import to_image, wave_gradient
+from app.services.font_registry import wrap_text
+from app.services.frame_compositor import FrameCompositor
+
+SCENE_FORMAT = 'rantsmith.scene'
+SCENE_VERSION = 1
+SUPPORTED_VERSIONS = (1,)
+
+# Client-side playback is not bound by the export frame cap
+SCENE_MAX_DURATION = 60
+
+CURVES = ('power', 'sine_arch', 'linear')
+
+def _round(value, digits=3):
+    return round(float(value), digits)
+
+def scene_seed(text):
+    """Deterministic particle seed so the same text always yields the same scene"""
+    return int(hashlib.sha256(text.encode('utf-8')).hexdigest()[:8], 16)
+
+def build_text_scene(text, width=1920, height=1080, fps=30, duration=10, background_color=(30, 30, 30),
+                     font_size=64, line_height=80, margin=100, max_lines=6, particle_count=20, seed=None):
+    """Describe the cinematic text animation for ``text`` as a scene dict"""
+    duration = max(0.1, min(float(duration), SCENE_MAX_DURATION))
+    seed = scene_seed(text) if seed is None else int(seed)
+
+    lines = wrap_text(text, font_size, width - 2 * margin, max_lines=max_lines)
+    word_count = sum(len(line.split()) for line in lines)
+
+    # Word k appears once int(progress ** 0.7 * words) + 1 > k
+    exponent = 0.7
+    word_times = [
+        _round(duration * (k / word_count) ** (1 / exponent)) if k else 0.0
+        for k in range(word_count)
+    ]
+
+    # Particles drift diagonally, wrap around the canvas and pulse in size
+    rng = random.Random(seed)
+    particles = [
+        {
+            'x': _round(rng.uniform(0, width), 1),
+            'y': _round(rng.uniform(0, height), 1),
+            'vx': _round(rng.uniform(40, 80), 1),
+            'vy': _round(rng.uniform(30, 60), 1),
+            'size': 3,
+            'pulse': 2,
+            'phase': _round(rng.uniform(0, 2 * math.pi)),
+        }
+        for _ in range(particle_count)
+    ]
+
+    return {
+        'format': SCENE_FORMAT,
+        'version': SCENE_VERSION,
+        'canvas': {'width': width, 'height': height, 'fps': fps, 'duration': _round(duration)},
+        'background': {
+            'type': 'wave',
+            'base_color': list(background_color),
+            'boost': [0, 0, 20],
+            'amplitude': 30,
+            'frequency': 0.01,
+            'scroll': {'curve': 'linear', 'distance': 100},
+        },
+        'particles': {
+            'seed': seed,
+            'color': [255, 255, 255, 50],
+            'pulse_rate': 3.0,
+            'items': particles,
+        },
+        'text': {
+            'lines': lines,
+            'font': {'family': 'Lato', 'style': 'regular', 'size': font_size,
+                     'line_height': line_height, 'margin': margin},
+            'style': {'fill': [255, 255, 255], 'shadow_offset': 8, 'shadow_alpha': 200, 'shadow_blur': 2,
+                      'glow_radius': 3, 'glow_alpha': 120},
+            'reveal': {'curve': 'power', 'exponent': exponent, 'word_times': word_times},
+            'bob': {'curve': 'sine_arch', 'amplitude': 20},
+            'sway': {'amplitude': 10, 'line_phase': 0.3},
+        },
+    }
+
+def load_scene(scene):
+    """Validate a scene dict; raises ``ValueError`` for unknown formats or versions"""
+    if not isinstance(scene, dict) or scene.get('format') != SCENE_FORMAT:
+        raise ValueError('Not a scene description')
+    if scene.get('version') not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Unsupported scene version: {scene.get('version')}")
+    for section in ('canvas', 'background', 'particles', 'text'):
+        if section not in scene:
+            raise ValueError(f"Scene is missing '{section}'")
+    for animation in ('reveal', 'bob'):
+        if scene['text'][animation]['curve'] not in CURVES:
+            raise ValueError(f"Unknown animation curve: {scene['text'][animation]['curve']}")
+    return scene
+
+def scene_background(scene):
+    """Wave strip tall enough to scroll through; slice ``height`` rows per frame"""
+    canvas = scene['canvas']
+    background = scene['background']
+    return wave_gradient(canvas['width'], canvas['height'] + background['scroll']['distance'],
+                         background['base_color'], amplitude=background['amplitude'],
+                         frequency=background['frequency'], boost=background['boost'])
+
+class SceneRenderer:
+    """Rasterizes a scene frame by frame for video export; built once per render worker"""
+
+    def __init__(self, background, scene):
+        self.scene = load_scene(scene)
+        canvas = scene['canvas']
+        text = scene['text']
+        font = text['font']
+
+        self.width = canvas['width']
+        self.height = canvas['height']
+        self.fps = canvas['fps']
+        self.duration = canvas['duration']
+        self.wave_strip = background if background is not None else scene_background(scene)
+        self.scroll = scene['background']['scroll']['distance']
+
+        self.particles = scene['particles']
+        self.word_count = sum(len(line.split()) for line in text['lines'])
+        self.reveal = text['reveal']
+        self.bob = text['bob']
+        self.sway = text['sway']
+
+        # Lines are already wrapped, so the compositor lays them out unchanged
+        style = text['style']
+        self.compositor = FrameCompositor(
+            self.width, self.height, ' '.join(text['lines']), font_style=font['style'],
+            font_size=font['size'], line_height=font['line_height'], margin=font['margin'],
+            max_lines=len(text['lines']), text_color=style['fill'],
+            shadow_offset=style['shadow_offset'], shadow_alpha=style['shadow_alpha'],
+            shadow_blur=style['shadow_blur'], glow_radius=style['glow_radius'], glow_alpha=style['glow_alpha']
+        )
+
+    def __call__(self, frame_num):
+        t = frame_num / self.fps
+        progress = min(1.0, t / self.duration)
+
+        # Scrolling wave background
+        offset = int(progress * self.scroll)
+        frame = to_image(self.wave_strip[offset:offset + self.height])
+
+        # Translucent particles drifting across the canvas
+        draw = ImageDraw.Draw(frame, 'RGBA')
+        particles = self.particles
+        color = tuple(particles['color'])
+        for item in particles['items']:
+            x = (item['x'] + item['vx'] * t) % self.width
+            y = (item['y'] + item['vy'] * t) % self.height
+            size = item['size'] + item['pulse'] * math.sin(particles['pulse_rate'] * t + item['phase'])
+            draw.ellipse([x - size, y - size, x + size, y + size], fill=color)
+
+        # Progressive reveal with a gentle bob and per-line sway
+        words = int(progress ** self.reveal['exponent'] * self.word_count) + 1
+        bob = int(math.sin(math.pi * progress) * self.bob['amplitude'])
+        sway = self.sway
+        return self.compositor.compose(
+            words, background=frame, offset=(0, bob),
+            line_dx=lambda i: math.sin(math.pi * progress + i * sway['line_phase']) * sway['amplitude']
+        )
@@ -0,0 +1,369 @@
+import json
+import math
+import re
+import unicodedata
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from flask import current_app
+from sqlalchemy import event, text, inspect as sa_inspect
+
+from app import db
+from app.models import Rant, GeneratedContent, SearchDocument, SearchPosting
+
+# Same tokens as FTS5 unicode61: runs of Unicode letters and digits, lowercased, diacritics removed
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+MAX_TERM_LENGTH = 64
+
+# BM25 parameters (same defaults as SQLite FTS5)
+BM25_K1 = 1.2
+BM25_B = 0.75
+KEYWORD_WEIGHT = 2  # Keyword matches count double
+
+FTS_TABLE = 'search_fts'
+
+_events_registered = False
+
+def fold(value: Optional[str]) -> str:
+    """Lowercase, NFKD-normalize and strip diacritics, so "Café" and "cafe" index alike"""
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', value.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+def tokenize(value: Optional[str]) -> List[str]:
+    """Split text into lowercase search terms"""
+    return [token[:MAX_TERM_LENGTH] for token in TOKEN_PATTERN.findall(fold(value))]
+
+def _keywords_text(raw: Optional[str]) -> str:
+    """Flatten the JSON keyword list stored on a rant into plain text"""
+    if not raw:
+        return ''
+    try:
+        keywords = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return raw
+    if isinstance(keywords, list):
+        return ' '.join(str(keyword) for keyword in keywords)
+    return str(keywords)
+
+class SearchService:
+    """Full-text search over rants and generated content.
+
+    Uses a SQLite FTS5 virtual table when the database supports it and a
+    database-backed inverted index (``SearchPosting``) otherwise. Both rank
+    with BM25 and are kept up to date from mapper events, inside the same
+    transaction as the write that changed the text.
+    """
+
+    def __init__(self, app=None):
+        self.app = app
+        self.fts5_enabled = False
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Detect the search backend and hook index maintenance into writes"""
+        self.app = app
+        app.search_service = self
+        with app.app_context():
+            try:
+                self.fts5_enabled = self._ensure_fts5()
+            except Exception as e:
+                print(f"⚠️  FTS5 unavailable, using inverted-index search: {e}")
+                self.fts5_enabled = False
+        _register_events()
+
+    @property
+    def backend(self) -> str:
+        return 'fts5' if self.fts5_enabled else 'inverted_index'
+
+    def _ensure_fts5(self) -> bool:
+        """Create the FTS5 table if the database is SQLite with FTS5 compiled in"""
+        if db.engine.dialect.name != 'sqlite':
+            return False
+        with db.engine.begin() as connection:
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                "USING fts5(owner, content, keywords, tokenize='unicode61')"
+            ))
+        return True
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def index_rant(self, connection, rant: Rant):
+        """Index (or re-index) a rant"""
+        emotion = rant.detected_emotion.value if rant.detected_emotion else None
+        document_id = self._upsert_document(
+            connection, 'rant', rant.id, rant.user_id, rant.id, emotion, rant.created_at,
+            rant.content, _keywords_text(rant.keywords)
+        )
+        # Generated content inherits its rant's emotion for filtering
+        connection.execute(
+            SearchDocument.__table__.update()
+            .where(SearchDocument.rant_id == rant.id)
+            .where(SearchDocument.id != document_id)
+            .values(emotion=emotion)
+        )
+
+    def index_content(self, connection, content: GeneratedContent):
+        """Index (or re-index) a piece of generated content"""
+        emotion = connection.execute(
+            text("SELECT emotion FROM search_document WHERE doc_type = 'rant' AND doc_id = :rant_id"),
+            {'rant_id': content.rant_id}
+        ).scalar()
+        self._upsert_document(
+            connection, 'content', content.id, content.user_id, content.rant_id, emotion,
+            content.created_at, content.content, ''
+        )
+
+    def remove(self, connection, doc_type: str, doc_id: int):
+        """Remove a source row from the index"""
+        document_id = self._document_id(connection, doc_type, doc_id)
+        if document_id is None:
+            return
+        self._clear_terms(connection, document_id)
+        connection.execute(SearchDocument.__table__.delete().where(SearchDocument.id == document_id))
+
+    def rebuild_index(self, user_id: Optional[int] = None):
+        """Re-index every rant and generated content row (optionally for one user)"""
+        rants = Rant.query
+        contents = GeneratedContent.query
+        if user_id is not None:
+            rants = rants.filter_by(user_id=user_id)
+            contents = contents.filter_by(user_id=user_id)
+
+        connection = db.session.connection()
+        for rant in rants.all():
+            self.index_rant(connection, rant)
+        for content in contents.all():
+            self.index_content(connection, content)
+        db.session.commit()
+
+    def backfill_if_empty(self) -> bool:
+        """Index existing rows when the index is empty; returns True if it rebuilt.
+
+        Rows written before search existed (or before the index tables were
+        created) are never seen by the write hooks.
+        """
+        if SearchDocument.query.first() is not None:
+            return False
+        if Rant.query.first() is None and GeneratedContent.query.first() is None:
+            return False
+        self.rebuild_index()
+        return True
+
+    def _document_id(self, connection, doc_type: str, doc_id: int) -> Optional[int]:
+        return connection.execute(
+            text("SELECT id FROM search_document WHERE doc_type = :doc_type AND doc_id = :doc_id"),
+            {'doc_type': doc_type, 'doc_id': doc_id}
+        ).scalar()
+
+    def _upsert_document(self, connection, doc_type, doc_id, user_id, rant_id, emotion,
+                         created_at, content, keywords) -> int:
+        content_terms = tokenize(content)
+        keyword_terms = tokenize(keywords)
+        values = {
+            'user_id': user_id,
+            'doc_type': doc_type,
+            'doc_id': doc_id,
+            'rant_id': rant_id,
+            'emotion': emotion,
+            'created_at': created_at or datetime.utcnow(),
+            'length': len(content_terms) + len(keyword_terms),
+        }
+
+        document_id = self._document_id(connection, doc_type, doc_id)
+        table = SearchDocument.__table__
+        if document_id is None:
+            result = connection.execute(table.insert().values(**values))
+            document_id = result.inserted_primary_key[0]
+        else:
+            connection.execute(table.update().where(table.c.id == document_id).values(**values))
+            self._clear_terms(connection, document_id)
+
+        if self.fts5_enabled:
+            connection.execute(
+                text(f"INSERT INTO {FTS_TABLE}(rowid, owner, content, keywords) "
+                     "VALUES (:rowid, :owner, :content, :keywords)"),
+                # Folded text, so FTS5 sees exactly the terms the fallback index would
+                {'rowid': document_id, 'owner': f'u{user_id}', 'content': fold(content), 'keywords': fold(keywords)}
+            )
+        else:
+            frequencies = Counter(content_terms)
+            for term in keyword_terms:
+                frequencies[term] += KEYWORD_WEIGHT
+            if frequencies:
+                connection.execute(SearchPosting.__table__.insert(), [
+                    {'term': term, 'document_id': document_id, 'term_frequency': count}
+                    for term, count in frequencies.items()
+                ])
+        return document_id
+
+    def _clear_terms(self, connection, document_id: int):
+        if self.fts5_enabled:
+            connection.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :rowid"), {'rowid': document_id})
+        else:
+            connection.execute(
+                SearchPosting.__table__.delete().where(SearchPosting.document_id == document_id)
+            )
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def search(self, user_id: int, query: str, emotion: Optional[str] = None,
+               date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+               doc_type: Optional[str] = None, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """Return ranked matches as dicts with doc_type, doc_id, rant_id and score.
+
+        Every query term must match (AND semantics); higher scores are better.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        filters = {'emotion': emotion, 'date_from': date_from, 'date_to': date_to, 'doc_type': doc_type}
+        if self.fts5_enabled:
+            return self._search_fts5(user_id, terms, filters, limit, offset)
+        return self._search_inverted_index(user_id, terms, filters, limit, offset)
+
+    def _filter_sql(self, filters: Dict[str, Any], params: Dict[str, Any]) -> str:
+        clauses = []
+        if filters['emotion']:
+            clauses.append('d.emotion = :emotion')
+            params['emotion'] = filters['emotion']
+        if filters['date_from']:
+            clauses.append('d.created_at >= :date_from')
+            params['date_from'] = filters['date_from']
+        if filters['date_to']:
+            clauses.append('d.created_at <= :date_to')
+            params['date_to'] = filters['date_to']
+        if filters['doc_type']:
+            clauses.append('d.doc_type = :doc_type')
+            params['doc_type'] = filters['doc_type']
+        return ''.join(f' AND {clause}' for clause in clauses)
+
+    def _search_fts5(self, user_id, terms, filters, limit, offset):
+        # Restricting on the owner column keeps the match set to one user's rows
+        match = f'owner:u{user_id} AND ' + ' AND '.join(f'"{term}"' for term in terms)
+        params = {'match': match, 'user_id': user_id, 'limit': limit, 'offset': offset}
+        sql = (
+            "SELECT d.doc_type, d.doc_id, d.rant_id, "
+            f"bm25({FTS_TABLE}, 0.0, 1.0, {float(KEYWORD_WEIGHT)}) AS rank "
+            f"FROM {FTS_TABLE} JOIN search_document d ON d.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH :match AND d.user_id = :user_id"
+            + self._filter_sql(filters, params) +
+            " ORDER BY rank LIMIT :limit OFFSET :offset"
+        )
+        rows = db.session.execute(text(sql), params).fetchall()
+        # FTS5 bm25() is negative, lower is better; flip it for the API
+        return [
+            {'doc_type': row.doc_type, 'doc_id': row.doc_id, 'rant_id': row.rant_id, 'score': round(-row.rank, 4)}
+            for row in rows
+        ]
+
+    def _search_inverted_index(self, user_id, terms, filters, limit, offset):
+        stats = db.session.execute(
+            text("SELECT COUNT(id), AVG(length) FROM search_document WHERE user_id = :user_id"),
+            {'user_id': user_id}
+        ).one()
+        total_documents, average_length = stats[0] or 0, float(stats[1] or 0) or 1.0
+        if not total_documents:
+            return []
+
+        scores: Dict[int, float] = {}
+        documents: Dict[int, Any] = {}
+        for index, term in enumerate(terms):
+            params = {'term': term, 'user_id': user_id}
+            rows = db.session.execute(text(
+                "SELECT d.id, d.doc_type, d.doc_id, d.rant_id, d.length, p.term_frequency "
+                "FROM search_posting p JOIN search_document d ON d.id = p.document_id "
+                "WHERE p.term = :term AND d.user_id = :user_id"
+                + self._filter_sql(filters, params)
+            ), params).fetchall()
+
+            document_frequency = len(rows)
+            if not document_frequency:
+                return []
+            idf = math.log(1 + (total_documents - document_frequency + 0.5) / (document_frequency + 0.5))
+
+            term_scores = {}
+            for row in rows:
+                if index and row.id not in scores:
+                    continue
+                tf = row.term_frequency
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * row.length / average_length)
+                term_scores[row.id] = scores.get(row.id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+                documents[row.id] = row
+            scores = term_scores
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[offset:offset + limit]
+        return [
+            {
+                'doc_type': documents[document_id].doc_type,
+                'doc_id': documents[document_id].doc_id,
+                'rant_id': documents[document_id].rant_id,
+                'score': round(score, 4)
+            }
+            for document_id, score in ranked
+        ]
+
+# ----------------------------------------------------------------------
+# Incremental index maintenance
+# ----------------------------------------------------------------------
+
+def _text_changed(target, *attributes) -> bool:
+    state = sa_inspect(target)
+    return any(state.attrs[name].history.has_changes() for name in attributes)
+
+def _service() -> Optional[SearchService]:
+    return getattr(current_app, 'search_service', None)
+
+def _register_events():
+    """Attach mapper listeners once per process"""
+    global _events_registered
+    if _events_registered:
+        return
+    _events_registered = True
+
+    @event.listens_for(Rant, 'after_insert')
+    def _rant_inserted(mapper, connection, target):
+        service = _service()
+        if service:
+            service.index_rant(connection, target)
+
+    @event.listens_for(Rant, 'after_update')
+    def _rant_updated(mapper, connection, target):
+        service = _service()
+        if service and _text_changed(target, 'content', 'keywords', 'detected_emotion'):
+            service.index_rant(connection, target)
+
+    @event.listens_for(Rant, 'after_delete')
+    def _rant_deleted(mapper, connection, target):
+        service = _service()
+        if service:
+            service.remove(connection, 'rant', target.id)
+
+    @event.listens_for(GeneratedContent, 'after_insert')
+    def _content_inserted(mapper, connection, target):
+        service = _service()
+        if service:
+            service.index_content(connection, target)
+
+    @event.listens_for(GeneratedContent, 'after_update')
+    def _content_updated(mapper, connection, target):
+        service = _service()
+        if service and _text_changed(target, 'content'):
+            service.index_content(connection, target)
+
+    @event.listens_for(GeneratedContent, 'after_delete')
+    def _content_deleted(mapper, connection, target):
+        service = _service()
+        if service:
+            service.remove(connection, 'content', target.id)
@@ -1,16 +1,21 @@
 import os
 import io
 import base64
-from PIL import Image, ImageDraw, ImageFont
 import tempfile
 import logging
-from werkzeug.utils import secure_filename
 import json
-import speech_recognition as sr
-from pydub import AudioSegment
 from gtts import gTTS
 import cv2
 import numpy as np
+
+from app.services.audio_ingest import AudioIngestError, ingest_audio
+from app.services.backgrounds import gradient_background
+from app.services.font_registry import get_font, text_width, wrap_text
+from app.services.frame_scheduler import FrameScheduler
+from app.services.image_ingest import ingest_image, preview_url, thumbnail_urls
+from app.services.media_store import media_store
+from app.services.text_effects import TextStyle
+from app.services.transcription import TranscriptionError, transcribe_audio
 try:
     import google.generativeai as genai
     GEMINI_AVAILABLE = True
@@ -18,6 +23,39 @@ except ImportError:
     GEMINI_AVAILABLE = False
     print("Warning: Google Generative AI not available. Using fallback methods.")
 
+class LineFrameRenderer:
+    """Renders one frame of the line-by-line text video (BGR, for cv2.VideoWriter)"""
+    
+    def __init__(self, background, lines, width, height, total_frames, background_color):
+        self.lines = lines
+        self.frames_per_line = max(1, total_frames // len(lines)) if lines else total_frames
+        self.base = np.full((height, width, 3), background_color, dtype=np.uint8)
+        self.width = width
+        self.height = height
+    
+    def __call__(self, frame_num):
+        frame = self.base.copy()
+        
+        # Determine which line to show
+        if self.lines:
+            line_index = min(frame_num // self.frames_per_line, len(self.lines) - 1)
+            current_line = self.lines[line_index]
+            
+            # Add text to frame
+            font = cv2.FONT_HERSHEY_SIMPLEX
+            font_scale = 0.8
+            font_color = (255, 255, 255)
+            thickness = 2
+            
+            # Calculate position to center text
+            text_size = cv2.getTextSize(current_line, font, font_scale, thickness)[0]
+            text_x = (self.width - text_size[0]) // 2
+            text_y = (self.height + text_size[1]) // 2
+            
+            cv2.putText(frame, current_line, (text_x, text_y), font, font_scale, font_color, thickness)
+        
+        return frame
+
 class SimpleMediaService:
     """Simple media service for basic functionality with optional Gemini integration"""
     
@@ -55,86 +93,60 @@ class SimpleMediaService:
     def process_audio_file(self, audio_file):
         """Real audio processing with speech recognition"""
         try:
-            # Save the uploaded file
-            filename = secure_filename(audio_file.filename)
-            filepath = os.path.join(self.upload_folder, filename)
-            audio_file.save(filepath)
-            
-            # Initialize speech recognizer
-            recognizer = sr.Recognizer()
-            
+            # Decode the upload in memory to 16 kHz mono with silence trimmed
             try:
-                # Convert audio to WAV format if needed
-                wav_path = None
-                if filename.lower().endswith('.mp3'):
-                    audio = AudioSegment.from_mp3(filepath)
-                    wav_path = filepath.replace('.mp3', '.wav')
-                    audio.export(wav_path, format="wav")
-                    audio_path = wav_path
-                elif filename.lower().endswith('.wav'):
-                    audio_path = filepath
-                else:
-                    # Try to convert using pydub
-                    audio = AudioSegment.from_file(filepath)
-                    wav_path = filepath.replace(os.path.splitext(filepath)[1], '.wav')
-                    audio.export(wav_path, format="wav")
-                    audio_path = wav_path
-                
-                # Perform speech recognition
-                with sr.AudioFile(audio_path) as source:
-                    audio_data = recognizer.record(source)
-                
-                # Try to recognize speech using Google's service
+                audio = ingest_audio(audio_file)
+            except AudioIngestError as e:
+                return {
+                    'success': False,
+                    'error': str(e),
+                    'message': 'Error processing audio file'
+                }
+            
+            # Transcribe pause-delimited segments concurrently
+            try:
+                transcript = transcribe_audio(audio)
+            except TranscriptionError as e:
+                self.logger.warning(f"Speech recognition failed: {e}")
+                return {
+                    'success': False,
+                    'error': f'Speech recognition is unavailable: {e}',
+                    'message': 'Error transcribing audio file'
+                }
+            text = transcript.text
+            if not text:
+                return {
+                    'success': False,
+                    'error': 'Could not understand audio',
+                    'message': 'Please try speaking more clearly'
+                }
+            self.logger.info(f"Speech recognition successful: {text}")
+            
+            # Use Gemini to enhance the text if available; ``text`` stays the transcript the segments time
+            enhanced_text = None
+            if self.gemini_model:
                 try:
-                    text = recognizer.recognize_google(audio_data)
-                    self.logger.info(f"Speech recognition successful: {text}")
+                    enhanced_prompt = f"""
+                    Based on this audio transcription, create a more detailed and emotionally rich version 
+                    that captures the likely feelings and context. Keep it realistic and relatable:
                     
-                    # Use Gemini to enhance the text if available
-                    if self.gemini_model:
-                        try:
-                            enhanced_prompt = f"""
-                            Based on this audio transcription, create a more detailed and emotionally rich version 
-                            that captures the likely feelings and context. Keep it realistic and relatable:
-                            
-                            Original: "{text}"
-                            
-                            Enhanced version:
-                            """
-                            
-                            response = self.gemini_model.generate_content(enhanced_prompt)
-                            enhanced_text = response.text.strip()
-                            text = enhanced_text
-                            
-                        except Exception as e:
-                            self.logger.warning(f"Gemini enhancement failed: {e}")
+                    Original: "{text}"
                     
-                except sr.UnknownValueError:
-                    # Fall back to mock text if recognition fails
-                    text = "I'm feeling overwhelmed and frustrated right now. There's so much going on in my life and I just need to express these feelings somehow."
-                    self.logger.warning("Speech recognition failed, using fallback text")
-                
-                except sr.RequestError as e:
-                    # Fall back to mock text if service is unavailable
-                    text = "I'm feeling overwhelmed and frustrated right now. There's so much going on in my life and I just need to express these feelings somehow."
-                    self.logger.warning(f"Speech recognition service error: {e}")
-                
-            except Exception as e:
-                # Fall back to mock text if audio processing fails
-                text = "I'm feeling overwhelmed and frustrated right now. There's so much going on in my life and I just need to express these feelings somehow."
-                self.logger.warning(f"Audio processing failed: {e}")
-                wav_path = None
-            
-            # Clean up temporary files
-            try:
-                os.remove(filepath)
-                if wav_path and os.path.exists(wav_path):
-                    os.remove(wav_path)
-            except:
-                pass
+                    Enhanced version:
+                    """
+                    
+                    response = self.gemini_model.generate_content(enhanced_prompt)
+                    enhanced_text = response.text.strip() or None
+                    
+                except Exception as e:
+                    self.logger.warning(f"Gemini enhancement failed: {e}")
             
             return {
                 'success': True,
                 'text': text,
+                'enhanced_text': enhanced_text,
+                'duration': round(audio.duration, 2),
+                'segments': transcript.to_dict()['segments'],
                 'message': 'Audio processed successfully'
             }
             
@@ -149,34 +161,20 @@ class SimpleMediaService:
     def process_image_file(self, image_file):
         """Process uploaded image file"""
         try:
-            filename = secure_filename(image_file.filename)
-            filepath = os.path.join(self.upload_folder, filename)
-            image_file.save(filepath)
-            
-            # Open and process image
-            image = Image.open(filepath)
-            
-            # Basic image analysis
-            width, height = image.size
-            format = image.format
-            mode = image.mode
-            
-            # Convert to base64 for frontend display
-            buffered = io.BytesIO()
-            image.save(buffered, format=format or 'JPEG')
-            img_str = base64.b64encode(buffered.getvalue()).decode()
-            
-            # Clean up
-            os.remove(filepath)
+            # Store once; decode only at preview size for thumbnails and colour stats
+            image = ingest_image(image_file)
+            width, height = image.width, image.height
             
             return {
                 'success': True,
-                'image_data': f"data:image/{format.lower()};base64,{img_str}",
+                'image_data': preview_url(image),
+                'thumbnails': thumbnail_urls(image),
                 'metadata': {
                     'width': width,
                     'height': height,
-                    'format': format,
-                    'mode': mode
+                    'format': image.format,
+                    'mode': image.mode,
+                    **image.stats
                 },
                 'message': 'Image processed successfully'
             }
@@ -195,21 +193,17 @@ class SimpleMediaService:
             # Create gTTS object
             tts = gTTS(text=text, lang=language, slow=slow)
             
-            # Save to a temporary file
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-            tts.save(temp_file.name)
-            
-            # Read the file and convert to base64
-            with open(temp_file.name, 'rb') as audio_file:
-                audio_data = audio_file.read()
-                audio_base64 = base64.b64encode(audio_data).decode()
-            
-            # Clean up temporary file
-            os.remove(temp_file.name)
+            # Render into memory and store as a file
+            buffered = io.BytesIO()
+            tts.write_to_fp(buffered)
+            filename = media_store.save_bytes(buffered.getvalue(), 'mp3', 'audio')
+            audio_url = media_store.url('audio', filename)
             
             return {
                 'success': True,
-                'audio_data': f"data:audio/mp3;base64,{audio_base64}",
+                'audio_data': audio_url,
+                'audio_url': audio_url,
+                'audio_file': filename,
                 'message': f'Text-to-speech generated successfully - Language: {language}, Slow: {slow}'
             }
             
@@ -229,71 +223,36 @@ class SimpleMediaService:
             # Create a basic meme template
             width, height = 800, 600
             
-            # Create image with gradient background
-            image = Image.new('RGB', (width, height))
-            draw = ImageDraw.Draw(image)
-            
-            # Create gradient background
-            for i in range(height):
-                gradient_color = int(255 * (1 - i/height))
-                color = (gradient_color//4, gradient_color//2, gradient_color)
-                draw.line([(0, i), (width, i)], fill=color)
+            # Create gradient background (cached per size)
+            image = gradient_background(width, height, (63, 127, 255), (0, 0, 0))
             
             # Add text
-            try:
-                # Try to use a better font
-                font = ImageFont.truetype("arial.ttf", 48)
-            except:
-                # Fall back to default font
-                font = ImageFont.load_default()
-            
-            # Word wrap text
-            words = text.split()
-            lines = []
-            current_line = []
-            
-            for word in words:
-                current_line.append(word)
-                line_text = ' '.join(current_line)
-                bbox = draw.textbbox((0, 0), line_text, font=font)
-                if bbox[2] - bbox[0] > width - 100:  # Leave margin
-                    if len(current_line) > 1:
-                        current_line.pop()
-                        lines.append(' '.join(current_line))
-                        current_line = [word]
-                    else:
-                        lines.append(word)
-                        current_line = []
+            font_size = 48
+            font = get_font(font_size)
             
-            if current_line:
-                lines.append(' '.join(current_line))
+            # Word wrap text (leave margin)
+            lines = wrap_text(text, font_size, width - 100)
             
             # Draw text centered
             total_height = len(lines) * 60
             start_y = (height - total_height) // 2
+            text_style = TextStyle(fill='white', stroke_width=2, stroke_fill='black')
             
             for i, line in enumerate(lines):
-                bbox = draw.textbbox((0, 0), line, font=font)
-                text_width = bbox[2] - bbox[0]
-                x = (width - text_width) // 2
+                x = (width - int(text_width(line, font_size))) // 2
                 y = start_y + i * 60
                 
                 # Draw text with outline
-                for dx in [-2, -1, 0, 1, 2]:
-                    for dy in [-2, -1, 0, 1, 2]:
-                        if dx != 0 or dy != 0:
-                            draw.text((x + dx, y + dy), line, font=font, fill='black')
-                
-                draw.text((x, y), line, font=font, fill='white')
+                text_style.draw(image, (x, y), line, font)
             
-            # Convert to base64
-            buffered = io.BytesIO()
-            image.save(buffered, format='PNG')
-            img_str = base64.b64encode(buffered.getvalue()).decode()
+            filename = media_store.save_image(image, 'PNG')
+            image_url = media_store.url('images', filename)
             
             return {
                 'success': True,
-                'image_data': f"data:image/png;base64,{img_str}",
+                'image_data': image_url,
+                'image_url': image_url,
+                'image_file': filename,
                 'message': 'Meme generated successfully'
             }
             
@@ -322,59 +281,31 @@ class SimpleMediaService:
             
             # Prepare text for display
             words = text.split()
-            lines = []
             words_per_line = 6
+            lines = [' '.join(words[i:i+words_per_line]) for i in range(0, len(words), words_per_line)]
             
-            for i in range(0, len(words), words_per_line):
-                line = ' '.join(words[i:i+words_per_line])
-                lines.append(line)
-            
-            # Create frames
+            # Render frames across the render pool; they come back in order
             total_frames = int(fps * duration)
-            frames_per_line = total_frames // len(lines) if lines else total_frames
-            
-            for frame_num in range(total_frames):
-                # Create frame
-                frame = np.full((height, width, 3), background_color, dtype=np.uint8)
-                
-                # Determine which line to show
-                if lines:
-                    line_index = min(frame_num // frames_per_line, len(lines) - 1)
-                    current_line = lines[line_index]
-                    
-                    # Add text to frame
-                    font = cv2.FONT_HERSHEY_SIMPLEX
-                    font_scale = 0.8
-                    font_color = (255, 255, 255)
-                    thickness = 2
-                    
-                    # Get text size
-                    text_size = cv2.getTextSize(current_line, font, font_scale, thickness)[0]
-                    
-                    # Calculate position to center text
-                    text_x = (width - text_size[0]) // 2
-                    text_y = (height + text_size[1]) // 2
-                    
-                    # Add text to frame
-                    cv2.putText(frame, current_line, (text_x, text_y), font, font_scale, font_color, thickness)
-                
-                # Write frame
+            scheduler = FrameScheduler.from_config()
+            for frame in scheduler.render(LineFrameRenderer, total_frames, lines=lines, width=width,
+                                          height=height, total_frames=total_frames,
+                                          background_color=tuple(background_color)):
                 video_writer.write(frame)
             
             # Release video writer
             video_writer.release()
             
-            # Read the video file and convert to base64
+            # Move the video into the media store in chunks
             with open(temp_video.name, 'rb') as video_file:
-                video_data = video_file.read()
-                video_base64 = base64.b64encode(video_data).decode()
+                filename = media_store.save_stream(iter(lambda: video_file.read(1024 * 1024), b''), 'mp4', 'videos')
             
             # Clean up temporary file
             os.remove(temp_video.name)
             
             return {
                 'success': True,
-                'video_data': f"data:video/mp4;base64,{video_base64}",
+                'video_data': media_store.url('videos', filename),
+                'video_file': filename,
                 'message': 'Video generated successfully'
             }
             
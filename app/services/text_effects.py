@@ -0,0 +1,79 @@
+from PIL import Image, ImageColor, ImageDraw, ImageFilter
+
+def _rgba(color, alpha=255):
+    """Normalise a color name or RGB(A) tuple to an RGBA tuple"""
+    if isinstance(color, str):
+        color = ImageColor.getrgb(color)
+    color = tuple(color)
+    return color if len(color) == 4 else (*color[:3], alpha)
+
+class TextStyle:
+    """Outline, drop shadow and glow for rendered text.
+
+    The outline uses Pillow's native ``stroke_width`` instead of redrawing
+    the text at every offset of a grid, and shadow and glow are one blurred
+    mask each, so a line costs one ``draw.text`` call plus one per enabled
+    shadow or glow layer.
+    """
+
+    def __init__(self, fill=(255, 255, 255), stroke_width=0, stroke_fill=(0, 0, 0),
+                 shadow_offset=0, shadow_color=(0, 0, 0), shadow_alpha=200, shadow_blur=2,
+                 glow_radius=0, glow_color=None, glow_alpha=120):
+        self.fill = _rgba(fill)
+        self.stroke_width = stroke_width
+        self.stroke_fill = _rgba(stroke_fill)
+        self.shadow_offset = shadow_offset
+        self.shadow_color = _rgba(shadow_color)[:3]
+        self.shadow_alpha = shadow_alpha
+        self.shadow_blur = shadow_blur if shadow_offset else 0
+        self.glow_radius = glow_radius
+        self.glow_color = _rgba(glow_color)[:3] if glow_color else self.fill[:3]
+        self.glow_alpha = glow_alpha
+
+    @property
+    def padding(self):
+        """Margin around the text needed to hold the outline, shadow and glow"""
+        return self.stroke_width + self.shadow_offset + self.shadow_blur * 2 + self.glow_radius * 3
+
+    def sprite(self, text, font):
+        """RGBA image of ``text`` with all effects; the text origin is at (padding, padding)"""
+        pad = self.padding
+        bbox = font.getbbox(text)
+        size = (max(1, bbox[2]) + 2 * pad, max(1, bbox[3]) + 2 * pad)
+        sprite = Image.new('RGBA', size, (0, 0, 0, 0))
+
+        if self.shadow_offset:
+            mask = Image.new('L', size, 0)
+            ImageDraw.Draw(mask).text((pad + self.shadow_offset, pad + self.shadow_offset), text,
+                                      font=font, fill=self.shadow_alpha,
+                                      stroke_width=self.stroke_width, stroke_fill=self.shadow_alpha)
+            if self.shadow_blur:
+                mask = mask.filter(ImageFilter.GaussianBlur(self.shadow_blur))
+            sprite = self._composite(sprite, self.shadow_color, mask)
+
+        if self.glow_radius:
+            mask = Image.new('L', size, 0)
+            ImageDraw.Draw(mask).text((pad, pad), text, font=font, fill=255,
+                                      stroke_width=self.glow_radius, stroke_fill=255)
+            mask = mask.filter(ImageFilter.GaussianBlur(self.glow_radius))
+            mask = mask.point(lambda value: value * self.glow_alpha // 255)
+            sprite = self._composite(sprite, self.glow_color, mask)
+
+        ImageDraw.Draw(sprite).text((pad, pad), text, font=font, fill=self.fill,
+                                    stroke_width=self.stroke_width, stroke_fill=self.stroke_fill)
+        return sprite
+
+    def draw(self, image, xy, text, font):
+        """Draw ``text`` onto an RGB ``image`` with its top-left text origin at ``xy``"""
+        if not self.padding and self.fill[3] == 255:
+            ImageDraw.Draw(image).text(xy, text, font=font, fill=self.fill)
+            return
+        sprite = self.sprite(text, font)
+        x, y = xy
+        image.paste(sprite, (int(x) - self.padding, int(y) - self.padding), sprite)
+
+    @staticmethod
+    def _composite(sprite, color, mask):
+        layer = Image.new('RGBA', sprite.size, (*color, 255))
+        layer.putalpha(mask)
+        return Image.alpha_composite(sprite, layer)
@@ -0,0 +1,309 @@
+"""Speech-to-text for uploaded recordings.
+
+Audio is split on voice activity into segments of at most
+``STT_MAX_SEGMENT_SECONDS``, the segments are transcribed concurrently on a
+shared pool through a pluggable backend, and the text is stitched back
+together with per-segment timestamps. A long recording therefore costs about
+as much wall time as its longest segment rather than its full length.
+"""
+
+import logging
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import numpy as np
+
+from app.services.audio_ingest import INGEST_SAMPLE_RATE
+from app.services.worker_pools import LazyPool, map_ordered
+from app.utils.helpers import app_config
+
+try:
+    import speech_recognition as sr
+    SPEECH_RECOGNITION_AVAILABLE = True
+except ImportError:
+    SPEECH_RECOGNITION_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+class TranscriptionError(RuntimeError):
+    """No backend is available or the recognizer failed"""
+
+TranscriptSegment = namedtuple('TranscriptSegment', 'start end text')
+
+class Transcript(namedtuple('Transcript', 'text segments duration backend failed_segments')):
+    """Stitched text plus ``TranscriptSegment`` timings in seconds"""
+
+    def to_dict(self):
+        return {
+            'text': self.text,
+            'duration': round(self.duration, 2),
+            'backend': self.backend,
+            'failed_segments': self.failed_segments,
+            'segments': [
+                {'start': round(s.start, 2), 'end': round(s.end, 2), 'text': s.text}
+                for s in self.segments
+            ],
+        }
+
+# Backends
+
+class SpeechBackend:
+    """Transcribes one segment of 16-bit mono PCM; must be safe to call from several threads"""
+
+    name = None
+
+    def transcribe(self, pcm, sample_rate):
+        raise NotImplementedError
+
+class GoogleSpeechBackend(SpeechBackend):
+    """Remote recognizer: Google Web Speech through ``speech_recognition``"""
+
+    name = 'google'
+
+    def __init__(self, language='en-US', timeout=15, key=None):
+        if not SPEECH_RECOGNITION_AVAILABLE:
+            raise TranscriptionError('speech_recognition is not installed')
+        self.language = language
+        self.timeout = timeout
+        self.key = key
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(language=config.get('STT_LANGUAGE', 'en-US'), timeout=config.get('STT_SEGMENT_TIMEOUT', 15),
+                   key=config.get('GOOGLE_SPEECH_API_KEY'))
+
+    def transcribe(self, pcm, sample_rate):
+        recognizer = sr.Recognizer()
+        recognizer.operation_timeout = self.timeout
+        try:
+            return recognizer.recognize_google(sr.AudioData(pcm, sample_rate, 2), key=self.key,
+                                               language=self.language)
+        except sr.UnknownValueError:
+            return ''
+        except sr.RequestError as e:
+            raise TranscriptionError(f'Speech recognition service error: {e}')
+
+class HybridSpeechBackend(SpeechBackend):
+    """Remote recognizer with a latency cap, falling back to the local one.
+
+    A segment goes to ``remote`` first; if it has not answered within
+    ``latency_cap`` seconds, or fails, ``local`` transcribes it instead. If
+    the local engine fails too, the still-running remote call gets the rest
+    of its own timeout.
+    """
+
+    name = 'hybrid'
+
+    def __init__(self, remote, local, latency_cap=3.0):
+        self.remote = remote
+        self.local = local
+        self.latency_cap = latency_cap
+
+    @classmethod
+    def from_config(cls, config):
+        remote = local = None
+        errors = []
+        try:
+            remote = _build_backend(config.get('STT_BACKEND', 'google'), config)
+        except TranscriptionError as e:
+            errors.append(str(e))
+        try:
+            local = _build_backend('local', config)
+        except TranscriptionError as e:
+            errors.append(str(e))
+        if remote is None and local is None:
+            raise TranscriptionError('; '.join(errors))
+        if remote is None or local is None:
+            logger.info(f"Hybrid transcription degraded to one backend: {'; '.join(errors)}")
+            return remote or local
+        return cls(remote, local, latency_cap=config.get('STT_REMOTE_LATENCY_CAP', 3.0))
+
+    def transcribe(self, pcm, sample_rate):
+        remote = _get_hybrid_pool().submit(self.remote.transcribe, pcm, sample_rate)
+        try:
+            return remote.result(timeout=self.latency_cap)
+        except FutureTimeout:
+            logger.info(f"Remote recognizer exceeded {self.latency_cap:g}s, transcribing locally")
+        except Exception as e:
+            logger.warning(f"Remote recognizer failed, transcribing locally: {e}")
+
+        try:
+            return self.local.transcribe(pcm, sample_rate)
+        except TranscriptionError:
+            if remote.done() and remote.exception() is not None:
+                raise
+            return remote.result()
+
+def _local_backend(config):
+    from app.services.local_stt import LocalSpeechBackend
+    return LocalSpeechBackend.from_config(config)
+
+BACKENDS = {
+    GoogleSpeechBackend.name: GoogleSpeechBackend.from_config,
+    'local': _local_backend,
+    HybridSpeechBackend.name: HybridSpeechBackend.from_config,
+}
+
+# STT_MODE -> backend name; 'remote' uses STT_BACKEND
+MODES = ('remote', 'local', 'hybrid')
+
+def register_backend(name, factory):
+    """Make ``factory(config)`` selectable as ``STT_BACKEND = name``"""
+    BACKENDS[name] = factory
+
+def _build_backend(name, config):
+    factory = BACKENDS.get(name)
+    if factory is None:
+        raise TranscriptionError(f"Unknown speech backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    return factory(config)
+
+def get_backend(name=None, config=None):
+    """Build the backend for ``STT_MODE`` (or ``name``); raises ``TranscriptionError`` if unavailable"""
+    config = app_config(config)
+    if name is None:
+        mode = config.get('STT_MODE', 'hybrid')
+        if mode not in MODES:
+            raise TranscriptionError(f"Unknown STT_MODE '{mode}'. Choose from: {', '.join(MODES)}")
+        name = config.get('STT_BACKEND', 'google') if mode == 'remote' else mode
+    return _build_backend(name, config)
+
+# Voice activity segmentation
+
+def vad_segments(samples, sample_rate=INGEST_SAMPLE_RATE, threshold_db=-40, frame_ms=30,
+                 min_silence_ms=300, max_segment_seconds=15, pad_ms=200):
+    """Split int16 ``samples`` on pauses; returns ``(start, end)`` sample ranges of speech.
+
+    Frames louder than ``threshold_db`` (or 10 dB over the recording's noise
+    floor, whichever is higher, capped at 10 dB under its peak) are voiced;
+    pauses shorter than ``min_silence_ms`` are bridged. Neighbouring segments
+    are merged while they fit in ``max_segment_seconds``, and longer
+    stretches of speech are cut at their quietest frame so none exceeds it.
+    """
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    count = len(samples) // frame
+    if not count:
+        return [(0, len(samples))] if len(samples) else []
+
+    frames = samples[:count * frame].astype(np.float32).reshape(count, frame) / 32768
+    level = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    # The 10th percentile is the noise floor unless the recording barely pauses,
+    # so never demand more than 10 dB under the loudest frame
+    threshold = min(max(threshold_db, float(np.percentile(level, 10)) + 10), float(level.max()) - 10)
+    voiced = level > threshold
+    if not voiced.any():
+        return []
+
+    # Voiced runs as [start, end) frame indexes, with short pauses bridged
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+    runs = []
+    min_gap = max(1, min_silence_ms // frame_ms)
+    for start, end in zip(edges[::2], edges[1::2]):
+        if runs and start - runs[-1][1] < min_gap:
+            runs[-1][1] = end
+        else:
+            runs.append([start, end])
+
+    # Cut runs that are too long at the quietest frame in their second half
+    max_frames = max(2, int(max_segment_seconds * 1000 / frame_ms) - 2 * (pad_ms // frame_ms))
+    pieces = []
+    for start, end in runs:
+        while end - start > max_frames:
+            low = start + max_frames // 2
+            cut = low + int(np.argmin(level[low:start + max_frames]))
+            pieces.append([start, cut])
+            start = cut
+        pieces.append([start, end])
+
+    # Merge neighbours while the result stays under the segment cap
+    merged = [pieces[0]]
+    for start, end in pieces[1:]:
+        if end - merged[-1][0] <= max_frames:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    pad = int(pad_ms / frame_ms)
+    segments = []
+    for i, (start, end) in enumerate(merged):
+        lower = merged[i - 1][1] if i else 0
+        upper = merged[i + 1][0] if i + 1 < len(merged) else count
+        start = max(lower, start - pad)
+        end = min(upper, end + pad)
+        segments.append((int(start) * frame, len(samples) if end == count else int(end) * frame))
+    return segments
+
+# Concurrent transcription
+
+_stt_pool = LazyPool(lambda size: ThreadPoolExecutor(max_workers=size, thread_name_prefix='stt'))
+
+def get_stt_pool(size):
+    """Thread pool shared by all transcriptions in this process, bounding recognizer concurrency"""
+    return _stt_pool.get(size)
+
+_hybrid_pool = LazyPool(lambda: ThreadPoolExecutor(max_workers=16, thread_name_prefix='stt-remote'))
+
+def _get_hybrid_pool():
+    """Threads for remote calls racing the latency cap, so they never block the STT pool"""
+    return _hybrid_pool.get()
+
+class Transcriber:
+    """Segments audio on voice activity and transcribes the segments concurrently"""
+
+    def __init__(self, backend, pool_size=4, max_workers=None, max_segment_seconds=15,
+                 min_silence_ms=300, threshold_db=-40):
+        self.backend = backend
+        self.pool_size = pool_size
+        self.max_workers = min(pool_size, max_workers or pool_size)
+        self.max_segment_seconds = max_segment_seconds
+        self.min_silence_ms = min_silence_ms
+        self.threshold_db = threshold_db
+
+    @classmethod
+    def from_config(cls, backend=None, config=None):
+        """Build a transcriber from ``STT_*`` settings; ``backend`` may be a name or an instance"""
+        config = app_config(config)
+        if backend is None or isinstance(backend, str):
+            backend = get_backend(backend, config)
+        pool_size = config.get('STT_POOL_SIZE', 4)
+        return cls(backend, pool_size=pool_size,
+                   max_workers=config.get('STT_MAX_WORKERS_PER_REQUEST', pool_size),
+                   max_segment_seconds=config.get('STT_MAX_SEGMENT_SECONDS', 15),
+                   min_silence_ms=config.get('STT_MIN_SILENCE_MS', 300),
+                   threshold_db=config.get('AUDIO_SILENCE_THRESHOLD_DB', -40))
+
+    def segments(self, samples, sample_rate):
+        return vad_segments(samples, sample_rate, threshold_db=self.threshold_db,
+                            min_silence_ms=self.min_silence_ms,
+                            max_segment_seconds=self.max_segment_seconds)
+
+    def transcribe(self, audio):
+        """Transcribe an ``IngestedAudio``; raises ``TranscriptionError`` if every segment fails"""
+        samples, sample_rate = audio.samples, audio.sample_rate
+        ranges = self.segments(samples, sample_rate)
+
+        def run(bounds):
+            start, end = bounds
+            try:
+                return self.backend.transcribe(samples[start:end].tobytes(), sample_rate).strip(), None
+            except Exception as e:
+                return '', e
+
+        segments = []
+        errors = []
+        results = map_ordered(get_stt_pool(self.pool_size), run, ranges, self.max_workers)
+        for (start, end), (text, error) in zip(ranges, results):
+            if error is not None:
+                logger.warning(f"Segment {start / sample_rate:.1f}s-{end / sample_rate:.1f}s failed: {error}")
+                errors.append(error)
+            elif text:
+                segments.append(TranscriptSegment(start / sample_rate, end / sample_rate, text))
+
+        if errors and len(errors) == len(ranges):
+            raise TranscriptionError(str(errors[0]))
+        return Transcript(' '.join(segment.text for segment in segments), segments,
+                          len(samples) / sample_rate, self.backend.name, len(errors))
+
+def transcribe_audio(audio, backend=None, config=None):
+    """Transcribe ``IngestedAudio`` with the configured backend; returns a ``Transcript``"""
+    return Transcriber.from_config(backend, config).transcribe(audio)
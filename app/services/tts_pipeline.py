@@ -0,0 +1,260 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.services.audio_synth import decode_audio
+from app.services.media_store import MEDIA_OUTPUT_FOLDER
+from app.services.worker_pools import LazyPool, map_ordered
+from app.utils.helpers import app_config
+
+logger = logging.getLogger(__name__)
+
+_tts_pool = LazyPool(lambda size: ThreadPoolExecutor(max_workers=size, thread_name_prefix='tts'))
+
+def get_tts_pool(size):
+    """Thread pool shared by all speech requests in this process, which bounds provider concurrency"""
+    return _tts_pool.get(size)
+
+_SENTENCE_END = re.compile(r'(?<=[.!?…])["\')\]]*\s+|\n\s*\n')
+_CLAUSE_END = re.compile(r'(?<=[,;:])\s+')
+
+def split_sentences(text, max_chars=400, first_chars=None):
+    """Split ``text`` into chunks of whole sentences, each at most ``max_chars`` long.
+
+    Sentences longer than ``max_chars`` are split at clause punctuation and,
+    failing that, between words. ``first_chars`` caps the first chunk
+    (whole sentences permitting) so streamed playback can start sooner.
+    """
+    pieces = []
+    for sentence in _SENTENCE_END.split(text):
+        sentence = ' '.join(sentence.split())
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        for clause in _CLAUSE_END.split(sentence):
+            pieces.extend(_split_words(clause, max_chars))
+
+    chunks = []
+    current = ''
+    for piece in pieces:
+        limit = max_chars if chunks or not first_chars else min(first_chars, max_chars)
+        if current and len(current) + 1 + len(piece) > limit:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _split_words(text, max_chars):
+    if len(text) <= max_chars:
+        return [text]
+    parts = []
+    current = ''
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > max_chars:
+            parts.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        parts.append(current)
+    return parts
+
+class ChunkCache:
+    """Disk cache of synthesized chunks as 16-bit PCM, keyed by voice, sample rate and text.
+
+    Least recently used files are removed once ``max_bytes`` is exceeded.
+    """
+
+    def __init__(self, folder, max_bytes=256 * 1024 ** 2):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self._total_bytes = None
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    @staticmethod
+    def key(voice, sample_rate, text):
+        payload = json.dumps({'voice': voice, 'sample_rate': sample_rate, 'text': text},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            samples = np.fromfile(path, dtype='<i2')
+            os.utime(path)
+        except OSError:
+            return None
+        return samples.astype(np.float32) / 32767
+
+    def put(self, key, samples):
+        """Store ``samples``; returns them as they will read back, so hits and misses sound identical"""
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2')
+        data = pcm.tobytes()
+        fd, temp_path = tempfile.mkstemp(dir=self.folder, prefix='.chunk-')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                handle.write(data)
+            os.replace(temp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Could not cache speech chunk: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return samples
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._prune()
+        return pcm.astype(np.float32) / 32767
+
+    def _path(self, key):
+        return os.path.join(self.folder, f"{key}.pcm")
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.folder):
+            if name.endswith('.pcm'):
+                try:
+                    stat = os.stat(os.path.join(self.folder, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _prune(self):
+        """Remove least recently used chunks until the cache is back under its cap"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.folder, name))
+                total -= size
+            except OSError:
+                pass
+        self._total_bytes = total
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_chunk_cache(folder, max_bytes):
+    """One ChunkCache per folder and process, so its size accounting survives across requests"""
+    with _caches_lock:
+        cache = _caches.get(folder)
+        if cache is None or cache.max_bytes != max_bytes:
+            cache = _caches[folder] = ChunkCache(folder, max_bytes)
+        return cache
+
+class TTSPipeline:
+    """Long-text speech as concurrently synthesized sentence chunks joined by crossfades.
+
+    ``synthesize(text)`` voices one chunk and returns mono float32 samples at
+    ``sample_rate`` or encoded bytes (e.g. MP3, decoded with ffmpeg). Chunks
+    run on the shared TTS pool with at most ``max_workers`` in flight per
+    request, are cached by hash when a ``cache`` is given, and are yielded
+    in order as soon as each is ready, so the first audio is available after
+    one chunk's latency and the whole text after roughly
+    ``chunks / max_workers`` of them.
+    """
+
+    def __init__(self, synthesize, voice, sample_rate, chunk_chars=400, first_chunk_chars=None,
+                 crossfade_ms=40, pool_size=4, max_workers=None, cache=None):
+        self.synthesize = synthesize
+        self.voice = voice
+        self.sample_rate = sample_rate
+        self.chunk_chars = chunk_chars
+        self.first_chunk_chars = first_chunk_chars
+        self.crossfade = int(sample_rate * crossfade_ms / 1000)
+        self.pool_size = pool_size
+        self.max_workers = min(pool_size, max_workers or pool_size)
+        self.cache = cache
+
+    @classmethod
+    def from_config(cls, synthesize, voice, sample_rate, cached=True, config=None):
+        """Build a pipeline from ``TTS_*`` settings (defaults outside an app context)"""
+        config = app_config(config)
+        cache = None
+        if cached and config.get('TTS_CHUNK_CACHE_ENABLED', True):
+            cache = get_chunk_cache(config.get('TTS_CHUNK_CACHE_FOLDER', os.path.join(MEDIA_OUTPUT_FOLDER, 'tts_chunks')),
+                                    config.get('TTS_CHUNK_CACHE_MAX_BYTES', 256 * 1024 ** 2))
+        pool_size = config.get('TTS_POOL_SIZE', 4)
+        return cls(synthesize, voice, sample_rate, chunk_chars=config.get('TTS_CHUNK_CHARS', 400),
+                   first_chunk_chars=config.get('TTS_FIRST_CHUNK_CHARS'), crossfade_ms=config.get('TTS_CROSSFADE_MS', 40), pool_size=pool_size,
+                   max_workers=config.get('TTS_MAX_WORKERS_PER_REQUEST', pool_size), cache=cache)
+
+    def chunks(self, text):
+        return split_sentences(text, self.chunk_chars, self.first_chunk_chars)
+
+    def stream(self, text):
+        """Yield float32 blocks of the whole text, chunk by chunk, crossfaded at the seams"""
+        tail = None
+        voiced = map_ordered(get_tts_pool(self.pool_size), self._voice_chunk, self.chunks(text), self.max_workers)
+        for samples in voiced:
+            if tail is not None:
+                samples = self._crossfade(tail, samples)
+            # Hold back the end of each chunk to blend into the next one
+            fade = min(self.crossfade, len(samples) // 2)
+            tail = samples[len(samples) - fade:]
+            if len(samples) > fade:
+                yield samples[:len(samples) - fade]
+        if tail is not None and len(tail):
+            yield tail
+
+    def stream_encoded(self, text):
+        """Yield each chunk's encoded output in order, without decoding, crossfades or caching.
+
+        For providers that return MP3 when ffmpeg is unavailable: MP3 frames
+        from consecutive chunks can be concatenated as they are.
+        """
+        yield from map_ordered(get_tts_pool(self.pool_size), self.synthesize, self.chunks(text),
+                               self.max_workers)
+
+    def _voice_chunk(self, text):
+        key = self.cache.key(self.voice, self.sample_rate, text) if self.cache else None
+        if key:
+            samples = self.cache.get(key)
+            if samples is not None:
+                return samples
+
+        samples = self.synthesize(text)
+        if isinstance(samples, (bytes, bytearray)):
+            samples = decode_audio(bytes(samples), self.sample_rate)
+        samples = np.asarray(samples, dtype=np.float32)
+
+        if key:
+            samples = self.cache.put(key, samples)
+        return samples
+
+    @staticmethod
+    def _crossfade(tail, samples):
+        """Linear blend of the previous chunk's tail into the start of ``samples``.
+
+        Equal-gain rather than equal-power: the same voice on both sides of a
+        seam is correlated, and an equal-power fade would bump it by 3 dB.
+        """
+        fade = min(len(tail), len(samples))
+        if not fade:
+            return np.concatenate((tail, samples))
+        ramp = np.linspace(0, 1, fade, dtype=np.float32)
+        head = tail[:fade] * (1 - ramp) + samples[:fade] * ramp
+        return np.concatenate((tail[fade:], head, samples[fade:]))
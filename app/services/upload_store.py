@@ -0,0 +1,259 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import weakref
+from collections import namedtuple
+from functools import wraps
+
+from flask import Request, current_app, jsonify, request
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.utils import secure_filename
+
+CHUNK_SIZE = 64 * 1024
+
+# Upload kind -> file extensions recognised as that kind
+UPLOAD_KINDS = {
+    'image': {'png', 'jpg', 'jpeg', 'gif', 'webp'},
+    'audio': {'mp3', 'wav', 'ogg', 'oga', 'opus', 'm4a', 'webm', 'flac'},
+    'video': {'mp4', 'avi', 'mov', 'mkv'},
+}
+
+# Room for form fields and multipart framing around the file in an upload request
+FORM_OVERHEAD_BYTES = 1024 * 1024
+
+StoredUpload = namedtuple('StoredUpload', 'digest path size kind extension created')
+StoredUpload.__doc__ = """An upload in the content-addressed store; ``created`` is False for a duplicate"""
+
+class UploadTooLarge(RequestEntityTooLarge):
+    """An uploaded file is over the size limit for its kind"""
+
+    def __init__(self, limit):
+        size = f"{limit // 1024 ** 2} MB" if limit >= 1024 ** 2 else f"{limit // 1024} KB"
+        super().__init__(f'Uploaded file is larger than {size}')
+
+def upload_kind(filename, content_type=None):
+    """'image', 'audio', 'video' or None, from the extension and then the MIME type"""
+    extension = os.path.splitext(filename or '')[1].lstrip('.').lower()
+    for kind, extensions in UPLOAD_KINDS.items():
+        if extension in extensions:
+            return kind
+    major = (content_type or '').split('/', 1)[0]
+    return major if major in UPLOAD_KINDS else None
+
+def accepts_upload(kind):
+    """Mark a view as taking files of one ``kind``.
+
+    That kind's limit then applies to its requests whatever the client names
+    the file, and raises the request size cap above ``MAX_CONTENT_LENGTH``
+    for this view only. Put it under ``jwt_required``: the body is parsed,
+    and spooled to disk, only once the request is authenticated.
+    """
+    def decorator(view):
+        @wraps(view)
+        def parsed_view(*args, **kwargs):
+            # Parse before the view, so a limit breach is a 413 response rather
+            # than an exception inside the view's own error handling
+            request.files
+            return view(*args, **kwargs)
+        parsed_view.upload_kind = kind
+        return parsed_view
+    return decorator
+
+class HashingFile:
+    """Temporary upload file that hashes and counts bytes as they are written.
+
+    Writes past ``limit`` raise ``UploadTooLarge`` immediately, so an
+    oversized part is not spooled any further. Everything else is delegated
+    to the underlying file; ``name`` is its path on disk. The file is removed
+    when closed.
+    """
+
+    def __init__(self, directory, limit=None):
+        os.makedirs(directory, exist_ok=True)
+        fd, self.name = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        self._file = os.fdopen(fd, 'w+b')
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+        self.limit = limit
+        self._cleanup = weakref.finalize(self, _remove, self.name)
+
+    def write(self, data):
+        self.size += len(data)
+        if self.limit is not None and self.size > self.limit:
+            raise UploadTooLarge(self.limit)
+        self._sha256.update(data)
+        return self._file.write(data)
+
+    def hexdigest(self):
+        return self._sha256.hexdigest()
+
+    def close(self):
+        self._file.close()
+        self._cleanup()
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+class UploadRequest(Request):
+    """Request that streams file parts into hashing temp files inside the upload store"""
+
+    @property
+    def upload_kind(self):
+        """The kind of file the matched view accepts (see ``accepts_upload``), or None"""
+        view = current_app.view_functions.get(self.endpoint) if self.endpoint else None
+        return getattr(view, 'upload_kind', None)
+
+    @property
+    def max_content_length(self):
+        limit = super().max_content_length
+        store = getattr(current_app, 'upload_store', None)
+        kind_limit = store.limit(self.upload_kind) if store is not None and self.upload_kind else None
+        if kind_limit is None:
+            return limit
+        return max(limit or 0, kind_limit + FORM_OVERHEAD_BYTES)
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        store = getattr(current_app, 'upload_store', None)
+        if store is None:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        # Views that do not declare a kind get the smallest limit, whatever the file is called
+        limit = store.limit(self.upload_kind)
+        if limit is not None and content_length is not None and content_length > limit:
+            raise UploadTooLarge(limit)
+        return HashingFile(store.incoming, limit)
+
+class UploadStore:
+    """Content-addressed, sharded store for user uploads.
+
+    Files live at ``<UPLOAD_FOLDER>/<ab>/<cd>/<sha256>.<ext>``: the name is
+    the SHA-256 of the bytes, computed while the request body streams in, so
+    concurrent uploads can never overwrite each other and byte-identical
+    uploads are stored once. Parts are spooled into ``.incoming`` on the
+    same filesystem and hard-linked into place, an atomic step that copies
+    nothing. ``UPLOAD_MAX_BYTES`` caps each kind while it is being received;
+    files of unknown kind get the smallest cap.
+
+    Files named by any other digest go under a namespace directory,
+    ``<UPLOAD_FOLDER>/<namespace>/<ab>/<cd>/<digest>.<ext>``, so they never
+    collide or deduplicate with files named by their SHA-256.
+    """
+
+    def __init__(self, app=None, root='uploads'):
+        self.root = root
+        self.max_bytes = {}
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read settings and switch the app to streaming, hashing file uploads"""
+        self.root = app.config.get('UPLOAD_FOLDER', self.root)
+        self.max_bytes = dict(app.config.get('UPLOAD_MAX_BYTES', {}))
+        os.makedirs(self.incoming, exist_ok=True)
+        app.request_class = UploadRequest
+        app.upload_store = self
+
+        @app.before_request
+        def check_request_size():
+            # Reject a declared oversized body before anything reads it; file parts are
+            # capped while they stream in, once the view parses them
+            limit = request.max_content_length
+            if limit is not None and (request.content_length or 0) > limit:
+                raise RequestEntityTooLarge()
+
+        @app.errorhandler(RequestEntityTooLarge)
+        def upload_too_large(e):
+            return jsonify({'error': e.description or 'Upload is too large'}), 413
+
+    @property
+    def incoming(self):
+        return os.path.join(self.root, '.incoming')
+
+    def limit(self, kind):
+        if kind in self.max_bytes:
+            return self.max_bytes[kind]
+        return min(self.max_bytes.values(), default=None)
+
+    def path(self, digest, extension, namespace=None):
+        root = os.path.join(self.root, namespace) if namespace else self.root
+        return os.path.join(root, digest[:2], digest[2:4], f"{digest}.{extension}")
+
+    def save(self, file_storage, kind=None):
+        """Move an uploaded file into the store; returns a ``StoredUpload``.
+
+        Parts received through ``UploadRequest`` are already hashed on disk;
+        any other stream is copied through a ``HashingFile`` first.
+        """
+        filename = secure_filename(file_storage.filename or '')
+        kind = kind or upload_kind(filename, file_storage.mimetype)
+        extension = os.path.splitext(filename)[1].lstrip('.').lower() or 'bin'
+
+        source = file_storage.stream
+        owned = not isinstance(source, HashingFile)
+        if owned:
+            source = self._spool(source, self.limit(kind))
+        try:
+            source.flush()
+            digest = source.hexdigest()
+            path = self.path(digest, extension)
+            created = self._link(source.name, path)
+        finally:
+            if owned:
+                source.close()
+        return StoredUpload(digest, path, source.size, kind, extension, created)
+
+    def save_file(self, source_path, digest, extension, kind, namespace=None):
+        """Move a file whose digest is already known into the store, removing ``source_path``.
+
+        A ``digest`` that is not the SHA-256 of the bytes needs a ``namespace``.
+        """
+        path = self.path(digest, extension, namespace)
+        size = os.path.getsize(source_path)
+        try:
+            created = self._link(source_path, path)
+        finally:
+            _remove(source_path)
+        return StoredUpload(digest, path, size, kind, extension, created)
+
+    def _spool(self, stream, limit):
+        if hasattr(stream, 'seek'):
+            stream.seek(0)
+        spooled = HashingFile(self.incoming, limit)
+        try:
+            shutil.copyfileobj(stream, spooled, CHUNK_SIZE)
+        except Exception:
+            spooled.close()
+            raise
+        return spooled
+
+    def _link(self, source, path):
+        """Atomically place ``source`` at ``path``; False if identical bytes are already there"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            return False
+        try:
+            os.link(source, path)
+            return True
+        except FileExistsError:
+            return False
+        except OSError:
+            # No hard links here (e.g. another filesystem): copy, then rename into place
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.upload-')
+            os.close(fd)
+            try:
+                shutil.copyfile(source, temp_path)
+                os.replace(temp_path, path)
+            finally:
+                _remove(temp_path)
+            return True
+
+upload_store = UploadStore()
@@ -0,0 +1,166 @@
+import os
+import shutil
+import subprocess
+import uuid
+
+import numpy as np
+
+try:
+    import cv2
+    OPENCV_AVAILABLE = True
+except ImportError:
+    OPENCV_AVAILABLE = False
+
+from app.services.media_store import MEDIA_OUTPUT_FOLDER, media_store
+
+FFMPEG_BINARY = shutil.which('ffmpeg')
+
+VIDEO_OUTPUT_FOLDER = os.path.join(MEDIA_OUTPUT_FOLDER, 'videos')
+
+# Container -> (ffmpeg codec arguments, cv2 fourcc, mimetype)
+VIDEO_FORMATS = {
+    'mp4': (['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23',
+             '-pix_fmt', 'yuv420p', '-movflags', '+faststart'], 'mp4v', 'video/mp4'),
+    'webm': (['-c:v', 'libvpx-vp9', '-deadline', 'realtime', '-cpu-used', '8',
+              '-crf', '35', '-b:v', '0', '-pix_fmt', 'yuv420p'], 'VP80', 'video/webm'),
+}
+
+def encoder_available():
+    """True when either ffmpeg or OpenCV can encode video"""
+    return bool(FFMPEG_BINARY) or OPENCV_AVAILABLE
+
+class VideoEncoder:
+    """Stream RGB frames straight into an encoded video file on disk.
+
+    Frames are piped to an ``ffmpeg`` subprocess (H.264/MP4 or VP9/WebM) or,
+    when ffmpeg is not installed, written with ``cv2.VideoWriter``. Only the
+    frame being written is held in memory, whatever the frame count. The file
+    is written under a temporary name and moved into place on ``close``::
+
+        with VideoEncoder(1920, 1080, fps=30) as encoder:
+            for frame in frames:
+                encoder.write(frame)
+        encoder.filename  # e.g. '3f2c...e1.mp4'
+    """
+
+    def __init__(self, width, height, fps=30, container='mp4', output_folder=VIDEO_OUTPUT_FOLDER):
+        if container not in VIDEO_FORMATS:
+            raise ValueError(f"Unsupported video container: {container}")
+
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.container = container
+        self.mimetype = VIDEO_FORMATS[container][2]
+        self.frame_count = 0
+
+        os.makedirs(output_folder, exist_ok=True)
+        name = uuid.uuid4().hex
+        self.filename = f"{name}.{container}"
+        self.path = os.path.join(output_folder, self.filename)
+        self._partial_path = os.path.join(output_folder, f".{name}.part.{container}")
+
+        self.backend = None
+        self._process = None
+        self._writer = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def open(self):
+        """Start the encoder; ffmpeg is preferred over OpenCV"""
+        codec_args, fourcc, _ = VIDEO_FORMATS[self.container]
+
+        if FFMPEG_BINARY:
+            command = [
+                FFMPEG_BINARY, '-y', '-loglevel', 'error',
+                '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                '-s', f'{self.width}x{self.height}', '-r', str(self.fps),
+                '-i', '-', '-an', *codec_args,
+                '-f', self.container, self._partial_path,
+            ]
+            self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+            self.backend = 'ffmpeg'
+        elif OPENCV_AVAILABLE:
+            self._writer = cv2.VideoWriter(self._partial_path, cv2.VideoWriter_fourcc(*fourcc),
+                                           self.fps, (self.width, self.height))
+            if not self._writer.isOpened():
+                self._writer = None
+                raise RuntimeError(f"OpenCV could not open a {self.container} writer")
+            self.backend = 'opencv'
+        else:
+            raise RuntimeError('No video encoder available (install ffmpeg or opencv-python)')
+
+    def write(self, frame):
+        """Encode one frame (PIL image or (H, W, 3) uint8 RGB array)"""
+        array = np.asarray(frame.convert('RGB') if hasattr(frame, 'convert') else frame, dtype=np.uint8)
+        if array.shape != (self.height, self.width, 3):
+            raise ValueError(f"Frame shape {array.shape} does not match {self.width}x{self.height}")
+
+        if self._process is not None:
+            try:
+                self._process.stdin.write(array.tobytes())
+            except BrokenPipeError:
+                raise RuntimeError(f"ffmpeg exited early: {self._stderr()}")
+        elif self._writer is not None:
+            self._writer.write(cv2.cvtColor(array, cv2.COLOR_RGB2BGR))
+        else:
+            raise RuntimeError('Encoder is not open')
+
+        self.frame_count += 1
+
+    def close(self):
+        """Finish encoding and move the file into place; returns its path"""
+        if self._process is not None:
+            self._process.stdin.close()
+            returncode = self._process.wait()
+            errors = self._stderr()
+            self._process = None
+            if returncode != 0:
+                self._discard()
+                raise RuntimeError(f"ffmpeg failed ({returncode}): {errors}")
+        elif self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+        os.replace(self._partial_path, self.path)
+        return self.path
+
+    def abort(self):
+        """Stop encoding and remove the partial file"""
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+            except BrokenPipeError:
+                pass
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+        elif self._writer is not None:
+            self._writer.release()
+            self._writer = None
+        self._discard()
+
+    def _stderr(self):
+        try:
+            return self._process.stderr.read().decode(errors='replace').strip()
+        except Exception:
+            return ''
+
+    def _discard(self):
+        try:
+            os.remove(self._partial_path)
+        except OSError:
+            pass
+
+def video_url(filename):
+    """Absolute URL of an encoded video served from the media store"""
+    return media_store.url('videos', filename)
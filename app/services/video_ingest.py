@@ -0,0 +1,123 @@
+"""Video rant ingestion: probe the container, then demux and decode only its soundtrack.
+
+The container header is probed first, so over-long videos are rejected
+before anything is decoded. Only the audio track is then decoded, through
+an ffmpeg pipe straight into 16 kHz mono PCM; video frames are never
+decoded, and memory is bounded by ``MAX_VIDEO_DURATION`` of 16 kHz audio
+(about 3.8 MB for two minutes) however large the file is.
+"""
+
+import contextlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from collections import namedtuple
+
+from app.services import audio_ingest
+from app.services.audio_ingest import SAFE_INPUT_OPTIONS, AudioIngestError, allowed_format, ingest_audio_file
+from app.utils.helpers import app_config
+
+FFPROBE_BINARY = shutil.which('ffprobe')
+
+PROBE_TIMEOUT = 15  # seconds
+
+class VideoIngestError(AudioIngestError):
+    """The upload is not a usable video or breaks an ingest limit"""
+
+VideoProbe = namedtuple('VideoProbe', 'duration has_audio has_video format_name')
+
+@contextlib.contextmanager
+def upload_path(upload):
+    """Path of an upload (or a path) on disk, spooling it to a temporary file only if needed.
+
+    Werkzeug already writes large uploads to a temporary file; that file is
+    used as it is. Otherwise the compressed bytes are copied in 64 KB
+    chunks, so memory stays bounded either way.
+    """
+    if isinstance(upload, (str, os.PathLike)):
+        yield os.fspath(upload)
+        return
+
+    stream = getattr(upload, 'stream', upload)
+    name = getattr(stream, 'name', None)
+    if isinstance(name, str) and os.path.isfile(name):
+        yield name
+        return
+
+    with tempfile.NamedTemporaryFile(prefix='video-ingest-') as handle:
+        shutil.copyfileobj(stream, handle, audio_ingest.READ_SIZE)
+        handle.flush()
+        yield handle.name
+
+def probe_video(path):
+    """Read duration and stream types from the container header; nothing is decoded.
+
+    Only the demuxers in ``audio_ingest.INPUT_DEMUXERS`` are tried, so a
+    playlist renamed to ``.mp4`` is rejected here rather than followed.
+    """
+    probe = _probe(path)
+    if not allowed_format(probe.format_name):
+        raise VideoIngestError('Unsupported video container')
+    return probe
+
+def _probe(path):
+    if FFPROBE_BINARY:
+        command = [FFPROBE_BINARY, '-v', 'error', *SAFE_INPUT_OPTIONS,
+                   '-show_entries', 'format=duration,format_name:stream=codec_type', '-of', 'json', path]
+        try:
+            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=PROBE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            raise VideoIngestError('Timed out reading the video header')
+        if result.returncode != 0:
+            raise VideoIngestError('Unsupported or corrupt video file')
+        info = json.loads(result.stdout or b'{}')
+        kinds = {stream.get('codec_type') for stream in info.get('streams', [])}
+        fmt = info.get('format', {})
+        try:
+            duration = float(fmt.get('duration'))
+        except (TypeError, ValueError):
+            duration = None
+        return VideoProbe(duration, 'audio' in kinds, 'video' in kinds, fmt.get('format_name'))
+
+    # Without ffprobe, ``ffmpeg -i`` prints the same header summary and exits
+    if not audio_ingest.FFMPEG_BINARY:
+        raise VideoIngestError('ffmpeg is required to process video')
+    try:
+        result = subprocess.run([audio_ingest.FFMPEG_BINARY, '-hide_banner', *SAFE_INPUT_OPTIONS, '-i', path],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=PROBE_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        raise VideoIngestError('Timed out reading the video header')
+    header = result.stderr.decode(errors='replace')
+    match = re.search(r"Input #0, (.+?), from '", header)
+    if not match:
+        raise VideoIngestError('Unsupported or corrupt video file')
+    duration = re.search(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', header)
+    if duration:
+        hours, minutes, seconds = duration.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    return VideoProbe(duration, bool(re.search(r'Stream #\S+.*: Audio:', header)),
+                      bool(re.search(r'Stream #\S+.*: Video:', header)), match.group(1))
+
+def ingest_video(upload, max_duration=None):
+    """Probe a video upload or file and decode its soundtrack; returns ``(probe, IngestedAudio)``.
+
+    ``max_duration`` defaults to ``MAX_VIDEO_DURATION``. Raises
+    ``VideoIngestError`` for unusable or over-long videos, including ones
+    whose header understates their length (the decode stops at the limit).
+    """
+    if max_duration is None:
+        max_duration = app_config().get('MAX_VIDEO_DURATION', 120)
+
+    with upload_path(upload) as path:
+        probe = probe_video(path)
+        if probe.duration is not None and probe.duration > max_duration:
+            raise VideoIngestError(f'Video is {probe.duration:.0f} seconds long; the limit is {max_duration:g}')
+        if not probe.has_audio:
+            raise VideoIngestError('The video has no audio track')
+        try:
+            return probe, ingest_audio_file(path, max_duration=max_duration)
+        except AudioIngestError as e:
+            raise VideoIngestError(str(e))
@@ -0,0 +1,68 @@
+"""Executors shared by all requests in a web worker process.
+
+A pool is created on first use, recreated after a fork (a preloaded app
+must not reuse its parent's workers) and rebuilt when its settings change.
+A process pool whose worker died stays broken, so callers that catch
+``BrokenProcessPool`` hand it back to ``reset`` and the next request gets a
+fresh one.
+"""
+
+import os
+import threading
+from collections import deque
+
+_DONE = object()
+
+class LazyPool:
+    """One executor per process, built by ``factory(*settings)``"""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._pool = None
+        self._pid = None
+        self._settings = None
+        self._lock = threading.Lock()
+
+    def get(self, *settings):
+        """The executor for ``settings``, shutting down one built for other settings"""
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid() or self._settings != settings:
+                if self._pool is not None and self._pid == os.getpid():
+                    self._pool.shutdown(wait=False)
+                self._pool = self.factory(*settings)
+                self._pid = os.getpid()
+                self._settings = settings
+            return self._pool
+
+    def reset(self, pool):
+        """Drop a broken ``pool`` unless another caller already replaced it"""
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        pool.shutdown(wait=False)
+
+def map_ordered(pool, function, items, max_in_flight):
+    """Run ``function`` over ``items`` on ``pool``, at most ``max_in_flight`` at a time, yielding results in order.
+
+    The cap keeps one request from filling a pool shared with others; work
+    not yet started is cancelled if the caller stops early.
+    """
+    pending = deque()
+    upcoming = iter(items)
+
+    for item in upcoming:
+        pending.append(pool.submit(function, item))
+        if len(pending) >= max_in_flight:
+            break
+
+    try:
+        while pending:
+            result = pending.popleft().result()
+            item = next(upcoming, _DONE)
+            if item is not _DONE:
+                pending.append(pool.submit(function, item))
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,136 @@
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app import db
+
+class WriteBehindBuffer:
+    """Per-worker buffer for low-value column updates.
+
+    Only for counters and timestamps nobody reads back right away (share
+    counts, ``last_login``); state a user expects to see on the next
+    request, such as favorites, must be committed directly.
+
+    Idempotent updates (``set``, last write wins) and commutative ones
+    (``increment``) are merged in memory and written in a single transaction
+    every ``WRITE_BEHIND_FLUSH_INTERVAL`` seconds, when the buffer reaches
+    ``WRITE_BEHIND_MAX_PENDING`` rows, or at process exit. When the buffer is
+    disabled the update is applied and committed immediately.
+    """
+
+    def __init__(self, app=None):
+        self.app = app
+        self.enabled = False
+        self.flush_interval = 5.0
+        self.max_pending = 1000
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._sets = defaultdict(dict)        # (model, pk) -> {column: value}
+        self._increments = defaultdict(dict)  # (model, pk) -> {column: delta}
+        self._worker_pid = None
+        self._stop = threading.Event()
+
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read settings and register the buffer on the app"""
+        self.app = app
+        self.enabled = app.config.get('WRITE_BEHIND_ENABLED', True)
+        self.flush_interval = float(app.config.get('WRITE_BEHIND_FLUSH_INTERVAL', 5.0))
+        self.max_pending = int(app.config.get('WRITE_BEHIND_MAX_PENDING', 1000))
+        app.write_behind = self
+        atexit.register(self.shutdown)
+
+    def set(self, obj, column, value):
+        """Buffer ``obj.column = value``; the in-memory object reflects it at once"""
+        set_committed_value(obj, column, value)
+        self._buffer(self._sets, obj, column, value, replace=True)
+
+    def increment(self, obj, column, delta=1):
+        """Buffer ``obj.column += delta``"""
+        set_committed_value(obj, column, (getattr(obj, column) or 0) + delta)
+        self._buffer(self._increments, obj, column, delta, replace=False)
+
+    def _buffer(self, pending, obj, column, value, replace):
+        key = (type(obj), sa_inspect(obj).identity[0])
+
+        if not self.enabled:
+            self._write({key: {column: value}} if replace else {}, {} if replace else {key: {column: value}})
+            return
+
+        with self._lock:
+            columns = pending[key]
+            columns[column] = value if replace else columns.get(column, 0) + value
+            size = len(self._sets) + len(self._increments)
+
+        self._ensure_worker()
+        if size >= self.max_pending:
+            self.flush()
+
+    def flush(self):
+        """Write everything buffered so far in one transaction"""
+        with self._lock:
+            sets, self._sets = self._sets, defaultdict(dict)
+            increments, self._increments = self._increments, defaultdict(dict)
+
+        if not sets and not increments:
+            return 0
+
+        try:
+            with self.app.app_context():
+                self._write(sets, increments)
+        except Exception as e:
+            self.logger.error(f"Write-behind flush failed, requeueing {len(sets) + len(increments)} rows: {e}")
+            self._requeue(sets, increments)
+            return 0
+
+        return len(sets) + len(increments)
+
+    def _write(self, sets, increments):
+        try:
+            for (model, pk), columns in sets.items():
+                db.session.query(model).filter(model.id == pk).update(columns, synchronize_session=False)
+            for (model, pk), deltas in increments.items():
+                values = {getattr(model, column): getattr(model, column) + delta for column, delta in deltas.items()}
+                db.session.query(model).filter(model.id == pk).update(values, synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _requeue(self, sets, increments):
+        with self._lock:
+            for key, columns in sets.items():
+                for column, value in columns.items():
+                    # A newer buffered value wins over the failed one
+                    self._sets[key].setdefault(column, value)
+            for key, deltas in increments.items():
+                for column, delta in deltas.items():
+                    self._increments[key][column] = self._increments[key].get(column, 0) + delta
+
+    def _ensure_worker(self):
+        """Start the flush thread once per process (gunicorn workers fork)"""
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+            thread = threading.Thread(target=self._run, name='write-behind-flush', daemon=True)
+            thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def shutdown(self):
+        """Stop the flush thread and write any remaining updates"""
+        self._stop.set()
+        self.flush()
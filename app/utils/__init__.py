@@ -9,5 +9,5 @@ __all__ = [
     'generate_unique_filename', 'hash_content', 'format_timestamp', 'truncate_text',
     'extract_keywords', 'calculate_readability_score', 'format_emotion_confidence',
     'format_sentiment_score', 'create_response_metadata', 'sanitize_filename',
-    'parse_json_safely', 'format_file_size'
+    'parse_json_safely', 'format_file_size', 'app_config'
 ]
@@ -3,6 +3,7 @@
 import jwt
 from flask import request, jsonify, current_app
 from flask_login import login_user
+from werkzeug.exceptions import HTTPException
 from functools import wraps
 from app.models import User
 
@@ -38,6 +39,8 @@ def jwt_required(f):
             
             return f(*args, **kwargs)
             
+        except HTTPException:
+            raise
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
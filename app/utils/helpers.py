@@ -166,3 +166,13 @@ def format_file_size(size_bytes: int) -> str:
     s = round(size_bytes / p, 2)
     
     return f"{s} {size_names[i]}"
+
+def app_config(config: Dict[str, Any] = None) -> Dict[str, Any]:
+    """``config`` if given, else the current app's config, or ``{}`` outside an app context"""
+    if config is not None:
+        return config
+    try:
+        from flask import current_app
+        return current_app.config
+    except RuntimeError:
+        return {}
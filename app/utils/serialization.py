@@ -0,0 +1,74 @@
+"""Serialization helpers for list endpoints (sparse fieldsets and fast JSON)"""
+
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from flask import Response, current_app
+from sqlalchemy.orm import load_only
+
+# Optional fast JSON encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+
+def serialize_value(value: Any) -> Any:
+    """Convert a column value to a JSON-friendly value"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def model_to_dict(obj: Any, field_names: Iterable[str], fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+    """Serialize ``field_names`` of a model, limited to ``fields`` when given.
+
+    Only the requested attributes are touched, so deferred columns that were
+    not selected are never lazy-loaded.
+    """
+    return {
+        name: serialize_value(getattr(obj, name))
+        for name in field_names
+        if fields is None or name in fields
+    }
+
+
+def parse_fields(raw: Optional[str], allowed: Iterable[str]) -> Optional[Set[str]]:
+    """Parse a ``fields=a,b,c`` query parameter.
+
+    Returns None when no projection was requested. Unknown names are ignored
+    and ``id`` is always included.
+    """
+    if not raw:
+        return None
+
+    allowed = set(allowed)
+    requested = {name.strip() for name in raw.split(',') if name.strip()}
+    fields = requested & allowed
+    fields.add('id')
+    return fields
+
+
+def deferred_load_options(model: Any, fields: Optional[Set[str]]) -> List[Any]:
+    """Build query options that only SELECT the columns in ``fields``"""
+    if fields is None:
+        return []
+
+    column_names = {column.key for column in model.__table__.columns}
+    attributes = [getattr(model, name) for name in sorted(fields) if name in column_names]
+    return [load_only(*attributes)] if attributes else []
+
+
+def json_response(payload: Any) -> Response:
+    """Build a JSON response, using orjson for the encoding when available"""
+    if ORJSON_AVAILABLE and current_app.config.get('FAST_JSON_ENABLED', True):
+        body = orjson.dumps(payload, default=serialize_value)
+    else:
+        body = json.dumps(payload, default=serialize_value, separators=(',', ':'))
+    return Response(body, mimetype='application/json')
@@ -19,16 +19,91 @@ class Config:
     RUNWAYML_API_KEY = os.environ.get('RUNWAYML_API_KEY')
     
     # Upload settings
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # whole request; upload views allow their kind's limit plus form fields
+    UPLOAD_MAX_BYTES = {  # per file, enforced while the upload streams in
+        'image': 10 * 1024 * 1024,
+        'audio': 25 * 1024 * 1024,
+        'video': 100 * 1024 * 1024,
+    }
     UPLOAD_FOLDER = 'uploads'
+    IMAGE_THUMBNAIL_SIZES = {  # preset -> longest edge; image uploads answer with thumbnail URLs
+        'small': 160,
+        'medium': 480,
+        'large': 1080,
+    }
+    RESUMABLE_CHUNK_SIZE = 4 * 1024 * 1024  # resumable uploads arrive in chunks of this size
+    RESUMABLE_UPLOAD_MAX_BYTES = {
+        'audio': 100 * 1024 * 1024,
+        'video': 500 * 1024 * 1024,
+    }
+    RESUMABLE_UPLOAD_TTL = 24 * 3600  # seconds an unfinished upload can be resumed
     ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'mp3', 'wav', 'ogg', 'm4a', 'mp4', 'avi', 'mov', 'mkv'}
     
     # Media processing settings
     AUDIO_SAMPLE_RATE = 44100
     VIDEO_FRAME_RATE = 30
     MAX_AUDIO_DURATION = 300  # 5 minutes
+    AUDIO_SILENCE_THRESHOLD_DB = -40  # Leading/trailing audio quieter than this is trimmed on upload
     MAX_VIDEO_DURATION = 120  # 2 minutes
     
+    # Generated media files (served from /api/media/files/...)
+    MEDIA_CACHE_MAX_AGE = 31536000  # one year; asset URLs are content-addressed
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', 'false').lower() == 'true'  # Apache/lighttpd
+    MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX')  # nginx internal location
+    MEDIA_OFFLOAD_MIN_SIZE = 1024 * 1024  # only offload files at least this large to nginx
+    
+    # Render cache for memes, speech and videos (keyed on inputs + renderer version)
+    RENDER_CACHE_ENABLED = True
+    RENDER_CACHE_MAX_BYTES = int(os.environ.get('RENDER_CACHE_MAX_BYTES', 1024 ** 3))  # 1 GB
+    RENDER_CACHE_FOLDER = os.path.join('outputs', 'render_cache')
+    
+    # Parallel frame rendering
+    # Render processes per gunicorn worker: split the cores between workers rather than oversubscribe them
+    RENDER_POOL_SIZE = int(os.environ.get('RENDER_POOL_SIZE', 0)) or max(
+        1, (os.cpu_count() or 1) // int(os.environ.get('WEB_CONCURRENCY', 2)))
+    RENDER_MAX_WORKERS_PER_REQUEST = int(os.environ.get('RENDER_MAX_WORKERS_PER_REQUEST', 4))
+    RENDER_CHUNK_SIZE = 8  # frames per task
+    
+    # Synthetic speech output (fallback when no TTS provider is configured)
+    SYNTH_AUDIO_FORMAT = os.environ.get('SYNTH_AUDIO_FORMAT', 'mp3')  # wav, mp3 or opus; needs ffmpeg except wav
+    SYNTH_SAMPLE_RATE = int(os.environ.get('SYNTH_SAMPLE_RATE', 22050))  # 16000, 22050 or 44100
+    SYNTH_SPEECH_MAX_SECONDS = int(os.environ.get('SYNTH_SPEECH_MAX_SECONDS', 120))  # longer texts are paced faster
+    
+    # Long-text speech: sentence chunks voiced concurrently and crossfaded
+    TTS_CHUNK_CHARS = 400  # max characters per provider call
+    TTS_FIRST_CHUNK_CHARS = 120  # short first chunk so streamed speech starts quickly
+    TTS_POOL_SIZE = int(os.environ.get('TTS_POOL_SIZE', 4))  # concurrent provider calls per worker
+    TTS_MAX_WORKERS_PER_REQUEST = int(os.environ.get('TTS_MAX_WORKERS_PER_REQUEST', 4))
+    TTS_CROSSFADE_MS = 40
+    TTS_MAX_CHARS = 20000  # longer texts are rejected rather than truncated
+    TTS_CHUNK_CACHE_ENABLED = True
+    TTS_CHUNK_CACHE_FOLDER = os.path.join('outputs', 'tts_chunks')
+    TTS_CHUNK_CACHE_MAX_BYTES = int(os.environ.get('TTS_CHUNK_CACHE_MAX_BYTES', 256 * 1024 ** 2))
+    
+    # Speech-to-text: uploads split on pauses and transcribed concurrently
+    STT_MODE = os.environ.get('STT_MODE', 'hybrid')  # remote, local, or hybrid (remote with a local fallback)
+    STT_BACKEND = os.environ.get('STT_BACKEND', 'google')  # remote recognizer
+    STT_REMOTE_LATENCY_CAP = 3.0  # hybrid: seconds to wait for the remote recognizer before going local
+    STT_LOCAL_ENGINE = os.environ.get('STT_LOCAL_ENGINE', 'vosk')  # vosk or sphinx
+    STT_LOCAL_MODEL_PATH = os.environ.get('STT_LOCAL_MODEL_PATH', os.path.join('models', 'vosk-model-small-en-us-0.15'))
+    STT_LOCAL_POOL_SIZE = int(os.environ.get('STT_LOCAL_POOL_SIZE', 2))  # recognizer processes, one warm model each
+    STT_LOCAL_TIMEOUT = 60  # seconds per segment
+    STT_LANGUAGE = os.environ.get('STT_LANGUAGE', 'en-US')
+    GOOGLE_SPEECH_API_KEY = os.environ.get('GOOGLE_SPEECH_API_KEY')  # None uses the shared demo key
+    STT_MAX_SEGMENT_SECONDS = 15  # transcription latency is bounded by the longest segment
+    STT_MIN_SILENCE_MS = 300  # shorter pauses do not split a segment
+    STT_SEGMENT_TIMEOUT = 15  # seconds per recognizer call
+    STT_POOL_SIZE = int(os.environ.get('STT_POOL_SIZE', 4))  # concurrent recognizer calls per worker
+    STT_MAX_WORKERS_PER_REQUEST = int(os.environ.get('STT_MAX_WORKERS_PER_REQUEST', 4))
+    
+    # API serialization
+    FAST_JSON_ENABLED = True  # Use orjson for list responses when installed
+    
+    # Write-behind buffer for low-value updates (last_login, counters)
+    WRITE_BEHIND_ENABLED = True
+    WRITE_BEHIND_FLUSH_INTERVAL = 5  # seconds
+    WRITE_BEHIND_MAX_PENDING = 1000  # rows buffered before an early flush
+    
     # Redis for caching (optional)
     REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379'
 
@@ -44,6 +119,8 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    WRITE_BEHIND_ENABLED = False
+    RENDER_POOL_SIZE = 1
 
 config = {
     'development': DevelopmentConfig,